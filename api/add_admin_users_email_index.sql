@@ -0,0 +1,6 @@
+-- Migration script to add a unique index on admin_users.email
+-- Login looks users up by email; without an index every login scans the table.
+-- Resolve any duplicate emails before running:
+--   SELECT email, COUNT(*) FROM admin_users GROUP BY email HAVING COUNT(*) > 1;
+
+CREATE UNIQUE INDEX IF NOT EXISTS ix_admin_users_email ON admin_users (email);
@@ -0,0 +1,8 @@
+-- Migration script to add a composite (panel, id) index on admin_users
+-- The access-management listing filters on panel and pages by id
+-- (WHERE panel = 'sme' AND id > ? ORDER BY id LIMIT ?); this index serves it as a
+-- pre-sorted range scan instead of a filter + sort.
+-- Check afterwards with:
+--   EXPLAIN (ANALYZE, BUFFERS) SELECT * FROM admin_users WHERE panel = 'sme' ORDER BY id LIMIT 50;
+
+CREATE INDEX IF NOT EXISTS ix_admin_users_panel_id ON admin_users (panel, id);
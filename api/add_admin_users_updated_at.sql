@@ -0,0 +1,6 @@
+-- Migration script to add admin_users.updated_at
+-- Stamped on every write (the ORM sets it via onupdate); the admin users listing
+-- derives its ETag from MAX(updated_at) and the row count, so unchanged polls get 304.
+
+ALTER TABLE admin_users
+    ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT now();
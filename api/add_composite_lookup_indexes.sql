@@ -0,0 +1,19 @@
+-- Migration script to align lookup indexes with the queries the API actually runs
+-- Safe to re-run; creates the composite indexes declared on the SQLAlchemy models
+-- and drops single-column indexes whose column now leads a composite.
+
+-- university_curricula: university + regulation (+ course/status) lookups
+CREATE INDEX IF NOT EXISTS idx_university_curricula_lookup
+ON university_curricula(university, regulation, course, status);
+DROP INDEX IF EXISTS idx_university_curricula_university;
+DROP INDEX IF EXISTS ix_university_curricula_university;
+
+-- topic_mappings: upsert lookup on (subject code, unit number, university topic)
+CREATE UNIQUE INDEX IF NOT EXISTS idx_topic_mappings_unique_university_topic
+ON topic_mappings(university_subject_code, university_unit_number, university_topic);
+
+-- content_library: topic + file type counts
+CREATE INDEX IF NOT EXISTS idx_content_library_topic_file_type
+ON content_library(topic_slug, file_type);
+DROP INDEX IF EXISTS idx_content_library_topic_slug;
+DROP INDEX IF EXISTS ix_content_library_topic_slug;
@@ -1,7 +1,11 @@
-from datetime import datetime, timedelta
+from datetime import timedelta
+from cachetools import TTLCache
+import hashlib
 import os
-from jose import jwt, JWTError
-from jose.exceptions import ExpiredSignatureError
+import threading
+import time
+import jwt
+from jwt import ExpiredSignatureError, InvalidTokenError, MissingRequiredClaimError
 from fastapi import HTTPException, status
 from typing import Optional, Dict
 import logging
@@ -20,6 +24,12 @@ if not SECRET_KEY:
 
 ALGORITHM: str = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "1440"))  # 24 hours default
+TOKEN_CACHE_SIZE: int = 4096  # decoded payloads kept for repeat bearer tokens
+TOKEN_CACHE_TTL: int = 30  # seconds
+
+# Built once; PyJWT enforces both the claim presence and exp during decode
+_DECODE_OPTIONS: Dict = {"require": ("sub", "exp", "iat")}
+_ALGORITHMS = (ALGORITHM,)
 
 # ────────────────────────────────────────────────────────────────────
 #  Helpers
@@ -32,6 +42,28 @@ def _credentials_exc(detail: str = "Could not validate credentials") -> HTTPExce
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+# Decoded payloads of recently verified tokens, keyed by SHA-256 of the token
+# (never the raw token). Only successful decodes are stored.
+_decoded = TTLCache(maxsize=TOKEN_CACHE_SIZE, ttl=TOKEN_CACHE_TTL)
+_decoded_lock = threading.Lock()
+
+def _decode_token_cached(token: str) -> Dict:
+    """Signature-check and decode a token; failures raise and are not cached."""
+    cache_key = hashlib.sha256(token.encode()).digest()
+    with _decoded_lock:
+        payload = _decoded.get(cache_key)
+    if payload is not None:
+        return payload
+    payload = jwt.decode(
+        token,
+        SECRET_KEY,
+        algorithms=_ALGORITHMS,
+        options=_DECODE_OPTIONS,
+    )
+    with _decoded_lock:
+        _decoded[cache_key] = payload
+    return payload
+
 # ────────────────────────────────────────────────────────────────────
 #  Public API
 # ────────────────────────────────────────────────────────────────────
@@ -62,8 +94,10 @@ def create_access_token(
         if extra_claims:
             data.update(extra_claims)
 
-        expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
-        data.update({"exp": expire, "iat": datetime.utcnow()})
+        # Read the clock once and store integer epoch seconds
+        now = int(time.time())
+        lifetime = expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+        data.update({"exp": now + int(lifetime.total_seconds()), "iat": now})
 
         return jwt.encode(data, SECRET_KEY, algorithm=ALGORITHM)
     except Exception as e:
@@ -87,21 +121,21 @@ def verify_token(token: str) -> Dict:
         HTTPException: If token is invalid or expired
     """
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = dict(_decode_token_cached(token))
         
-        # Validate required claims
-        if not all(key in payload for key in ["sub", "exp", "iat"]):
-            raise _credentials_exc("Token missing required claims")
-            
-        # Validate token hasn't expired
-        if datetime.utcnow() > datetime.fromtimestamp(payload["exp"]):
+        # PyJWT checks exp on decode, but cache hits skip decode; re-check here
+        if int(time.time()) > payload["exp"]:
             raise _credentials_exc("Token has expired")
             
         return payload
         
+    except HTTPException:
+        raise
     except ExpiredSignatureError:
         raise _credentials_exc("Token has expired")
-    except JWTError as e:
+    except MissingRequiredClaimError:
+        raise _credentials_exc("Token missing required claims")
+    except InvalidTokenError as e:
         logger.warning(f"Token validation failed: {str(e)}")
         raise _credentials_exc("Invalid token")
     except Exception as e:
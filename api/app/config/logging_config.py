@@ -0,0 +1,51 @@
+"""
+Process-wide logging and console setup applied once when settings are imported
+"""
+import io
+import logging
+import sys
+
+# Third-party loggers whose default verbosity drowns out application logs
+NOISY_LOGGERS = (
+    # boto3 and other AWS libraries
+    ("botocore", logging.WARNING),
+    ("boto3", logging.WARNING),
+    ("urllib3", logging.WARNING),
+    ("s3transfer", logging.WARNING),
+    # PDF processing libraries
+    ("pdfplumber", logging.WARNING),
+    ("pdfminer", logging.WARNING),
+    ("pdfminer.pdfinterp", logging.WARNING),
+    ("pdfminer.pdfdocument", logging.WARNING),
+    ("pdfminer.psparser", logging.WARNING),
+    ("PIL", logging.WARNING),
+    ("matplotlib", logging.WARNING),
+    # OpenAI and HTTP libraries
+    ("openai", logging.WARNING),
+    ("httpx", logging.WARNING),
+    ("httpcore", logging.WARNING),
+    # multipart and web framework libraries
+    ("multipart", logging.WARNING),
+    ("multipart.multipart", logging.WARNING),
+    ("starlette", logging.WARNING),
+    ("uvicorn", logging.INFO),
+    ("fastapi", logging.WARNING),
+    # passlib lazy loading debug messages
+    ("passlib", logging.WARNING),
+    ("passlib.utils.compat", logging.ERROR),
+    ("passlib.registry", logging.ERROR),
+)
+
+def configure_console_encoding():
+    """Force UTF-8 stdout/stderr on Windows, wrapping the streams only once"""
+    if sys.platform != "win32" or getattr(sys.stdout, "_utf8_wrapped", False):
+        return
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+    sys.stdout._utf8_wrapped = True
+    sys.stderr._utf8_wrapped = True
+
+def quiet_noisy_loggers():
+    """Apply the levels in NOISY_LOGGERS in a single pass"""
+    for name, level in NOISY_LOGGERS:
+        logging.getLogger(name).setLevel(level)
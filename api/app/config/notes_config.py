@@ -2,7 +2,9 @@
 Configuration settings for notes generation
 """
 import os
-from typing import Dict, Any
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Mapping, Optional, Any
 
 # Default token limits for different AI providers
 DEFAULT_TOKEN_LIMITS = {
@@ -44,7 +46,34 @@ NOTES_QUALITY_SETTINGS = {
     }
 }
 
-def get_notes_config(quality: str = "standard", provider: str = None) -> Dict[str, Any]:
+def _env_number(name: str, cast) -> Optional[Any]:
+    """Parse a numeric environment override, ignoring unset or malformed values"""
+    value = os.getenv(name)
+    if value:
+        try:
+            return cast(value)
+        except ValueError:
+            pass
+    return None
+
+# Environment overrides are read once at import; they don't change at runtime
+ENV_NOTES_MAX_TOKENS = _env_number("NOTES_MAX_TOKENS", int)
+ENV_NOTES_TEMPERATURE = _env_number("NOTES_TEMPERATURE", float)
+
+@lru_cache(maxsize=None)
+def _build_notes_config(quality: str) -> Mapping[str, Any]:
+    config = dict(NOTES_QUALITY_SETTINGS[quality])
+    
+    # Override with environment variables if set
+    if ENV_NOTES_MAX_TOKENS is not None:
+        config["max_tokens"] = ENV_NOTES_MAX_TOKENS
+    if ENV_NOTES_TEMPERATURE is not None:
+        config["temperature"] = ENV_NOTES_TEMPERATURE
+    
+    # Read-only view, since the same object is shared by every caller
+    return MappingProxyType(config)
+
+def get_notes_config(quality: str = "standard", provider: str = None) -> Mapping[str, Any]:
     """
     Get notes generation configuration based on quality level and provider
     
@@ -53,29 +82,12 @@ def get_notes_config(quality: str = "standard", provider: str = None) -> Dict[st
         provider: AI provider ('google' or 'openai')
     
     Returns:
-        Configuration dictionary
+        Read-only configuration mapping
     """
     if quality not in NOTES_QUALITY_SETTINGS:
         quality = "standard"
     
-    config = NOTES_QUALITY_SETTINGS[quality].copy()
-    
-    # Override with environment variables if set
-    env_max_tokens = os.getenv("NOTES_MAX_TOKENS")
-    if env_max_tokens:
-        try:
-            config["max_tokens"] = int(env_max_tokens)
-        except ValueError:
-            pass
-    
-    env_temperature = os.getenv("NOTES_TEMPERATURE")
-    if env_temperature:
-        try:
-            config["temperature"] = float(env_temperature)
-        except ValueError:
-            pass
-    
-    return config
+    return _build_notes_config(quality)
 
 def get_provider_max_tokens(provider: str, model: str) -> int:
     """
@@ -1,13 +1,16 @@
 import os
+import re
 from pathlib import Path
 from dotenv import load_dotenv
 import logging
 import sys
-from typing import List, Set
+from types import MappingProxyType
+from typing import FrozenSet, List, Set
+
+from .logging_config import configure_console_encoding, quiet_noisy_loggers
 
 # Load environment variables
 # Try multiple locations for .env file
-import os
 _env_loaded = False
 
 # Try 1: api/.env (relative to settings.py location)
@@ -40,14 +43,7 @@ ENV = os.getenv("ENV", "development")
 IS_PRODUCTION = ENV == "production"
 
 # Configure logging with UTF-8 support
-import io
-import sys
-
-# Create a UTF-8 compatible stdout handler for Windows
-if sys.platform == "win32":
-    # Force UTF-8 encoding for stdout on Windows
-    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
-    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+configure_console_encoding()
 
 logging.basicConfig(
     level=logging.INFO if IS_PRODUCTION else logging.DEBUG,
@@ -58,37 +54,8 @@ logging.basicConfig(
     ]
 )
 
-# Reduce noise from boto3 and other AWS libraries
-logging.getLogger('botocore').setLevel(logging.WARNING)
-logging.getLogger('boto3').setLevel(logging.WARNING)
-logging.getLogger('urllib3').setLevel(logging.WARNING)
-logging.getLogger('s3transfer').setLevel(logging.WARNING)
-
-# Reduce noise from PDF processing libraries
-logging.getLogger('pdfplumber').setLevel(logging.WARNING)
-logging.getLogger('pdfminer').setLevel(logging.WARNING)
-logging.getLogger('pdfminer.pdfinterp').setLevel(logging.WARNING)
-logging.getLogger('pdfminer.pdfdocument').setLevel(logging.WARNING)
-logging.getLogger('pdfminer.psparser').setLevel(logging.WARNING)
-logging.getLogger('PIL').setLevel(logging.WARNING)
-logging.getLogger('matplotlib').setLevel(logging.WARNING)
-
-# Reduce noise from OpenAI and HTTP libraries
-logging.getLogger('openai').setLevel(logging.WARNING)
-logging.getLogger('httpx').setLevel(logging.WARNING)
-logging.getLogger('httpcore').setLevel(logging.WARNING)
-
-# Reduce noise from multipart and other libraries
-logging.getLogger('multipart').setLevel(logging.WARNING)
-logging.getLogger('multipart.multipart').setLevel(logging.WARNING)
-logging.getLogger('starlette').setLevel(logging.WARNING)
-logging.getLogger('uvicorn').setLevel(logging.INFO)
-logging.getLogger('fastapi').setLevel(logging.WARNING)
-
-# Suppress passlib lazy loading debug messages
-logging.getLogger('passlib').setLevel(logging.WARNING)
-logging.getLogger('passlib.utils.compat').setLevel(logging.ERROR)
-logging.getLogger('passlib.registry').setLevel(logging.ERROR)
+# Reduce noise from AWS, PDF, HTTP and other third-party libraries
+quiet_noisy_loggers()
 
 logger = logging.getLogger(__name__)
 
@@ -179,7 +146,7 @@ if not IS_PRODUCTION:
             logger.warning(f"Could not create directory {directory}: {e}")
 
 # File Configuration
-ALLOWED_EXTENSIONS: Set[str] = {".pdf", ".docx", ".txt"}
+ALLOWED_EXTENSIONS: FrozenSet[str] = frozenset({".pdf", ".docx", ".txt"})
 MAX_FILE_SIZE = int(os.getenv("MAX_FILE_SIZE", "10485760"))  # 10MB default
 
 # API Settings
@@ -194,16 +161,17 @@ CORS_ORIGINS = [
     "https://sme-panel-staging-production.up.railway.app"
 ]
 
+# Semicolons, commas and whitespace are never valid inside an origin
+_CORS_INVALID_CHARS = re.compile(r'[;,\s]+')
+
 # Function to clean and validate CORS origins
 def clean_cors_origins(origins):
     """Clean and validate CORS origins, removing semicolons and invalid characters"""
     cleaned_origins = []
     for origin in origins:
         if isinstance(origin, str):
-            # Remove semicolons, commas, and other invalid characters more aggressively
-            cleaned = origin.strip()
-            # Remove all semicolons and commas from anywhere in the string
-            cleaned = cleaned.replace(';', '').replace(',', '').strip()
+            # Remove all semicolons, commas and whitespace from anywhere in the string
+            cleaned = _CORS_INVALID_CHARS.sub('', origin)
             
             if cleaned and (cleaned.startswith('http://') or cleaned.startswith('https://')):
                 cleaned_origins.append(cleaned)
@@ -216,12 +184,7 @@ def clean_cors_origins(origins):
             cleaned_origins.extend(clean_cors_origins(origin))
     
     # Remove duplicates while preserving order
-    seen = set()
-    unique_origins = []
-    for origin in cleaned_origins:
-        if origin not in seen:
-            seen.add(origin)
-            unique_origins.append(origin)
+    unique_origins = list(dict.fromkeys(cleaned_origins))
     
     logger.info(f"Final cleaned CORS origins: {unique_origins}")
     return unique_origins
@@ -305,8 +268,18 @@ CHAT_MODEL = os.getenv(
 DEFAULT_CHUNK_SIZE = int(os.getenv("DEFAULT_CHUNK_SIZE", "1000"))
 DEFAULT_CHUNK_OVERLAP = int(os.getenv("DEFAULT_CHUNK_OVERLAP", "200"))
 
+# FAISS index settings: documents with at least FAISS_IVF_MIN_VECTORS chunks get an
+# IVF index (FAISS_IVF_NLIST clusters, FAISS_IVF_NPROBE probed per search) instead
+# of an exhaustive flat index
+FAISS_IVF_MIN_VECTORS = int(os.getenv("FAISS_IVF_MIN_VECTORS", "10000"))
+FAISS_IVF_NLIST = int(os.getenv("FAISS_IVF_NLIST", "100"))
+FAISS_IVF_NPROBE = int(os.getenv("FAISS_IVF_NPROBE", "16"))
+
+# Optional Redis for sharing the AI answer caches across workers and restarts
+REDIS_URL = os.getenv("REDIS_URL")
+
 # PDF Extraction Settings
-PDF_EXTRACTION_CONFIG = {
+PDF_EXTRACTION_CONFIG = MappingProxyType({
     "primary_extractor": os.getenv("PDF_PRIMARY_EXTRACTOR", "pdfplumber"),  # "pdfplumber" or "pypdf2"
     "fallback_threshold": int(os.getenv("PDF_FALLBACK_THRESHOLD", "50")),  # chars per page
     "enable_table_extraction": os.getenv("PDF_ENABLE_TABLES", "true").lower() == "true",
@@ -314,7 +287,7 @@ PDF_EXTRACTION_CONFIG = {
     "log_extraction_details": os.getenv("PDF_LOG_DETAILS", "true").lower() == "true",
     "max_file_size_mb": int(os.getenv("PDF_MAX_SIZE_MB", "50")),  # MB
     "extraction_timeout": int(os.getenv("PDF_EXTRACTION_TIMEOUT", "300"))  # seconds
-}
+})
 
 # S3 Configuration
 AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID")
@@ -385,4 +358,4 @@ logger.info(f"Videos Directory: {VIDEOS_DIR}")
 logger.info(f"Logs Directory: {LOGS_DIR}")
 logger.info(f"CORS Origins: {CORS_ORIGINS}")
 logger.info(f"Rate Limit Window: {RATE_LIMIT_WINDOW}s")
-logger.info(f"Max Login Attempts: {MAX_LOGIN_ATTEMPTS}") 
\ No newline at end of file
+logger.info(f"Max Login Attempts: {MAX_LOGIN_ATTEMPTS}")
@@ -5,49 +5,200 @@ This module provides a secure way to generate and validate API keys for specific
 with controlled access and no expiration.
 """
 
+import atexit
 import hashlib
 import secrets
 import os
+import threading
+import time
 from datetime import datetime
 from typing import Optional, Dict, List, Set
 from fastapi import HTTPException, status
-import json
+import orjson
+import logging
+
+logger = logging.getLogger(__name__)
 
 # Configuration
 API_KEYS_FILE = "data/api_keys.json"
-API_KEY_LENGTH = 64  # 64 character API keys for security
+API_KEYS_LOG_FILE = "data/api_keys.log"  # append-only mutation log replayed over the snapshot
+API_KEY_BYTES = 32  # 256 bits of entropy; encodes to a 43-char key that hashes in one SHA-256 block
+USAGE_FLUSH_INTERVAL = 5.0  # seconds between usage-stat flushes
+USAGE_FLUSH_MAX_PENDING = 100  # flush early once this many validations are buffered
+SNAPSHOT_INTERVAL = 300.0  # seconds between snapshot compactions of the log
+SNAPSHOT_MAX_RECORDS = 1000  # compact early once the log holds this many records
+LOG_BUFFER_SIZE = 64 * 1024
+
+def _json_default(obj):
+    """Serialize in-memory endpoint sets as sorted JSON lists"""
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def _hydrate(key_data: Dict) -> Dict:
+    """Convert a persisted key record to its in-memory form"""
+    key_data["allowed_endpoints"] = frozenset(key_data["allowed_endpoints"])
+    return key_data
 
 class APIKeyManager:
     """Manages API keys for internal server-to-server communication"""
     
     def __init__(self):
         self.keys_file = API_KEYS_FILE
-        self.keys: Dict[str, Dict] = {}
+        self.log_file = API_KEYS_LOG_FILE
+        # Keyed by raw SHA-256 digest; hex-encoded only when persisted
+        self.keys: Dict[bytes, Dict] = {}
+        # endpoint -> digests of active keys allowed to call it
+        self._by_endpoint: Dict[str, Set[bytes]] = {}
+        self._lock = threading.RLock()
+        self._dirty = False
+        self._pending_usage = 0
+        self._last_flush = time.monotonic()
+        self._log_fh = None
+        self._log_records = 0
+        self._last_snapshot = time.monotonic()
         self.load_keys()
+        atexit.register(self.close)
     
     def load_keys(self):
-        """Load API keys from storage"""
+        """Load API keys from the snapshot and replay the mutation log over it"""
         try:
             if os.path.exists(self.keys_file):
-                with open(self.keys_file, 'r') as f:
-                    self.keys = json.load(f)
-                print(f"[API_KEYS] Loaded {len(self.keys)} API keys from storage")
+                with open(self.keys_file, 'rb') as f:
+                    stored = orjson.loads(f.read())
+                self.keys = {bytes.fromhex(key_hash): _hydrate(data) for key_hash, data in stored.items()}
+                logger.info(f"Loaded {len(self.keys)} API keys from storage")
             else:
                 self.keys = {}
-                print("[API_KEYS] No existing API keys found, starting fresh")
+                logger.info("No existing API keys found, starting fresh")
         except Exception as e:
-            print(f"[API_KEYS] Error loading keys: {e}")
+            logger.error(f"Error loading keys: {e}")
             self.keys = {}
+        
+        self._log_records = self._replay_log()
+        if self._log_records:
+            logger.info(f"Replayed {self._log_records} logged mutations")
+        
+        self._rebuild_endpoint_index()
     
-    def save_keys(self):
-        """Save API keys to storage"""
+    def _rebuild_endpoint_index(self):
+        """Build the endpoint -> active key digests index from scratch"""
+        self._by_endpoint = {}
+        for key_hash, key_data in self.keys.items():
+            self._index_key(key_hash, key_data)
+    
+    def _index_key(self, key_hash: bytes, key_data: Dict):
+        if key_data.get("is_active", True):
+            for endpoint in key_data["allowed_endpoints"]:
+                self._by_endpoint.setdefault(endpoint, set()).add(key_hash)
+    
+    def _unindex_key(self, key_hash: bytes, key_data: Dict):
+        for endpoint in key_data["allowed_endpoints"]:
+            allowed = self._by_endpoint.get(endpoint)
+            if allowed is not None:
+                allowed.discard(key_hash)
+                if not allowed:
+                    del self._by_endpoint[endpoint]
+    
+    def has_active_key(self, endpoint: str) -> bool:
+        """Whether any active API key may access the endpoint"""
+        return endpoint in self._by_endpoint
+    
+    def _replay_log(self) -> int:
+        """Apply records from the mutation log; returns how many were applied"""
+        if not os.path.exists(self.log_file):
+            return 0
+        
+        applied = 0
         try:
-            os.makedirs(os.path.dirname(self.keys_file), exist_ok=True)
-            with open(self.keys_file, 'w') as f:
-                json.dump(self.keys, f, indent=2)
-            print(f"[API_KEYS] Saved {len(self.keys)} API keys to storage")
+            with open(self.log_file, 'rb') as f:
+                for line in f:
+                    try:
+                        record = orjson.loads(line)
+                    except orjson.JSONDecodeError:
+                        # A torn final line from a crash mid-write; everything before it is intact
+                        break
+                    key_hash = bytes.fromhex(record["key"])
+                    op = record["op"]
+                    if op == "put":
+                        self.keys[key_hash] = _hydrate(record["data"])
+                    elif op == "delete":
+                        self.keys.pop(key_hash, None)
+                    elif key_hash in self.keys:
+                        # "usage" and "deactivate" carry absolute field values, so replay is idempotent
+                        self.keys[key_hash].update(record["fields"])
+                    applied += 1
         except Exception as e:
-            print(f"[API_KEYS] Error saving keys: {e}")
+            logger.error(f"Error replaying key log: {e}")
+        return applied
+    
+    def _append_log(self, op: str, key_hash: bytes, **payload):
+        """Buffer a single mutation record in the append-only log"""
+        with self._lock:
+            if self._log_fh is None:
+                os.makedirs(os.path.dirname(self.log_file), exist_ok=True)
+                self._log_fh = open(self.log_file, 'ab', buffering=LOG_BUFFER_SIZE)
+            record = {"op": op, "key": key_hash.hex(), **payload}
+            self._log_fh.write(orjson.dumps(record, default=_json_default) + b"\n")
+            self._log_records += 1
+    
+    def _flush_log(self):
+        """Push buffered log records to the OS"""
+        with self._lock:
+            if self._log_fh is not None:
+                self._log_fh.flush()
+    
+    def save_keys(self):
+        """Write a full snapshot of the API keys and truncate the mutation log"""
+        with self._lock:
+            try:
+                os.makedirs(os.path.dirname(self.keys_file), exist_ok=True)
+                snapshot = {key_hash.hex(): data for key_hash, data in self.keys.items()}
+                # Write beside the target and swap it in, so a crash never leaves a torn snapshot
+                tmp_file = self.keys_file + ".tmp"
+                with open(tmp_file, 'wb') as f:
+                    f.write(orjson.dumps(snapshot, default=_json_default))
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_file, self.keys_file)
+                logger.debug(f"Saved {len(self.keys)} API keys to storage")
+            except Exception as e:
+                # Keep the log so nothing is lost; compaction is retried later
+                logger.error(f"Error saving keys: {e}")
+                self._last_snapshot = time.monotonic()
+                return
+            
+            # Everything in the log is now part of the snapshot
+            if self._log_fh is not None:
+                self._log_fh.close()
+                self._log_fh = None
+            if os.path.exists(self.log_file):
+                os.remove(self.log_file)
+            self._log_records = 0
+            self._dirty = False
+            self._pending_usage = 0
+            self._last_flush = self._last_snapshot = time.monotonic()
+    
+    def flush_if_dirty(self):
+        """Persist buffered usage statistics, compacting the log when due"""
+        with self._lock:
+            if not self._dirty:
+                return
+            now = time.monotonic()
+            if (self._log_records >= SNAPSHOT_MAX_RECORDS
+                    or now - self._last_snapshot >= SNAPSHOT_INTERVAL):
+                self.save_keys()
+                return
+            self._flush_log()
+            self._dirty = False
+            self._pending_usage = 0
+            self._last_flush = now
+    
+    def close(self):
+        """Compact pending log records into the snapshot (registered with atexit)"""
+        with self._lock:
+            if self._dirty or self._log_records:
+                self.save_keys()
     
     def generate_api_key(self, name: str, description: str, allowed_endpoints: List[str]) -> str:
         """
@@ -62,13 +213,13 @@ class APIKeyManager:
             str: The generated API key
         """
         # Generate a secure random API key
-        api_key = secrets.token_urlsafe(API_KEY_LENGTH)
+        api_key = secrets.token_urlsafe(API_KEY_BYTES)
         
         # Create key metadata
         key_data = {
             "name": name,
             "description": description,
-            "allowed_endpoints": allowed_endpoints,
+            "allowed_endpoints": frozenset(allowed_endpoints),
             "created_at": datetime.utcnow().isoformat(),
             "last_used": None,
             "usage_count": 0,
@@ -76,13 +227,15 @@ class APIKeyManager:
         }
         
         # Store the key (hash the actual key for security)
-        key_hash = hashlib.sha256(api_key.encode()).hexdigest()
+        key_hash = hashlib.sha256(api_key.encode()).digest()
         self.keys[key_hash] = key_data
+        self._index_key(key_hash, key_data)
         
-        # Save to storage
-        self.save_keys()
+        # Persist immediately; the key cannot be recovered if this is lost
+        self._append_log("put", key_hash, data=key_data)
+        self._flush_log()
         
-        print(f"[API_KEYS] Generated new API key '{name}' with access to {len(allowed_endpoints)} endpoints")
+        logger.info(f"Generated new API key '{name}' with access to {len(allowed_endpoints)} endpoints")
         
         return api_key
     
@@ -107,46 +260,61 @@ class APIKeyManager:
             )
         
         # Hash the provided key for comparison
-        key_hash = hashlib.sha256(api_key.encode()).hexdigest()
+        key_hash = hashlib.sha256(api_key.encode()).digest()
+        key_data = self.keys.get(key_hash)
         
-        if key_hash not in self.keys:
+        if key_data is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid API key"
             )
         
-        key_data = self.keys[key_hash]
-        
-        # Check if key is active
-        if not key_data.get("is_active", True):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="API key is deactivated"
-            )
-        
-        # Check if endpoint is allowed
-        if endpoint not in key_data["allowed_endpoints"]:
+        # Only active keys are indexed, so one membership test covers both checks
+        if key_hash not in self._by_endpoint.get(endpoint, ()):
+            if not key_data.get("is_active", True):
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="API key is deactivated"
+                )
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"API key does not have access to endpoint: {endpoint}"
             )
         
-        # Update usage statistics
-        key_data["last_used"] = datetime.utcnow().isoformat()
-        key_data["usage_count"] += 1
-        
-        # Save updated data
-        self.save_keys()
-        
+        self.record_usage(key_hash)
         return key_data
     
+    def record_usage(self, key_hash: bytes):
+        """Count one use of a key (by SHA-256 digest); kept in memory and persisted
+        in batches, so it is cheap enough to call on every request"""
+        with self._lock:
+            key_data = self.keys.get(key_hash)
+            if key_data is None:
+                return  # deleted since it was validated
+            key_data["last_used"] = datetime.utcnow().isoformat()
+            key_data["usage_count"] += 1
+            self._append_log(
+                "usage",
+                key_hash,
+                fields={"last_used": key_data["last_used"], "usage_count": key_data["usage_count"]}
+            )
+            self._dirty = True
+            self._pending_usage += 1
+            flush_due = (
+                self._pending_usage >= USAGE_FLUSH_MAX_PENDING
+                or time.monotonic() - self._last_flush >= USAGE_FLUSH_INTERVAL
+            )
+        
+        if flush_due:
+            self.flush_if_dirty()
+    
     def list_keys(self) -> List[Dict]:
         """List all API keys (without exposing the actual keys)"""
         return [
             {
                 "name": data["name"],
                 "description": data["description"],
-                "allowed_endpoints": data["allowed_endpoints"],
+                "allowed_endpoints": sorted(data["allowed_endpoints"]),
                 "created_at": data["created_at"],
                 "last_used": data["last_used"],
                 "usage_count": data["usage_count"],
@@ -155,31 +323,51 @@ class APIKeyManager:
             for data in self.keys.values()
         ]
     
+    @staticmethod
+    def _parse_key_hash(key_hash: str) -> Optional[bytes]:
+        """Convert a hex key hash (as exposed to admins) to its stored digest"""
+        try:
+            return bytes.fromhex(key_hash)
+        except ValueError:
+            return None
+    
     def deactivate_key(self, key_hash: str) -> bool:
         """Deactivate an API key"""
+        key_hash = self._parse_key_hash(key_hash)
         if key_hash in self.keys:
             self.keys[key_hash]["is_active"] = False
-            self.save_keys()
-            print(f"[API_KEYS] Deactivated API key: {self.keys[key_hash]['name']}")
+            self._unindex_key(key_hash, self.keys[key_hash])
+            self._append_log("deactivate", key_hash, fields={"is_active": False})
+            self._flush_log()
+            logger.info(f"Deactivated API key: {self.keys[key_hash]['name']}")
             return True
         return False
     
     def delete_key(self, key_hash: str) -> bool:
         """Delete an API key permanently"""
+        key_hash = self._parse_key_hash(key_hash)
         if key_hash in self.keys:
             key_name = self.keys[key_hash]["name"]
+            self._unindex_key(key_hash, self.keys[key_hash])
             del self.keys[key_hash]
-            self.save_keys()
-            print(f"[API_KEYS] Deleted API key: {key_name}")
+            self._append_log("delete", key_hash)
+            self._flush_log()
+            logger.info(f"Deleted API key: {key_name}")
             return True
         return False
 
-# Global instance
-api_key_manager = APIKeyManager()
+# Global instance, created on first use so importing this module does no disk I/O
+_api_key_manager: Optional[APIKeyManager] = None
+_api_key_manager_lock = threading.Lock()
 
 def get_api_key_manager() -> APIKeyManager:
     """Get the global API key manager instance"""
-    return api_key_manager
+    global _api_key_manager
+    if _api_key_manager is None:
+        with _api_key_manager_lock:
+            if _api_key_manager is None:
+                _api_key_manager = APIKeyManager()
+    return _api_key_manager
 
 def validate_api_key_for_endpoint(api_key: str, endpoint: str) -> Dict:
     """
@@ -192,5 +380,9 @@ def validate_api_key_for_endpoint(api_key: str, endpoint: str) -> Dict:
     Returns:
         Dict: Key metadata if valid
     """
-    return api_key_manager.validate_api_key(api_key, endpoint)
+    return get_api_key_manager().validate_api_key(api_key, endpoint)
+
+def record_api_key_usage(key_hash: bytes):
+    """Count a use of an already-validated key (for callers that cache validation)"""
+    get_api_key_manager().record_usage(key_hash)
 
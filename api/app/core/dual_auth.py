@@ -6,21 +6,105 @@ and API keys (for internal server-to-server communication).
 """
 
 from fastapi import Depends, HTTPException, status, Request
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from cachetools import TTLCache
+from hashlib import blake2b, sha256
 from typing import Optional, Union, Dict
 import logging
+import threading
+import time
 
-from .security import get_current_user
-from .api_keys import validate_api_key_for_endpoint
+from .security import get_user_from_token
+from .api_keys import validate_api_key_for_endpoint, record_api_key_usage
 
 logger = logging.getLogger(__name__)
 
-# JWT Bearer scheme
-_scheme = HTTPBearer(auto_error=False)
+def _bearer(request: Request) -> Optional[str]:
+    """Raw token from an 'Authorization: Bearer <token>' header, or None"""
+    header = request.headers.get("authorization")
+    if header and header[:7].lower() == "bearer ":
+        return header[7:] or None
+    return None
+
+_EMPTY = frozenset()
+_FULL_ACCESS = frozenset(("full_access",))
+_FULL_ACCESS_LIST = ("full_access",)
+
+# Successful auth results for recent (credentials, endpoint) pairs; failures are never cached
+_auth_cache = TTLCache(maxsize=20000, ttl=5)
+_auth_cache_lock = threading.Lock()
+
+# Validated API key records keyed by SHA-256 of the key, plus short-lived
+# rejections keyed by (digest, endpoint) to blunt brute-force scans
+_key_cache = TTLCache(maxsize=5000, ttl=60)
+_key_neg_cache = TTLCache(maxsize=5000, ttl=5)
+
+def _auth_cache_key(token: Optional[str], api_key: Optional[str], endpoint: str) -> bytes:
+    material = f"{token or ''}|{api_key or ''}|{endpoint}".encode()
+    return blake2b(material, digest_size=16).digest()
+
+def _validate_api_key_cached(api_key: str, endpoint: str) -> Dict:
+    """validate_api_key_for_endpoint with in-memory positive and negative caching"""
+    digest = sha256(api_key.encode()).digest()
+    with _auth_cache_lock:
+        rejected = _key_neg_cache.get((digest, endpoint))
+        key_data = _key_cache.get(digest)
+    if rejected is not None:
+        raise HTTPException(status_code=rejected.status_code, detail=rejected.detail)
+    
+    # key_data is the manager's own record, so deactivation is seen immediately
+    if (key_data is not None
+            and key_data.get("is_active", True)
+            and endpoint in key_data["allowed_endpoints"]):
+        # Skipped validation, but the use still counts toward the key's stats
+        record_api_key_usage(digest)
+        return key_data
+    
+    try:
+        key_data = validate_api_key_for_endpoint(api_key, endpoint)
+    except HTTPException as e:
+        with _auth_cache_lock:
+            _key_neg_cache[(digest, endpoint)] = e
+        raise
+    with _auth_cache_lock:
+        _key_cache[digest] = key_data
+    return key_data
+
+def invalidate_api_key(key_hash: str):
+    """Drop cached auth state for an API key (hex SHA-256) after it is changed or deleted"""
+    try:
+        digest = bytes.fromhex(key_hash)
+    except ValueError:
+        return
+    with _auth_cache_lock:
+        _key_cache.pop(digest, None)
+        # Memoized auth results are keyed by the raw key, which we don't have; admin
+        # key changes are rare, so drop them all
+        _auth_cache.clear()
+
+def _api_key_auth_result(key_data: Dict) -> Dict:
+    """Auth result for a validated API key
+    
+    allowed_endpoints is already a frozenset on the manager's record; checks use it
+    directly via permissions_set. The "permissions" fields, which endpoints return
+    to clients, get a sorted tuple so their order is stable across processes.
+    """
+    perms = key_data["allowed_endpoints"]
+    perms_list = tuple(sorted(perms))
+    return {
+        "auth_type": "api_key",
+        "user_data": {
+            "sub": f"api_key_{key_data['name']}",
+            "role": "api_key",
+            "permissions": perms_list
+        },
+        "key_data": key_data,
+        "permissions": perms_list,
+        "permissions_set": perms
+    }
 
 async def get_dual_auth_user(
     request: Request,
-    credentials: Optional[HTTPAuthorizationCredentials] = Depends(_scheme)
+    token: Optional[str] = Depends(_bearer)
 ) -> Dict:
     """
     Authenticate user using either JWT token or API key
@@ -34,39 +118,62 @@ async def get_dual_auth_user(
     Raises:
         HTTPException: If neither authentication method is valid
     """
+    # Already authenticated earlier in this request (another Depends chain)
+    cached = getattr(request.state, "_auth", None)
+    if cached is not None:
+        return cached
+    
     endpoint = request.url.path
+    api_key = request.headers.get("X-API-Key")
+    
+    cache_key = _auth_cache_key(token, api_key, endpoint)
+    with _auth_cache_lock:
+        cached = _auth_cache.get(cache_key)
+    if cached is not None and cached["auth_type"] == "jwt":
+        # The entry's TTL can outlast the token; never serve it past its exp
+        # (security.get_user_from_token re-checks its own cache hits the same way)
+        exp = cached["user_data"].get("exp")
+        if exp is not None and exp <= time.time():
+            with _auth_cache_lock:
+                _auth_cache.pop(cache_key, None)
+            cached = None
+    if cached is not None:
+        if cached["auth_type"] == "api_key":
+            # Validation was skipped, but the use still counts toward the key's stats
+            record_api_key_usage(sha256(api_key.encode()).digest())
+        request.state._auth = cached
+        return cached
     
     # Try JWT authentication first
-    if credentials:
+    if token:
         try:
-            jwt_user = get_current_user(credentials)
+            jwt_user = get_user_from_token(token)
             logger.info(f"JWT authentication successful for user: {jwt_user.get('sub')}")
-            return {
+            result = {
                 "auth_type": "jwt",
                 "user_data": jwt_user,
-                "permissions": ["full_access"]  # JWT users have full access
+                "permissions": _FULL_ACCESS_LIST,  # JWT users have full access
+                "permissions_set": _FULL_ACCESS
             }
+            with _auth_cache_lock:
+                _auth_cache[cache_key] = result
+            request.state._auth = result
+            return result
         except HTTPException as jwt_error:
             logger.debug(f"JWT authentication failed: {jwt_error.detail}")
             # Continue to API key authentication
             pass
     
     # Try API key authentication
-    api_key = request.headers.get("X-API-Key")
     if api_key:
         try:
-            key_data = validate_api_key_for_endpoint(api_key, endpoint)
+            key_data = _validate_api_key_cached(api_key, endpoint)
             logger.info(f"API key authentication successful for key: {key_data['name']}")
-            return {
-                "auth_type": "api_key",
-                "user_data": {
-                    "sub": f"api_key_{key_data['name']}",
-                    "role": "api_key",
-                    "permissions": key_data["allowed_endpoints"]
-                },
-                "key_data": key_data,
-                "permissions": key_data["allowed_endpoints"]
-            }
+            result = _api_key_auth_result(key_data)
+            with _auth_cache_lock:
+                _auth_cache[cache_key] = result
+            request.state._auth = result
+            return result
         except HTTPException as api_error:
             logger.debug(f"API key authentication failed: {api_error.detail}")
             # Continue to final error
@@ -83,14 +190,20 @@ async def get_dual_auth_user(
     )
 
 async def require_jwt_auth(
-    credentials: HTTPAuthorizationCredentials = Depends(_scheme)
+    token: Optional[str] = Depends(_bearer)
 ) -> Dict:
     """
     Require JWT authentication specifically (no API key fallback)
     
     Use this when you specifically need user session authentication
     """
-    return await get_current_user(credentials)
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    return get_user_from_token(token)
 
 async def require_api_key_auth(
     request: Request
@@ -109,18 +222,9 @@ async def require_api_key_auth(
         )
     
     endpoint = request.url.path
-    key_data = validate_api_key_for_endpoint(api_key, endpoint)
+    key_data = _validate_api_key_cached(api_key, endpoint)
     
-    return {
-        "auth_type": "api_key",
-        "user_data": {
-            "sub": f"api_key_{key_data['name']}",
-            "role": "api_key",
-            "permissions": key_data["allowed_endpoints"]
-        },
-        "key_data": key_data,
-        "permissions": key_data["allowed_endpoints"]
-    }
+    return _api_key_auth_result(key_data)
 
 def get_auth_type(auth_result: Dict) -> str:
     """Get the authentication type from the auth result"""
@@ -128,6 +232,8 @@ def get_auth_type(auth_result: Dict) -> str:
 
 def has_permission(auth_result: Dict, required_permission: str) -> bool:
     """Check if the authenticated entity has a specific permission"""
-    permissions = auth_result.get("permissions", [])
+    permissions = auth_result.get("permissions_set")
+    if permissions is None:
+        permissions = frozenset(auth_result.get("permissions", _EMPTY))
     return required_permission in permissions or "full_access" in permissions
 
@@ -1,9 +1,14 @@
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi import Depends, HTTPException, status
 from jose import jwt, JWTError
+from cachetools import TTLCache
+import hashlib
 import os
+import threading
+import time
 import datetime as dt
-from typing import Optional, List
+from functools import lru_cache
+from typing import Optional, List, Tuple
 
 _scheme = HTTPBearer()
 SECRET_KEY = os.getenv("JWT_SECRET_KEY")
@@ -12,29 +17,66 @@ if not SECRET_KEY:
     SECRET_KEY = "dev-secret-key-change-in-production"
     print("Warning: JWT_SECRET_KEY not set, using development key")
 ALGO = "HS256"
+_ALGOS = (ALGO,)
+
+# Decoded payloads of recently verified tokens, keyed by SHA-256 of the token
+# (never the raw token). Only successful decodes are stored.
+_decoded = TTLCache(maxsize=10000, ttl=30)
+_decoded_lock = threading.Lock()
+
+def _decode_token(token: str, _key=SECRET_KEY, _algos=_ALGOS, _decode=jwt.decode) -> dict:
+    # Defaults bind the key, algorithms and decoder as locals for the hot path.
+    # Kept off get_current_user, where FastAPI would expose them as query params.
+    return _decode(token, _key, algorithms=_algos)
 
 def get_current_user(
     cred: HTTPAuthorizationCredentials = Depends(_scheme)
 ):
-    token = cred.credentials
+    return get_user_from_token(cred.credentials)
+
+def get_user_from_token(token: str) -> dict:
+    """Verify a raw bearer token and return its payload (for callers that parse the header themselves)"""
+    cache_key = hashlib.sha256(token.encode()).digest()
+    with _decoded_lock:
+        payload = _decoded.get(cache_key)
+    if payload is not None:
+        # Cached entries skip decode, so check expiry here
+        if payload.get("exp") is None or payload["exp"] > time.time():
+            return dict(payload)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired token"
+        )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGO])
+        payload = _decode_token(token)
         if payload.get("sub") is None:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+        with _decoded_lock:
+            _decoded[cache_key] = payload
         # Optionally check for user type/role here
         # Example: allow both SME and student users
         # role = payload.get("role")
         # if role not in ("sme", "student"):
         #     raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User not permitted")
-        return payload  # Pass full payload downstream if you need role/scope
+        return dict(payload)  # Pass full payload downstream if you need role/scope
     except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired token"
         )
 
-def require_roles(allowed_roles: List[str]):
-    """Dependency to require specific roles"""
+# Tokens issued to this user before roles existed are treated as admin
+LEGACY_ADMIN_SUBJECT = "sme@durranis.ai"
+
+@lru_cache(maxsize=32)
+def require_roles(allowed_roles: Tuple[str, ...]):
+    """Dependency to require specific roles
+    
+    Cached per roles tuple, so every route asking for the same roles shares one
+    dependency callable (and FastAPI's per-request dependency cache).
+    """
+    allowed = frozenset(allowed_roles)
+    
     def role_checker(current_user: dict = Depends(get_current_user)):
         user_role = current_user.get("role")
         
@@ -42,7 +84,7 @@ def require_roles(allowed_roles: List[str]):
         if not user_role:
             # Check if this is the SME user (backward compatibility)
             username = current_user.get("sub")
-            if username == "sme@durranis.ai":
+            if username == LEGACY_ADMIN_SUBJECT:
                 user_role = "admin"
             else:
                 raise HTTPException(
@@ -50,15 +92,15 @@ def require_roles(allowed_roles: List[str]):
                     detail="User role not found in token"
                 )
         
-        if user_role not in allowed_roles:
+        if user_role not in allowed:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
-                detail=f"User role '{user_role}' not permitted. Allowed roles: {allowed_roles}"
+                detail=f"User role '{user_role}' not permitted. Allowed roles: {list(allowed_roles)}"
             )
         return current_user
     return role_checker
 
 # Convenience functions for common role requirements
-require_admin = require_roles(["admin"])
-require_student = require_roles(["student"])
-require_any_user = require_roles(["admin", "student"]) 
\ No newline at end of file
+require_admin = require_roles(("admin",))
+require_student = require_roles(("student",))
+require_any_user = require_roles(("admin", "student")) 
\ No newline at end of file
@@ -1,5 +1,5 @@
 from fastapi import FastAPI, Request, Depends, HTTPException
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import ORJSONResponse, FileResponse, Response
 from fastapi.openapi.docs import get_swagger_ui_html
 from fastapi.openapi.utils import get_openapi
 from fastapi.security import OAuth2PasswordBearer
@@ -8,6 +8,14 @@ import os
 from datetime import datetime
 import json
 import sys
+import traceback
+import logging
+import itertools
+import asyncio
+import importlib
+import orjson
+from functools import lru_cache
+from typing import Optional
 
 from app.config.settings import (
     API_TITLE, API_VERSION, API_DESCRIPTION,
@@ -16,22 +24,10 @@ from app.config.settings import (
 )
 from app.models.notes import Base
 from app.models.model_paper_prediction import ModelPaperPrediction
-from app.routers import (
-    documents,
-    videos,
-    folders,
-    ai,
-    health,
-    auth,
-    model_papers,
-    notes,
-    model_paper_predictions,
-    admin,
-    admin_users,
-    curriculum,
-)
 from app.routers.auth import get_current_user, oauth2_scheme
 
+logger = logging.getLogger(__name__)
+
 # Toggle verbose startup/router debug logs via env
 ENABLE_DEBUG_LOGS = os.getenv("ENABLE_DEBUG_LOGS", "false").lower() == "true"
 
@@ -39,6 +35,40 @@ def debug_log(message: str):
     if ENABLE_DEBUG_LOGS:
         print(message)
 
+# Last formatted timestamp and the time it was taken; probes and test endpoints
+# only need ~100ms resolution, so the isoformat string is reused within a bucket
+_ts_cache = ["", 0.0]
+
+def now_iso() -> str:
+    """Current local time as an ISO string, refreshed at most every 100ms"""
+    t = time.time()
+    if t - _ts_cache[1] > 0.1:
+        _ts_cache[:] = [datetime.fromtimestamp(t).isoformat(), t]
+    return _ts_cache[0]
+
+# Only responses that are safe to reuse opt in to client caching
+_STATIC_CACHE_HEADERS = {"Cache-Control": "private, max-age=30", "Vary": "Authorization"}
+
+def _json_bytes_response(body: bytes, headers: Optional[dict] = None) -> Response:
+    """Wrap pre-encoded JSON; a fresh Response per request since middleware edits headers"""
+    return Response(content=body, media_type="application/json", headers=headers)
+
+class _TimestampedBody:
+    """JSON body for a fixed payload, re-encoded only when the now_iso() tick changes"""
+    __slots__ = ("_payload", "_ts", "_body")
+
+    def __init__(self, payload: dict):
+        self._payload = payload
+        self._ts = None
+        self._body = b""
+
+    def response(self, headers: Optional[dict] = None) -> Response:
+        ts = now_iso()
+        if ts is not self._ts:
+            self._body = orjson.dumps({**self._payload, "timestamp": ts})
+            self._ts = ts
+        return _json_bytes_response(self._body, headers)
+
 # Create FastAPI app with enhanced OpenAPI configuration
 app = FastAPI(
     title=API_TITLE,
@@ -48,6 +78,7 @@ app = FastAPI(
     redoc_url="/redoc",    # Enable ReDoc docs
     openapi_url="/openapi.json",  # Explicitly set OpenAPI JSON URL
     swagger_ui_parameters={"defaultModelsExpandDepth": -1},  # Collapse models by default
+    default_response_class=ORJSONResponse,  # orjson for every dict-returning endpoint
 )
 
 # Startup event will be defined later with router registration
@@ -107,18 +138,41 @@ async def add_security_headers(request: Request, call_next):
     
     return response
 
-# Add request timing middleware
+# Error IDs only need to be unique for log correlation; a randomly seeded
+# counter avoids a urandom syscall per failed request
+_ERROR_ID_COUNTER = itertools.count(int.from_bytes(os.urandom(4), "big"))
+
+# Add request timing and error handling middleware (one layer for both)
 @app.middleware("http")
 async def add_timing_middleware(request: Request, call_next):
     start_time = time.time()
-    response = await call_next(request)
+    try:
+        response = await call_next(request)
+    except Exception as e:
+        error_id = f"ERR-{int(time.time())}-{next(_ERROR_ID_COUNTER) & 0xFFFFFFFF:08x}"
+        
+        # Log the error with more details (traceback included by logger.exception)
+        logger.exception(
+            "%s: %s %s raised %s: %s",
+            error_id, request.method, request.url, type(e).__name__, e
+        )
+        
+        # Return a more informative error response
+        error_detail = str(e) if not IS_PRODUCTION else "Internal server error"
+        
+        return ORJSONResponse(
+            status_code=500,
+            content={
+                "error": "Internal server error",
+                "error_id": error_id,
+                "detail": error_detail,
+                "timestamp": now_iso(),
+                "path": str(request.url.path),
+                "method": request.method
+            }
+        )
     process_time = time.time() - start_time
     response.headers["X-Process-Time"] = str(process_time)
-    
-    # Add cache headers for GET requests to reduce redundant requests
-    if request.method == "GET" and process_time < 1.0:  # Only cache fast responses
-        response.headers["Cache-Control"] = "private, max-age=30"  # 30 second cache
-    
     return response
 
 
@@ -127,15 +181,12 @@ async def add_timing_middleware(request: Request, call_next):
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """Global exception handler"""
-    import logging
-    logger = logging.getLogger(__name__)
-    
     # Log full error details server-side
-    logger.error(f"Unhandled exception: {str(exc)}", exc_info=True)
+    logger.error("Unhandled exception: %s", exc, exc_info=exc)
     
     # Don't expose error details in production
     if IS_PRODUCTION:
-        return JSONResponse(
+        return ORJSONResponse(
             content={
                 "detail": "Internal server error"
             },
@@ -143,7 +194,7 @@ async def global_exception_handler(request: Request, exc: Exception):
         )
     else:
         # In development, show more details
-        return JSONResponse(
+        return ORJSONResponse(
             content={
                 "detail": "Internal server error",
                 "error_type": type(exc).__name__,
@@ -156,137 +207,123 @@ async def global_exception_handler(request: Request, exc: Exception):
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
     """Handle HTTPException"""
-    print(f"[ERROR] HTTPException: {exc.status_code} - {exc.detail}")
+    logger.warning("HTTPException: %s - %s", exc.status_code, exc.detail)
     
-    return JSONResponse(
+    return ORJSONResponse(
         content={"detail": exc.detail},
         status_code=exc.status_code
     )
 
-# Add error handling middleware
-@app.middleware("http")
-async def error_handling_middleware(request: Request, call_next):
-    try:
-        return await call_next(request)
-    except Exception as e:
-        error_id = f"ERR-{int(datetime.now().timestamp())}-{os.urandom(4).hex()}"
-        
-        # Log the error with more details
-        print(f"[ERROR] {error_id}: {str(e)}")
-        print(f"[ERROR] Request URL: {request.url}")
-        print(f"[ERROR] Request method: {request.method}")
-        print(f"[ERROR] Error type: {type(e).__name__}")
-        
-        # Import traceback for better error reporting
-        import traceback
-        print(f"[ERROR] Traceback: {traceback.format_exc()}")
-        
-        # Return a more informative error response
-        error_detail = str(e) if not IS_PRODUCTION else "Internal server error"
-        
-        return JSONResponse(
-            status_code=500,
-            content={
-                "error": "Internal server error",
-                "error_id": error_id,
-                "detail": error_detail,
-                "timestamp": datetime.now().isoformat(),
-                "path": str(request.url.path),
-                "method": request.method
-            }
-        )
+# Routers to register, in order, as (module path, prefix)
+ROUTERS = (
+    ("app.routers.ai", ""),
+    ("app.routers.documents", ""),
+    ("app.routers.videos", ""),
+    ("app.routers.folders", ""),
+    ("app.routers.health", ""),
+    ("app.routers.auth", ""),
+    ("app.routers.model_papers", ""),
+    ("app.routers.notes", ""),
+    ("app.routers.model_paper_predictions", ""),
+    ("app.routers.dashboard", ""),
+    ("app.routers.curriculum", ""),
+    ("app.routers.admin", ""),
+    ("app.routers.admin_users", ""),
+)
+
+# Successfully registered routers by module path
+_registered_routers = {}
 
-# Register routers directly with error handling
+# Register routers with per-router error handling, so one failing import
+# doesn't take the rest down with it
 debug_log(f"[ROUTER_DEBUG] Starting router registration...")
 
-try:
-    debug_log(f"[ROUTER_DEBUG] Registering AI router...")
-    from app.routers.ai import router as ai_router
-    app.include_router(ai_router, prefix="")
-    debug_log(f"[ROUTER_DEBUG] ✓ AI router registered successfully")
-    
-    # Verify the route was added
-    ai_routes = [route for route in app.routes if hasattr(route, 'path') and '/api/ai' in route.path]
-    debug_log(f"[ROUTER_DEBUG] AI routes found after registration: {len(ai_routes)}")
-    for route in ai_routes:
-        debug_log(f"[ROUTER_DEBUG]   {route.path} - {list(route.methods)}")
-        
-except Exception as e:
-    print(f"[ROUTER_ERROR] Failed to register AI router: {str(e)}")
-    print(f"[ROUTER_ERROR] Exception type: {type(e).__name__}")
-    import traceback
-    traceback.print_exc()
-
-try:
-    debug_log(f"[ROUTER_DEBUG] Registering other routers...")
-    from app.routers.documents import router as documents_router
-    from app.routers.videos import router as videos_router
-    from app.routers.folders import router as folders_router
-    from app.routers.health import router as health_router
-    from app.routers.auth import router as auth_router
-    from app.routers.model_papers import router as model_papers_router
-    from app.routers.notes import router as notes_router
-    from app.routers.model_paper_predictions import router as model_paper_predictions_router
-    from app.routers.dashboard import router as dashboard_router
-    from app.routers.curriculum import router as curriculum_router
-    
-    app.include_router(documents_router, prefix="")
-    app.include_router(videos_router, prefix="")
-    app.include_router(folders_router, prefix="")
-    app.include_router(health_router, prefix="")
-    app.include_router(auth_router, prefix="")
-    app.include_router(model_papers_router, prefix="")
-    app.include_router(notes_router, prefix="")
-    app.include_router(model_paper_predictions_router, prefix="")
-    app.include_router(dashboard_router, prefix="")
-    app.include_router(curriculum_router, prefix="")
-    app.include_router(admin.router, prefix="")
-    app.include_router(admin_users.router, prefix="")
-    debug_log(f"[ROUTER_DEBUG] ✓ All other routers registered successfully")
-    
-    # Verify curriculum router was registered
-    curriculum_routes = [route for route in app.routes if hasattr(route, 'path') and '/api/curriculum' in route.path]
-    debug_log(f"[ROUTER_DEBUG] Curriculum routes found: {len(curriculum_routes)}")
-    for route in curriculum_routes:
-        debug_log(f"[ROUTER_DEBUG]   {route.path} - {list(route.methods)}")
-except Exception as e:
-    print(f"[ROUTER_ERROR] Failed to register other routers: {str(e)}")
-    print(f"[ROUTER_ERROR] Exception type: {type(e).__name__}")
-    import traceback
-    traceback.print_exc()
+for mod_path, prefix in ROUTERS:
+    try:
+        router = importlib.import_module(mod_path).router
+        app.include_router(router, prefix=prefix)
+        _registered_routers[mod_path] = router
+        debug_log(f"[ROUTER_DEBUG] ✓ {mod_path} registered ({len(router.routes)} routes)")
+    except Exception as e:
+        print(f"[ROUTER_ERROR] Failed to register {mod_path}: {str(e)}")
+        print(f"[ROUTER_ERROR] Exception type: {type(e).__name__}")
+        traceback.print_exc()
 
 debug_log(f"[ROUTER_DEBUG] Router registration complete")
 debug_log(f"[ROUTER_DEBUG] Total routes: {len([r for r in app.routes if hasattr(r, 'path')])}")
 
+# Per-process facts reported by the health endpoints
+_ENV = os.getenv("ENV", "unknown")
+_PYVER = sys.version
+
+def _check_cors_origins() -> list:
+    issues = []
+    for origin in CORS_ORIGINS:
+        if ';' in origin or ',' in origin:
+            issues.append(f"Invalid origin format: {origin}")
+        elif not (origin.startswith('http://') or origin.startswith('https://')):
+            issues.append(f"Invalid origin protocol: {origin}")
+    return issues
+
+# CORS_ORIGINS is fixed at import, so it is validated once
+_CORS_ISSUES = _check_cors_origins()
+_CORS_STATUS = "unhealthy" if _CORS_ISSUES else "healthy"
+
+# Bodies for the static probe/test endpoints, encoded once at import
+_ROOT_BODY = orjson.dumps({"msg": "Welcome"})
+_CORS_PREFLIGHT_BODY = orjson.dumps({"message": "CORS preflight handled"})
+_AUTH_PREFLIGHT_BODY = orjson.dumps({"message": "Auth test CORS preflight handled"})
+_HEALTH_BODY = _TimestampedBody({"status": "healthy", "timestamp": None})
+_HEALTH_TEST_BODY = _TimestampedBody({
+    "status": "healthy",
+    "timestamp": None,
+    "environment": _ENV,
+    "python_version": _PYVER,
+    "data_dir": DATA_DIR,
+    "vector_stores_dir": VECTOR_STORES_DIR,
+    "videos_dir": VIDEOS_DIR
+})
+_TEST_BODY = _TimestampedBody({
+    "message": "Backend is running!",
+    "timestamp": None,
+    "cors_origins": CORS_ORIGINS,
+    "frontend_url": "https://student-panel-staging-production-d927.up.railway.app",
+    "environment": _ENV
+})
+_CORS_TEST_BODY = _TimestampedBody({
+    "message": "CORS test successful",
+    "timestamp": None,
+    "cors_working": True,
+    "cors_origins": CORS_ORIGINS
+})
+_AUTH_TEST_BODY = _TimestampedBody({
+    "message": "Auth test endpoint accessible",
+    "timestamp": None,
+    "auth_router_status": "working"
+})
+_TEST_CORS_BODY = _TimestampedBody({
+    "message": "CORS is working!",
+    "timestamp": None,
+    "status": "success"
+})
+
 # Root endpoint
 @app.get("/")
 async def root():
     """Root endpoint"""
-    return {"msg": "Welcome"}
+    return _json_bytes_response(_ROOT_BODY, _STATIC_CACHE_HEADERS)
 
 # Health check endpoint
 @app.get("/health")
 async def health_check():
     """Simple health check"""
-    return {"status": "healthy", "timestamp": datetime.now().isoformat()}
+    return _HEALTH_BODY.response()
 
 # Comprehensive health check endpoint
 @app.get("/health/detailed")
 async def detailed_health_check():
     """Detailed health check with CORS and configuration validation"""
     try:
-        # Check CORS configuration
-        cors_status = "healthy"
-        cors_issues = []
-        
-        for origin in CORS_ORIGINS:
-            if ';' in origin or ',' in origin:
-                cors_status = "unhealthy"
-                cors_issues.append(f"Invalid origin format: {origin}")
-            elif not (origin.startswith('http://') or origin.startswith('https://')):
-                cors_status = "unhealthy"
-                cors_issues.append(f"Invalid origin protocol: {origin}")
-        
         # Check directory access
         dir_status = "healthy"
         dir_issues = []
@@ -300,17 +337,17 @@ async def detailed_health_check():
                 dir_issues.append(f"{dir_name} directory not accessible: {dir_path}")
         
         # Overall status
-        overall_status = "healthy" if cors_status == "healthy" and dir_status == "healthy" else "unhealthy"
+        overall_status = "healthy" if _CORS_STATUS == "healthy" and dir_status == "healthy" else "unhealthy"
         
         return {
             "status": overall_status,
-            "timestamp": datetime.now().isoformat(),
-            "environment": os.getenv("ENV", "unknown"),
-            "python_version": sys.version,
+            "timestamp": now_iso(),
+            "environment": _ENV,
+            "python_version": _PYVER,
             "cors": {
-                "status": cors_status,
+                "status": _CORS_STATUS,
                 "origins": CORS_ORIGINS,
-                "issues": cors_issues
+                "issues": _CORS_ISSUES
             },
             "directories": {
                 "status": dir_status,
@@ -329,7 +366,7 @@ async def detailed_health_check():
         return {
             "status": "unhealthy", 
             "error": str(e), 
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now_iso(),
             "error_type": type(e).__name__
         }
 
@@ -338,17 +375,9 @@ async def detailed_health_check():
 async def health_test():
     """Health test endpoint for Railway health checks"""
     try:
-        return {
-            "status": "healthy",
-            "timestamp": datetime.now().isoformat(),
-            "environment": os.getenv("ENV", "unknown"),
-            "python_version": sys.version,
-            "data_dir": DATA_DIR,
-            "vector_stores_dir": VECTOR_STORES_DIR,
-            "videos_dir": VIDEOS_DIR
-        }
+        return _HEALTH_TEST_BODY.response()
     except Exception as e:
-        return {"status": "unhealthy", "error": str(e), "timestamp": datetime.now().isoformat()}
+        return {"status": "unhealthy", "error": str(e), "timestamp": now_iso()}
 
 # Simple test endpoint (disabled in production)
 @app.get("/test")
@@ -356,13 +385,7 @@ async def test_endpoint():
     """Simple test endpoint to verify the API is working"""
     if IS_PRODUCTION:
         raise HTTPException(status_code=404, detail="Not found")
-    return {
-        "message": "Backend is running!",
-        "timestamp": datetime.now().isoformat(),
-        "cors_origins": CORS_ORIGINS,
-        "frontend_url": "https://student-panel-staging-production-d927.up.railway.app",
-        "environment": os.getenv("ENV", "unknown")
-    }
+    return _TEST_BODY.response()
 
 # CORS test endpoint (disabled in production)
 @app.get("/cors-test")
@@ -370,12 +393,7 @@ async def cors_test():
     """Test endpoint to verify CORS headers are working correctly"""
     if IS_PRODUCTION:
         raise HTTPException(status_code=404, detail="Not found")
-    return {
-        "message": "CORS test successful",
-        "timestamp": datetime.now().isoformat(),
-        "cors_working": True,
-        "cors_origins": CORS_ORIGINS
-    }
+    return _CORS_TEST_BODY.response()
 
 # OPTIONS endpoint for CORS preflight
 @app.options("/cors-test")
@@ -383,7 +401,7 @@ async def cors_test_options():
     """Handle CORS preflight for the test endpoint"""
     if IS_PRODUCTION:
         raise HTTPException(status_code=404, detail="Not found")
-    return {"message": "CORS preflight handled"}
+    return _json_bytes_response(_CORS_PREFLIGHT_BODY)
 
 # Auth test endpoint (disabled in production)
 @app.get("/auth-test")
@@ -391,11 +409,7 @@ async def auth_test_endpoint():
     """Test endpoint to verify auth router is accessible"""
     if IS_PRODUCTION:
         raise HTTPException(status_code=404, detail="Not found")
-    return {
-        "message": "Auth test endpoint accessible",
-        "timestamp": datetime.now().isoformat(),
-        "auth_router_status": "working"
-    }
+    return _AUTH_TEST_BODY.response()
 
 # OPTIONS endpoint for auth test
 @app.options("/auth-test")
@@ -403,7 +417,7 @@ async def auth_test_options():
     """Handle CORS preflight for auth test endpoint"""
     if IS_PRODUCTION:
         raise HTTPException(status_code=404, detail="Not found")
-    return {"message": "Auth test CORS preflight handled"}
+    return _json_bytes_response(_AUTH_PREFLIGHT_BODY)
 
 # Document upload endpoint
 @app.post("/api/documents/upload")
@@ -416,6 +430,13 @@ async def upload_file(user = Depends(get_current_user)):
 async def protected_route(user=Depends(get_current_user)):
     return {"message": f"Hello, {user.username}! This is a protected endpoint."}
 
+# JSON list files the routers expect to find in DATA_DIR
+DATA_FILES = ("documents.json", "videos.json")
+
+def _write_empty_json(path: str):
+    with open(path, "w") as f:
+        f.write("[]")
+
 # Startup event
 @app.on_event("startup")
 async def startup_event():
@@ -429,8 +450,8 @@ async def startup_event():
         debug_log(f"[STARTUP_DEBUG] Vector stores directory: {VECTOR_STORES_DIR}")
         debug_log(f"[STARTUP_DEBUG] CORS origins: {CORS_ORIGINS}")
         debug_log(f"[INFO] Starting application initialization...")
-        debug_log(f"[INFO] Environment: {os.getenv('ENV', 'unknown')}")
-        debug_log(f"[INFO] Python version: {os.sys.version}")
+        debug_log(f"[INFO] Environment: {_ENV}")
+        debug_log(f"[INFO] Python version: {_PYVER}")
         debug_log(f"[INFO] Working directory: {os.getcwd()}")
         debug_log(f"[INFO] Current user: {os.getuid() if hasattr(os, 'getuid') else 'unknown'}")
         
@@ -449,15 +470,17 @@ async def startup_event():
         # Initialize data files if they don't exist
         debug_log(f"[INFO] Initializing data files...")
         try:
-            if not os.path.exists(os.path.join(DATA_DIR, "documents.json")):
-                with open(os.path.join(DATA_DIR, "documents.json"), "w") as f:
-                    f.write("[]")
-                debug_log(f"[INFO] documents.json initialized")
-            
-            if not os.path.exists(os.path.join(DATA_DIR, "videos.json")):
-                with open(os.path.join(DATA_DIR, "videos.json"), "w") as f:
-                    f.write("[]")
-                debug_log(f"[INFO] videos.json initialized")
+            # One directory listing instead of a stat per file, then write any
+            # missing files concurrently off the event loop
+            with os.scandir(DATA_DIR) as entries:
+                existing = {entry.name for entry in entries}
+            missing = [name for name in DATA_FILES if name not in existing]
+            await asyncio.gather(*(
+                asyncio.to_thread(_write_empty_json, os.path.join(DATA_DIR, name))
+                for name in missing
+            ))
+            for name in missing:
+                debug_log(f"[INFO] {name} initialized")
         except Exception as e:
             print(f"[WARNING] Could not initialize some data files: {str(e)}")
             print(f"[WARNING] This is normal in Railway production environment")
@@ -473,12 +496,26 @@ async def startup_event():
             print(f"[WARNING] This may affect authentication functionality")
             # Continue anyway - app can still run
         
+        # Background jobs: warm the most recent documents' vector stores, and reap
+        # expired cache entries off the request path. Tasks are kept on app.state
+        # so they aren't garbage-collected mid-run
+        if "app.routers.ai" in _registered_routers:
+            from .routers.ai import warm_vector_stores, cache_reaper
+            app.state.vector_store_preload = asyncio.create_task(asyncio.to_thread(warm_vector_stores))
+            app.state.cache_reaper = asyncio.create_task(cache_reaper())
+        
+        # All routes are registered by now, so the schema is final. A schema error
+        # must not stop the app; /openapi.json then builds it lazily on request
+        try:
+            app.state.openapi_bytes = orjson.dumps(app.openapi())
+        except Exception as e:
+            print(f"[WARNING] Could not pre-serialize OpenAPI schema: {str(e)}")
+        
         print(f"[INFO] Application started successfully at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         
     except Exception as e:
         print(f"[ERROR] Startup failed: {str(e)}")
         print(f"[ERROR] Error type: {type(e).__name__}")
-        import traceback
         print(f"[ERROR] Traceback: {traceback.format_exc()}")
         raise e
 
@@ -488,24 +525,30 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown"""
+    reaper = getattr(app.state, "cache_reaper", None)
+    if reaper is not None:
+        reaper.cancel()
     print(f"[INFO] Application shutting down at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
 
+# FastAPI registers its own /openapi.json route at construction, which would
+# shadow the endpoint below; drop it so the pre-serialized schema is served
+app.router.routes = [
+    route for route in app.router.routes
+    if getattr(route, "path", None) != app.openapi_url
+]
+
 # Add explicit OpenAPI JSON endpoint
 @app.get("/openapi.json", include_in_schema=False)
-async def get_openapi_json():
-    """Get OpenAPI schema as JSON"""
-    schema = app.openapi()
-    return JSONResponse(
-        content=schema,
-        headers={"Content-Type": "application/json"}
-    ) 
-
-# Debug endpoint to list all registered routes (disabled in production)
-@app.get("/debug/routes")
-async def debug_routes():
-    """Debug endpoint to list all registered routes"""
-    if IS_PRODUCTION:
-        raise HTTPException(status_code=404, detail="Not found")
+async def get_openapi_json(request: Request):
+    """Get OpenAPI schema as JSON (serialized once, after startup)"""
+    openapi_bytes = getattr(request.app.state, "openapi_bytes", None)
+    if openapi_bytes is None:
+        openapi_bytes = request.app.state.openapi_bytes = orjson.dumps(request.app.openapi())
+    return Response(content=openapi_bytes, media_type="application/json")
+
+@lru_cache(maxsize=1)
+def _build_route_snapshot(route_count: int) -> bytes:
+    """Serialized /debug/routes body; route_count only keys the cache so it rebuilds if routes change"""
     routes = []
     for route in app.routes:
         if hasattr(route, 'path') and hasattr(route, 'methods'):
@@ -517,9 +560,10 @@ async def debug_routes():
             })
     
     # Also check AI router specifically
+    ai_router = _registered_routers.get("app.routers.ai")
     ai_routes = []
     try:
-        for route in ai.router.routes:
+        for route in ai_router.routes:
             if hasattr(route, 'path') and hasattr(route, 'methods'):
                 ai_routes.append({
                     "path": route.path,
@@ -529,31 +573,29 @@ async def debug_routes():
     except Exception as e:
         ai_routes = [{"error": str(e)}]
     
-    # Check if /api/ai/ask is accessible
-    ai_ask_accessible = any(
-        route.path == "/api/ai/ask" and hasattr(route, 'methods') 
-        for route in app.routes
-    )
+    paths = {r["path"] for r in routes}
+    curriculum_routes = [r for r in routes if '/api/curriculum' in r["path"]]
     
-    # Check curriculum routes
-    curriculum_routes = [r for r in routes if '/api/curriculum' in r.get('path', '')]
-    curriculum_accessible = any(
-        route.path == "/api/curriculum/validate" and hasattr(route, 'methods') 
-        for route in app.routes
-    )
-    
-    return {
+    return orjson.dumps({
         "total_routes": len(routes),
         "routes": routes,
         "ai_router_routes": ai_routes,
-        "ai_router_prefix": getattr(ai.router, 'prefix', 'No prefix'),
-        "ai_router_tags": getattr(ai.router, 'tags', []),
-        "ai_ask_accessible": ai_ask_accessible,
+        "ai_router_prefix": getattr(ai_router, 'prefix', 'No prefix'),
+        "ai_router_tags": getattr(ai_router, 'tags', []),
+        "ai_ask_accessible": "/api/ai/ask" in paths,
         "ai_ask_path": "/api/ai/ask",
         "curriculum_routes": curriculum_routes,
-        "curriculum_validate_accessible": curriculum_accessible,
+        "curriculum_validate_accessible": "/api/curriculum/validate" in paths,
         "curriculum_validate_path": "/api/curriculum/validate"
-    }
+    }, default=str)
+
+# Debug endpoint to list all registered routes (disabled in production)
+@app.get("/debug/routes")
+async def debug_routes():
+    """Debug endpoint to list all registered routes"""
+    if IS_PRODUCTION:
+        raise HTTPException(status_code=404, detail="Not found")
+    return _json_bytes_response(_build_route_snapshot(len(app.routes)))
 
 # Simple CORS test endpoint (disabled in production)
 @app.get("/test-cors")
@@ -561,11 +603,7 @@ async def test_cors():
     """Simple endpoint to test CORS functionality"""
     if IS_PRODUCTION:
         raise HTTPException(status_code=404, detail="Not found")
-    return {
-        "message": "CORS is working!",
-        "timestamp": datetime.now().isoformat(),
-        "status": "success"
-    }
+    return _TEST_CORS_BODY.response(_STATIC_CACHE_HEADERS)
 
 # Test endpoint that intentionally raises an error to test CORS headers (disabled in production)
 @app.get("/test-error")
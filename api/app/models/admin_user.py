@@ -1,8 +1,8 @@
 from datetime import date
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import BaseModel
-from sqlalchemy import Column, Date, Integer, String
+from sqlalchemy import Column, Date, DateTime, Index, Integer, String, func
 
 from ..config.database import Base
 
@@ -12,12 +12,19 @@ class AdminUser(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
-    email = Column(String, nullable=False)
+    email = Column(String, nullable=False, unique=True, index=True)
     password = Column(String, nullable=False)
     role = Column(String, nullable=False)
     status = Column(String, nullable=False, default="active")
-    joined_date = Column(Date, nullable=False, default=date.today)
+    joined_date = Column(Date, nullable=False, server_default=func.current_date())
     panel = Column(String, nullable=True)
+    # Bumped on every write; the listing's ETag is derived from it
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        # Serves the keyset-paginated listing: WHERE panel = ? AND id > ? ORDER BY id
+        Index("ix_admin_users_panel_id", "panel", "id"),
+    )
 
 
 class AdminUserBase(BaseModel):
@@ -30,7 +37,10 @@ class AdminUserBase(BaseModel):
 
 
 class AdminUserCreate(AdminUserBase):
-    pass
+    @property
+    def login_role(self) -> str:
+        """users.json role for this admin user: any admin role (e.g. "Admin - Full Access") logs in as admin"""
+        return "admin" if "admin" in self.role.lower() else "sme"
 
 
 class AdminUserUpdate(BaseModel):
@@ -53,3 +63,9 @@ class AdminUserResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class AdminUserPage(BaseModel):
+    items: List[AdminUserResponse]
+    # Pass back as after_id for the next page; None once the last page is reached
+    next_after_id: Optional[int] = None
@@ -1,12 +1,15 @@
-from sqlalchemy import Column, String, DateTime, Integer
+from sqlalchemy import Column, String, DateTime, Integer, Index
 from sqlalchemy.sql import func
 from ..config.database import Base
 
 class ContentLibrary(Base):
     __tablename__ = "content_library"
+    __table_args__ = (
+        Index("idx_content_library_topic_file_type", "topic_slug", "file_type"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    topic_slug = Column(String, nullable=False, index=True)
+    topic_slug = Column(String, nullable=False)  # leads idx_content_library_topic_file_type
     topic_name = Column(String, nullable=True)  # Human-readable topic name (e.g., "Structure of Cell")
     s3_key = Column(String, nullable=False, unique=True, index=True)
     file_type = Column(String, nullable=False)  # 'video', 'notes', 'document'
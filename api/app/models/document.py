@@ -1,5 +1,5 @@
 from typing import List, Optional, Any, Dict
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field
 from datetime import datetime
 
 class Tag(BaseModel):
@@ -11,8 +11,6 @@ class ProcessOptions(BaseModel):
     includeMetadata: bool = True
 
 class SourceMetadata(BaseModel):
-    model_config = ConfigDict(arbitrary_types_allowed=True)
-    
     source: str
     folder_structure: Optional[str] = None
     topic: Optional[str] = None
@@ -25,14 +23,10 @@ class SourceMetadata(BaseModel):
     score: Optional[float] = None
 
 class QuestionResponse(BaseModel):
-    model_config = ConfigDict(arbitrary_types_allowed=True)
-    
     answer: str
     sources: List[SourceMetadata]
 
 class QuestionInput(BaseModel):
-    model_config = ConfigDict(arbitrary_types_allowed=True)
-    
     question: str
     document_id: Optional[str] = None
     year: Optional[str] = None
@@ -40,6 +34,9 @@ class QuestionInput(BaseModel):
     unit: Optional[str] = None
     topic: Optional[str] = None
     metadata_filter: Optional[dict] = None
+    # Stream the answer as server-sent events (single-document questions only;
+    # cache hits are still returned as plain JSON)
+    stream: bool = False
 
 class DocumentSearchParams(BaseModel):
     query: Optional[str] = None
@@ -64,8 +61,6 @@ class DocumentUpdate(BaseModel):
     folderStructure: Optional[Dict[str, str]] = None
 
 class NotesGenerationRequest(BaseModel):
-    model_config = ConfigDict(arbitrary_types_allowed=True)
-    
     document_id: str
     course_name: str
     subject_name: str
@@ -76,8 +71,6 @@ class NotesGenerationRequest(BaseModel):
     quality: Optional[str] = Field("standard", description="Notes quality level: 'high_quality', 'standard', or 'fast'")
 
 class NotesGenerationResponse(BaseModel):
-    model_config = ConfigDict(arbitrary_types_allowed=True)
-    
     notes: str
     document_id: str
     generated_at: str
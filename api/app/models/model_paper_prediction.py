@@ -1,4 +1,5 @@
-from sqlalchemy import Column, String, Text, DateTime, Integer, JSON, Boolean
+from sqlalchemy import Column, String, Text, DateTime, Integer, Boolean
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
 from ..config.database import Base
 
@@ -18,7 +19,7 @@ class ModelPaperPrediction(Base):
     status = Column(String, nullable=False, default='processing')  # completed, processing, failed
     error_message = Column(Text, nullable=True)  # Error details if failed
     s3_key = Column(String, nullable=True)  # S3 key for backup storage
-    prediction_metadata = Column(JSON, nullable=True)  # Additional metadata as JSON
+    prediction_metadata = Column(JSONB, nullable=True)  # Additional metadata as JSON
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
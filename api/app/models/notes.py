@@ -1,4 +1,5 @@
-from sqlalchemy import Column, String, Text, DateTime, Integer, JSON
+from sqlalchemy import Column, String, Text, DateTime, Integer
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
 from ..config.database import Base
 
@@ -17,7 +18,7 @@ class GeneratedNotes(Base):
     content_length = Column(Integer, nullable=True)
     notes_length = Column(Integer, nullable=True)
     s3_key = Column(String, nullable=True)  # S3 key for backup storage
-    notes_metadata = Column(JSON, nullable=True)  # Additional metadata as JSON (renamed from metadata)
+    notes_metadata = Column(JSONB, nullable=True)  # Additional metadata as JSON (renamed from metadata)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, String, BigInteger
+from sqlalchemy.dialects.postgresql import JSONB
+from ..config.database import Base
+
+class PredictionStats(Base):
+    """Running counts over model_paper_predictions, maintained by a database trigger
+    (see create_prediction_stats.sql) so totals never need a COUNT(*) scan"""
+    __tablename__ = "prediction_stats"
+
+    scope = Column(String, primary_key=True)  # 'all' is the only scope for now
+    total = Column(BigInteger, nullable=False, default=0)
+    by_status = Column(JSONB, nullable=False, default=dict)  # {"completed": 12, "failed": 1, ...}
+
+    class Config:
+        from_attributes = True
@@ -1,9 +1,14 @@
-from sqlalchemy import Column, String, DateTime, Integer
+from sqlalchemy import Column, String, DateTime, Integer, Index
 from sqlalchemy.sql import func
 from ..config.database import Base
 
 class TopicMapping(Base):
     __tablename__ = "topic_mappings"
+    __table_args__ = (
+        # One mapping per university topic; also serves the upsert lookup in save_topic_mappings
+        Index("idx_topic_mappings_unique_university_topic",
+              "university_subject_code", "university_unit_number", "university_topic", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     topic_slug = Column(String, nullable=False, index=True)  # Not unique - multiple university topics can map to same PCI topic
@@ -1,40 +1,109 @@
-import json
+import atexit
 import os
-import types
+import hashlib
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Set
 
 import bcrypt
+import orjson
+from cachetools import TTLCache
 from pydantic import BaseModel
-from passlib.context import CryptContext
 import logging
 
-if not hasattr(bcrypt, "__about__"):
-    bcrypt.__about__ = types.SimpleNamespace(__version__=getattr(bcrypt, "__version__", ""))
+try:
+    import fcntl
+except ImportError:  # Windows dev machines: fall back to in-process locking only
+    fcntl = None
 
-if hasattr(bcrypt, "_bcrypt") and not hasattr(bcrypt._bcrypt, "__about__"):
-    bcrypt._bcrypt.__about__ = bcrypt.__about__
+try:
+    from argon2 import PasswordHasher
+    from argon2.exceptions import VerificationError, InvalidHashError
+except ImportError:  # argon2-cffi missing: new hashes fall back to bcrypt
+    PasswordHasher = None
 
 logger = logging.getLogger(__name__)
 
-# Password hashing
-pwd_context = CryptContext(
-    schemes=["bcrypt"],
-    deprecated="auto",
-    bcrypt__truncate_error=False
-)
-
+# Password hashing: argon2id for new hashes (argon2-cffi releases the GIL, so hashes
+# run in parallel on the threadpool); bcrypt still verifies legacy passlib-era hashes
+BCRYPT_ROUNDS = 12
 MAX_PASSWORD_BYTES = 72
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", "2"))
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST_KIB", str(19 * 1024)))
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", "1"))
+JOURNAL_COMPACT_RATIO = 10  # compact once the journal is this many times the snapshot size
+JOURNAL_COMPACT_MIN_BYTES = 64 * 1024  # ...but never for a journal smaller than this
+LAST_LOGIN_FLUSH_INTERVAL = 60.0  # seconds between batched last-login journal writes
+
+# Recent successful password verifications, so repeat logins skip the KDF. Keys are
+# a keyed BLAKE2b of (password, hash) under a per-process secret: nothing stored
+# here can be brute-forced offline faster than the password hash itself.
+_verified = TTLCache(maxsize=1024, ttl=60)
+_verified_lock = threading.Lock()
+_VERIFY_KEY = os.urandom(32)
+
+_argon2 = PasswordHasher(
+    time_cost=ARGON2_TIME_COST,
+    memory_cost=ARGON2_MEMORY_COST,
+    parallelism=ARGON2_PARALLELISM,
+    hash_len=32,
+) if PasswordHasher is not None else None
+
+def _verify_cache_key(password_bytes: bytes, hashed_password: str) -> bytes:
+    material = password_bytes + b'|' + hashed_password.encode('utf-8')
+    return hashlib.blake2b(material, key=_VERIFY_KEY, digest_size=32).digest()
+
+def clear_verify_cache():
+    """Forget cached password verifications (after any user change)"""
+    with _verified_lock:
+        _verified.clear()
+
+
+def hash_password(password: str) -> str:
+    """Hash a new password (argon2id, or bcrypt if argon2-cffi is unavailable)"""
+    if _argon2 is not None:
+        return _argon2.hash(password.encode('utf-8'))
+    return bcrypt.hashpw(
+        _normalize_password(password), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
+    ).decode('utf-8')
+
+def is_password_hash(value: str) -> bool:
+    """True for argon2/bcrypt hashes (as opposed to a legacy plaintext password)"""
+    return value.startswith('$argon2') or value[:4] in ('$2a$', '$2b$', '$2y$')
 
+def check_password(password: str, hashed_password: str) -> bool:
+    """Check a password against an argon2 or bcrypt hash (ValueError if malformed)"""
+    if hashed_password.startswith('$argon2'):
+        if _argon2 is None:
+            raise ValueError("argon2 hash found but argon2-cffi is not installed")
+        try:
+            return _argon2.verify(hashed_password, password.encode('utf-8'))
+        except VerificationError:
+            return False
+        except InvalidHashError as exc:
+            raise ValueError(str(exc))
+    # Legacy bcrypt hash: only the first 72 bytes were ever hashed
+    return bcrypt.checkpw(_normalize_password(password), hashed_password.encode('utf-8'))
 
-def _normalize_password(password: str) -> str:
+def _normalize_password(password: str) -> bytes:
+    """UTF-8 password bytes, cut to bcrypt's 72-byte limit on a character boundary"""
     password_bytes = password.encode('utf-8')
     if len(password_bytes) > MAX_PASSWORD_BYTES:
         logger.warning("Password exceeds bcrypt 72-byte limit; truncating")
-        return password_bytes[:MAX_PASSWORD_BYTES].decode('utf-8', 'ignore')
-    return password
+        # Back off over continuation bytes so a split character is dropped whole,
+        # exactly as the old decode('utf-8', 'ignore') did; existing hashes still match
+        cut = MAX_PASSWORD_BYTES
+        while cut and (password_bytes[cut] & 0xC0) == 0x80:
+            cut -= 1
+        return password_bytes[:cut]
+    return password_bytes
 
 class User:
+    __slots__ = ('username', 'email', 'password_hash', 'role', 'is_active', 'created_at', 'last_login')
+
     def __init__(self, username: str, email: str, password_hash: str, role: str = "user", is_active: bool = True):
         self.username = username
         self.email = email
@@ -74,30 +143,87 @@ class UserLoginResponse(BaseModel):
     token_type: str
     user: UserResponse
 
+def _to_response(user: User) -> UserResponse:
+    """UserResponse for one of our own User objects (trusted fields, so validation is skipped)"""
+    return UserResponse.model_construct(
+        id=user.username,
+        username=user.username,
+        email=user.email,
+        is_active=user.is_active,
+        role=user.role,
+        created_at=user.created_at,
+        last_login=user.last_login
+    )
+
+@contextmanager
+def _file_lock(lock_path: str):
+    """Exclusive advisory lock shared by every worker process writing the same file"""
+    if fcntl is None:
+        yield
+        return
+    with open(lock_path, 'w') as lk:
+        fcntl.flock(lk, fcntl.LOCK_EX)
+        yield
+
+def _user_to_record(user: User) -> Dict:
+    # datetimes stay native; orjson writes them in isoformat() form
+    return {
+        'username': user.username,
+        'email': user.email,
+        'password_hash': user.password_hash,
+        'role': user.role,
+        'is_active': user.is_active,
+        'created_at': user.created_at,
+        'last_login': user.last_login
+    }
+
+def _user_from_record(user_data: Dict) -> User:
+    user = User(
+        username=user_data['username'],
+        email=user_data['email'],
+        password_hash=user_data['password_hash'],
+        role=user_data.get('role', 'user'),
+        is_active=user_data.get('is_active', True)
+    )
+    user.created_at = datetime.fromisoformat(user_data['created_at'])
+    if user_data.get('last_login'):
+        user.last_login = datetime.fromisoformat(user_data['last_login'])
+    return user
+
 class FileBasedUserManager:
     def __init__(self, users_file: str = "users.json"):
         self.users_file = users_file
+        # Append-only JSONL of mutations since the last users_file snapshot
+        self.journal_file = users_file + ".log"
         self.users: Dict[str, User] = {}
+        # email -> first user with that email (matches the old linear scan)
+        self._email_index: Dict[str, User] = {}
+        self._lock = threading.RLock()
+        self._journal = None
+        # Usernames whose last_login changed since the last flush
+        self._last_login_dirty: Set[str] = set()
+        self._last_login_flushed = time.monotonic()
+        # get_all_users() result, dropped on any mutation
+        self._response_cache: Optional[List[UserResponse]] = None
         self.load_users()
+        atexit.register(self.flush_last_logins)
+        # Flush on a timer too, so a crash after a quiet spell loses at most one
+        # interval of login times rather than everything since the last login
+        threading.Thread(
+            target=self._flush_last_logins_periodically, name="last-login-flush", daemon=True
+        ).start()
     
     def load_users(self):
-        """Load users from JSON file"""
+        """Load users from the JSON snapshot and replay the journal over it"""
         try:
             if os.path.exists(self.users_file):
-                with open(self.users_file, 'r') as f:
-                    data = json.load(f)
-                    for user_data in data.values():
-                        user = User(
-                            username=user_data['username'],
-                            email=user_data['email'],
-                            password_hash=user_data['password_hash'],
-                            role=user_data.get('role', 'user'),
-                            is_active=user_data.get('is_active', True)
-                        )
-                        user.created_at = datetime.fromisoformat(user_data['created_at'])
-                        if user_data.get('last_login'):
-                            user.last_login = datetime.fromisoformat(user_data['last_login'])
-                        self.users[user.username] = user
+                with open(self.users_file, 'rb') as f:
+                    data = orjson.loads(f.read())  # the raw bytes are freed right after parsing
+                # Pop each record as it becomes a User, so parsed dicts are released
+                # as we go instead of living alongside the whole users table
+                for username in list(data):
+                    user = _user_from_record(data.pop(username))
+                    self.users[user.username] = user
                 logger.info(f"Loaded {len(self.users)} users from {self.users_file}")
             else:
                 logger.warning(f"Users file {self.users_file} not found")
@@ -107,61 +233,175 @@ class FileBasedUserManager:
             import traceback
             logger.error(f"Traceback: {traceback.format_exc()}")
             self.users = {}
+        
+        replayed = self._replay_journal()
+        if replayed:
+            logger.info(f"Replayed {replayed} journaled user changes")
+        
+        self._email_index = {}
+        for user in self.users.values():
+            self._email_index.setdefault(user.email, user)
+        self._response_cache = None
     
-    def save_users(self):
-        """Save users to JSON file"""
+    def _replay_journal(self) -> int:
+        """Apply journal records in order; returns how many were applied"""
+        if not os.path.exists(self.journal_file):
+            return 0
+        
+        applied = 0
         try:
-            data = {}
-            for username, user in self.users.items():
-                data[username] = {
-                    'username': user.username,
-                    'email': user.email,
-                    'password_hash': user.password_hash,
-                    'role': user.role,
-                    'is_active': user.is_active,
-                    'created_at': user.created_at.isoformat(),
-                    'last_login': user.last_login.isoformat() if user.last_login else None
-                }
-            
-            # Ensure the directory exists
-            os.makedirs(os.path.dirname(self.users_file) if os.path.dirname(self.users_file) else '.', exist_ok=True)
-            
-            with open(self.users_file, 'w') as f:
-                json.dump(data, f, indent=2)
-            
-            logger.info(f"Saved {len(self.users)} users to {self.users_file}")
+            with open(self.journal_file, 'rb') as f:
+                for line in f:
+                    try:
+                        record = orjson.loads(line)
+                    except orjson.JSONDecodeError:
+                        # A torn final line from a crash mid-write; everything before it is intact
+                        break
+                    if record['op'] == 'last_login':
+                        user = self.users.get(record['key'])
+                        if user is not None:
+                            user.last_login = datetime.fromisoformat(record['last_login'])
+                        applied += 1
+                        continue
+                    # "key" is the dict key at write time; it differs from the
+                    # username after a rename, which load_users re-keys
+                    self.users.pop(record['key'], None)
+                    if record['op'] == 'upsert':
+                        user = _user_from_record(record['user'])
+                        self.users[user.username] = user
+                    applied += 1
         except Exception as e:
-            logger.error(f"Error saving users: {str(e)}")
-            logger.error(f"Exception type: {type(e).__name__}")
-            logger.error(f"Users file path: {self.users_file}")
-            import traceback
-            logger.error(f"Traceback: {traceback.format_exc()}")
+            logger.error(f"Error replaying users journal: {str(e)}")
+        return applied
+    
+    def _journal_write(self, op: str, key: str, user: Optional[User] = None, durable: bool = False):
+        """Append one mutation to the journal; durable writes are fsynced before returning"""
+        record = {'op': op, 'key': key}
+        if user is not None:
+            record['user'] = _user_to_record(user)
+        self._journal_write_records([record], durable)
+    
+    def _journal_write_records(self, records: List[Dict], durable: bool = False):
+        with self._lock:
+            try:
+                # Same cross-process lock as save_users, so another worker can't compact
+                # (replace and remove the journal) between our reopen check and append
+                with _file_lock(self.users_file + ".lock"):
+                    if self._journal is not None and not self._journal_is_current():
+                        self._journal.close()
+                        self._journal = None
+                    if self._journal is None:
+                        os.makedirs(os.path.dirname(self.journal_file) or '.', exist_ok=True)
+                        self._journal = open(self.journal_file, 'ab')
+                    self._journal.write(b''.join(orjson.dumps(record) + b'\n' for record in records))
+                    self._journal.flush()
+                    if durable:
+                        os.fsync(self._journal.fileno())
+            except Exception as e:
+                logger.error(f"Error writing users journal: {str(e)}")
+                # Fall back to a full snapshot so the change isn't lost
+                self.save_users()
+                return
+            self._maybe_compact()
+    
+    def _journal_is_current(self) -> bool:
+        """Whether our open journal handle is still the file at journal_file"""
+        try:
+            on_disk = os.stat(self.journal_file)
+        except FileNotFoundError:
+            return False
+        ours = os.fstat(self._journal.fileno())
+        return (on_disk.st_dev, on_disk.st_ino) == (ours.st_dev, ours.st_ino)
+    
+    def _maybe_compact(self):
+        """Fold the journal into a fresh snapshot once it outgrows the snapshot"""
+        try:
+            journal_size = os.path.getsize(self.journal_file)
+            snapshot_size = os.path.getsize(self.users_file) if os.path.exists(self.users_file) else 0
+        except OSError:
+            return
+        if journal_size >= max(JOURNAL_COMPACT_MIN_BYTES, JOURNAL_COMPACT_RATIO * snapshot_size):
+            self.save_users()
+    
+    def _unindex_email(self, user: User):
+        """Drop user's email from the index, falling back to any other user sharing it
+        (caller holds self._lock)"""
+        if self._email_index.get(user.email) is not user:
+            return
+        del self._email_index[user.email]
+        for other in self.users.values():
+            if other is not user and other.email == user.email:
+                self._email_index[other.email] = other
+                break
+    
+    def save_users(self):
+        """Write a full snapshot of all users to the JSON file and truncate the journal"""
+        with self._lock:
+            try:
+                data = {}
+                for username, user in self.users.items():
+                    data[username] = _user_to_record(user)
+                
+                # Ensure the directory exists
+                os.makedirs(os.path.dirname(self.users_file) if os.path.dirname(self.users_file) else '.', exist_ok=True)
+                
+                # Write a uniquely named file beside the target and swap it in, under a
+                # cross-process lock, so neither a crash nor a concurrent worker can
+                # leave a torn snapshot
+                with _file_lock(self.users_file + ".lock"):
+                    with tempfile.NamedTemporaryFile(
+                        dir=os.path.dirname(self.users_file) or '.', delete=False
+                    ) as f:
+                        f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+                        f.flush()
+                        os.fsync(f.fileno())
+                    try:
+                        os.replace(f.name, self.users_file)
+                    except OSError:
+                        os.remove(f.name)
+                        raise
+                
+                logger.info(f"Saved {len(self.users)} users to {self.users_file}")
+            except Exception as e:
+                # Keep the journal so nothing is lost
+                logger.error(f"Error saving users: {str(e)}")
+                logger.error(f"Exception type: {type(e).__name__}")
+                logger.error(f"Users file path: {self.users_file}")
+                import traceback
+                logger.error(f"Traceback: {traceback.format_exc()}")
+                return
+            
+            # Everything in the journal (and every pending last login) is now part of the snapshot
+            self._last_login_dirty.clear()
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+            if os.path.exists(self.journal_file):
+                os.remove(self.journal_file)
     
     def create_user(self, username: str, email: str, password: str, role: str = "user") -> UserResponse:
-        """Create a new user"""
+        """Create a new user (safe to call from worker threads)"""
         if username in self.users:
             raise ValueError("Username already exists")
         
-        normalized_password = _normalize_password(password)
-        password_hash = pwd_context.hash(normalized_password)
+        # Hash outside the lock so concurrent signups hash in parallel
+        password_hash = hash_password(password)
         
-        # Create user
-        user = User(username=username, email=email, password_hash=password_hash, role=role)
-        self.users[username] = user
-        
-        # Save to file
-        self.save_users()
+        with self._lock:
+            if username in self.users:
+                raise ValueError("Username already exists")
+            
+            # Create user
+            user = User(username=username, email=email, password_hash=password_hash, role=role)
+            self.users[username] = user
+            self._email_index.setdefault(email, user)
+            self._response_cache = None
+            
+            # Journal the change (fsynced: a lost account creation is not recoverable)
+            self._journal_write('upsert', username, user, durable=True)
         
         logger.info(f"Created new user: {username}")
-        return UserResponse(
-            id=username,
-            username=user.username,
-            email=user.email,
-            is_active=user.is_active,
-            role=user.role,
-            created_at=user.created_at,
-            last_login=user.last_login
-        )
+        return _to_response(user)
     
     def get_user_by_username(self, username: str) -> Optional[User]:
         """Get user by username"""
@@ -169,87 +409,77 @@ class FileBasedUserManager:
     
     def get_user_by_email(self, email: str) -> Optional[User]:
         """Get user by email"""
-        for user in self.users.values():
-            if user.email == email:
-                return user
-        return None
+        return self._email_index.get(email)
     
     def get_all_users(self) -> List[UserResponse]:
-        """Get all users"""
-        return [
-            UserResponse(
-                id=user.username,
-                username=user.username,
-                email=user.email,
-                is_active=user.is_active,
-                role=user.role,
-                created_at=user.created_at,
-                last_login=user.last_login
-            )
-            for user in self.users.values()
-        ]
+        """Get all users (cached until the next change; treat the list as read-only)"""
+        # Under the lock: create_user runs on worker threads, and a list built
+        # before a concurrent insert must not be cached after it
+        with self._lock:
+            if self._response_cache is None:
+                self._response_cache = [_to_response(user) for user in self.users.values()]
+            return self._response_cache
     
     def update_user(self, username: str, user_data: UserUpdate) -> UserResponse:
         """Update user information"""
-        user = self.get_user_by_username(username)
-        if not user:
-            raise ValueError("User not found")
-        
-        # Update fields
-        if user_data.username is not None:
-            user.username = user_data.username
-        if user_data.email is not None:
-            user.email = user_data.email
-        if user_data.is_active is not None:
-            user.is_active = user_data.is_active
-        if user_data.role is not None:
-            user.role = user_data.role
-        
-        # Save to file
-        self.save_users()
+        with self._lock:
+            user = self.get_user_by_username(username)
+            if not user:
+                raise ValueError("User not found")
+            
+            # Update fields
+            if user_data.username is not None:
+                user.username = user_data.username
+            if user_data.email is not None:
+                self._unindex_email(user)
+                user.email = user_data.email
+                self._email_index.setdefault(user.email, user)
+            if user_data.is_active is not None:
+                user.is_active = user_data.is_active
+            if user_data.role is not None:
+                user.role = user_data.role
+            self._response_cache = None
+            
+            # Journal the change (fsynced: role/active changes are security-relevant)
+            self._journal_write('upsert', username, user, durable=True)
+        clear_verify_cache()
         
         logger.info(f"Updated user: {username}")
-        return UserResponse(
-            id=user.username,
-            username=user.username,
-            email=user.email,
-            is_active=user.is_active,
-            role=user.role,
-            created_at=user.created_at,
-            last_login=user.last_login
-        )
+        return _to_response(user)
     
     def delete_user(self, username: str) -> bool:
         """Delete a user"""
-        if username not in self.users:
-            raise ValueError("User not found")
-        
-        del self.users[username]
-        self.save_users()
+        with self._lock:
+            user = self.users.pop(username, None)
+            if user is None:
+                raise ValueError("User not found")
+            self._unindex_email(user)
+            self._response_cache = None
+            self._journal_write('delete', username, durable=True)
+        clear_verify_cache()
         
         logger.info(f"Deleted user: {username}")
         return True
     
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
-        """Verify a password against its hash while respecting bcrypt's 72-byte limit"""
+        """Verify a password against an argon2id or legacy bcrypt hash"""
         try:
-            password_bytes_len = len(plain_password.encode('utf-8'))
-            logger.debug(f"Verifying password for user hash length {len(hashed_password)}; input bytes={password_bytes_len}")
-            normalized_password = _normalize_password(plain_password)
-            normalized_bytes_len = len(normalized_password.encode('utf-8'))
-            if normalized_bytes_len != password_bytes_len:
-                logger.debug(f"Password normalized from {password_bytes_len} to {normalized_bytes_len} bytes")
-            return pwd_context.verify(normalized_password, hashed_password)
+            # Keyed on the full password: argon2 hashes have no 72-byte cutoff
+            password_bytes = plain_password.encode('utf-8')
+            logger.debug(f"Verifying password for user hash length {len(hashed_password)}; input bytes={len(password_bytes)}")
+            cache_key = _verify_cache_key(password_bytes, hashed_password)
+            with _verified_lock:
+                if cache_key in _verified:
+                    return True
+            # Only successes are cached; a wrong guess always pays the full KDF
+            if check_password(plain_password, hashed_password):
+                with _verified_lock:
+                    _verified[cache_key] = True
+                return True
+            return False
         except ValueError as exc:
+            # Malformed stored hash
             logger.error(f"Password verification failed: {exc}")
-            try:
-                normalized_bytes = normalized_password.encode('utf-8')
-                hashed_bytes = hashed_password.encode('utf-8')
-                if bcrypt.checkpw(normalized_bytes, hashed_bytes):
-                    logger.info("Password verified via bcrypt fallback after truncation error")
-                    return True
-            except Exception as fallback_exc:
-                logger.error(f"Fallback bcrypt verification failed: {fallback_exc}")
             return False
     
     def update_last_login(self, username: str):
@@ -257,7 +487,36 @@ class FileBasedUserManager:
         user = self.get_user_by_username(username)
         if user:
             user.last_login = datetime.utcnow()
-            self.save_users()
+            # Memory only; journaled in batches since a lost login time is harmless
+            with self._lock:
+                self._response_cache = None
+                self._last_login_dirty.add(username)
+                flush_due = time.monotonic() - self._last_login_flushed >= LAST_LOGIN_FLUSH_INTERVAL
+            if flush_due:
+                self.flush_last_logins()
+    
+    def _flush_last_logins_periodically(self):
+        while True:
+            time.sleep(LAST_LOGIN_FLUSH_INTERVAL)
+            try:
+                self.flush_last_logins()
+            except Exception as e:
+                logger.error(f"Periodic last-login flush failed: {str(e)}")
+    
+    def flush_last_logins(self):
+        """Journal buffered last-login times in one write (also registered with atexit)"""
+        with self._lock:
+            self._last_login_flushed = time.monotonic()
+            if not self._last_login_dirty:
+                return
+            records = []
+            for username in self._last_login_dirty:
+                user = self.users.get(username)
+                if user is not None and user.last_login is not None:
+                    records.append({'op': 'last_login', 'key': username, 'last_login': user.last_login})
+            self._last_login_dirty.clear()
+            if records:
+                self._journal_write_records(records)
     
     def authenticate_user(self, username: str, password: str) -> Optional[User]:
         """Authenticate a user"""
@@ -265,9 +524,8 @@ class FileBasedUserManager:
         if not user:
             return None
 
-        normalized_password = _normalize_password(password)
         logger.info(
-            f"Authenticating {username} with normalized password length {len(normalized_password.encode('utf-8'))}"
+            f"Authenticating {username} with password length {len(password.encode('utf-8'))}"
         )
 
         if not self.verify_password(password, user.password_hash):
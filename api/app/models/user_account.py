@@ -0,0 +1,17 @@
+from sqlalchemy import Column, String, DateTime, Boolean
+from ..config.database import Base
+
+class UserAccount(Base):
+    """Database mirror of the file-backed users in users.json (see models/user.py)"""
+    __tablename__ = "users"
+
+    username = Column(String, primary_key=True)
+    email = Column(String, nullable=False, index=True)
+    password_hash = Column(String, nullable=False)
+    role = Column(String, nullable=False, default="user")
+    is_active = Column(Boolean, nullable=False, default=True)
+    created_at = Column(DateTime, nullable=False)
+    last_login = Column(DateTime, nullable=True)
+
+    class Config:
+        from_attributes = True
@@ -1,15 +1,2 @@
 # This file makes the routers directory a Python package
-from . import (
-    documents,
-    videos,
-    folders,
-    ai,
-    health,
-    auth,
-    model_papers,
-    notes,
-    model_paper_predictions,
-    dashboard,
-    admin,
-    admin_users,
-)
\ No newline at end of file
+# Router modules are imported by app.main from its ROUTERS table
@@ -12,6 +12,7 @@ import logging
 
 from ..core.security import require_admin
 from ..core.api_keys import get_api_key_manager
+from ..core.dual_auth import invalidate_api_key
 
 logger = logging.getLogger(__name__)
 
@@ -132,6 +133,7 @@ async def deactivate_api_key(
         success = api_key_manager.deactivate_key(key_hash)
         
         if success:
+            invalidate_api_key(key_hash)
             logger.info(f"Admin {current_user.get('sub')} deactivated API key: {key_hash}")
             return {"message": "API key deactivated successfully"}
         else:
@@ -164,6 +166,7 @@ async def delete_api_key(
         success = api_key_manager.delete_key(key_hash)
         
         if success:
+            invalidate_api_key(key_hash)
             logger.info(f"Admin {current_user.get('sub')} deleted API key: {key_hash}")
             return {"message": "API key deleted successfully"}
         else:
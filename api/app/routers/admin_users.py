@@ -1,130 +1,292 @@
-from datetime import date
-from typing import List
+from hashlib import blake2b
+from typing import Optional
+import asyncio
 import logging
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Integer, bindparam, delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
 
-from ..config.database import get_db
+from ..config.database import DB_POOL_SIZE, AsyncSessionLocal, get_async_db
 from ..core.dual_auth import get_dual_auth_user
 from ..models.admin_user import (
     AdminUser,
     AdminUserCreate,
     AdminUserUpdate,
     AdminUserResponse,
+    AdminUserPage,
 )
-from ..models.user import user_manager
+from ..models.user import hash_password, user_manager
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/admin-users", tags=["admin-users"])
 
+# Exactly the AdminUserResponse fields: the password hash never leaves the DB on read paths
+_RESPONSE_COLUMNS = load_only(
+    AdminUser.id,
+    AdminUser.name,
+    AdminUser.email,
+    AdminUser.role,
+    AdminUser.status,
+    AdminUser.joined_date,
+    AdminUser.panel,
+)
+
+# Built once and bound per request, so every page reuses the same compiled SQL
+_LIST_SME_PAGE_STMT = (
+    select(AdminUser)
+    .options(_RESPONSE_COLUMNS)
+    .where(AdminUser.panel == "sme", AdminUser.id > bindparam("after_id", type_=Integer))
+    .order_by(AdminUser.id)
+    .limit(bindparam("limit", type_=Integer))
+)
+
+_EXPORT_SME_STMT = (
+    select(AdminUser)
+    .options(_RESPONSE_COLUMNS)
+    .where(AdminUser.panel == "sme")
+    .order_by(AdminUser.id)
+    .execution_options(yield_per=200)
+)
+
+# Writes admitted at once, leaving a few pooled connections for reads; a burst past
+# this queues briefly and then gets a 503 instead of exhausting the pool
+_WRITE_SLOTS = max(1, DB_POOL_SIZE - 5)
+_WRITE_QUEUE_TIMEOUT = 5.0  # seconds
+_write_sem = asyncio.Semaphore(_WRITE_SLOTS)
+_write_waiting = 0
+
+
+async def _write_slot():
+    """Dependency holding one write slot for the duration of the request"""
+    global _write_waiting
+    _write_waiting += 1
+    try:
+        await asyncio.wait_for(_write_sem.acquire(), timeout=_WRITE_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        logger.warning(f"Admin user write rejected: {_write_waiting} writes waiting for {_WRITE_SLOTS} slots")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many concurrent writes, please retry",
+            headers={"Retry-After": "1"},
+        )
+    finally:
+        _write_waiting -= 1
+    try:
+        yield
+    finally:
+        _write_sem.release()
+
+
+# Changes whenever an sme row is added, edited or removed: a cheap version for the ETag
+_SME_VERSION_STMT = select(func.max(AdminUser.updated_at), func.count()).where(AdminUser.panel == "sme")
+
+
+def _json_response(model, status_code: int = status.HTTP_200_OK, headers: Optional[dict] = None) -> Response:
+    """Serialize a response model once in pydantic-core (dates included), skipping
+    FastAPI's re-validation and jsonable_encoder pass; response_model stays for the docs"""
+    return Response(
+        content=model.model_dump_json(),
+        status_code=status_code,
+        media_type="application/json",
+        headers=headers,
+    )
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    return if_none_match.strip() == "*" or etag in (tag.strip() for tag in if_none_match.split(","))
+
+
+async def _write_unique_email(db: AsyncSession, stmt) -> Optional[AdminUser]:
+    """Run an INSERT/UPDATE ... RETURNING, turning a duplicate email (unique index on
+    admin_users.email) into a 409. Returns the written row, if any.
+
+    No commit here: the handler commits once its writes are done, and
+    get_async_db rolls the transaction back when the 409 propagates."""
+    try:
+        return (await db.execute(stmt)).scalar_one_or_none()
+    except IntegrityError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A user with this email already exists",
+        )
 
-@router.get("", response_model=List[AdminUserResponse])
+
+def _provision_login(email: str, password: str, role: str) -> None:
+    """Create login credentials in users.json for a new admin user.
+
+    Runs as a background task (Starlette puts sync tasks on the threadpool), so the
+    file write and password hash stay off the request path.
+    """
+    try:
+        user_manager.create_user(username=email, email=email, password=password, role=role)
+        logger.info(f"Created login credentials for user: {email}")
+    except ValueError as e:
+        # User already exists in users.json, that's okay
+        logger.warning(f"Login user already exists for {email}: {e}")
+    except Exception as e:
+        logger.error(f"Failed to create login credentials for {email}: {e}")
+
+
+@router.get("", response_model=AdminUserPage)
 async def list_admin_users(
-    db: Session = Depends(get_db),
+    request: Request,
+    limit: int = Query(50, ge=1, le=200),
+    after_id: Optional[int] = Query(None, ge=0),
+    db: AsyncSession = Depends(get_async_db),
     auth_result: dict = Depends(get_dual_auth_user),
 ):
-    """Return all admin users where panel='sme'.
+    """Return a page of admin users where panel='sme', ordered by id.
+
+    Keyset pagination: pass the previous page's next_after_id as after_id, so
+    deep pages cost the same as the first one.
+
+    Responses carry an ETag; a matching If-None-Match gets a bodiless 304, so
+    polling an unchanged list costs one aggregate query and no serialization.
 
     Authentication is required (JWT or API key via dual_auth).
     """
-    users = db.query(AdminUser).filter(AdminUser.panel == "sme").order_by(AdminUser.id).all()
-    return users
+    last_updated, row_count = (await db.execute(_SME_VERSION_STMT)).one()
+    version = f"{last_updated.isoformat() if last_updated else ''}|{row_count}|{after_id}|{limit}"
+    etag = f'"{blake2b(version.encode(), digest_size=16).hexdigest()}"'
+    if _not_modified(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    # ids start at 1, so the first page is simply "after id 0"
+    result = await db.execute(
+        _LIST_SME_PAGE_STMT, {"after_id": after_id or 0, "limit": limit}
+    )
+    users = result.scalars().all()
+    # A short page means there is nothing after it
+    next_after_id = users[-1].id if len(users) == limit else None
+    # Validate straight from the ORM rows (from_attributes)
+    page = AdminUserPage(
+        items=[AdminUserResponse.model_validate(user) for user in users],
+        next_after_id=next_after_id,
+    )
+    return _json_response(page, headers={"ETag": etag})
+
+
+async def _export_sme_ndjson():
+    # Own session rather than the request's: it has to outlive the handler while
+    # the response streams. A server-side cursor keeps only 200 rows in memory.
+    async with AsyncSessionLocal() as db:
+        users = await db.stream_scalars(_EXPORT_SME_STMT)
+        async for user in users:
+            yield AdminUserResponse.model_validate(user).model_dump_json() + "\n"
+
+
+@router.get("/export")
+async def export_admin_users(auth_result: dict = Depends(get_dual_auth_user)):
+    """Stream every admin user where panel='sme' as NDJSON (one user per line).
+
+    For exports; the UI listing stays on the paginated endpoint above.
+    """
+    return StreamingResponse(_export_sme_ndjson(), media_type="application/x-ndjson")
 
 
 @router.post("", response_model=AdminUserResponse, status_code=status.HTTP_201_CREATED)
 async def create_admin_user(
     payload: AdminUserCreate,
-    db: Session = Depends(get_db),
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db),
     auth_result: dict = Depends(get_dual_auth_user),
+    _slot: None = Depends(_write_slot),
 ):
     """Create a new admin user row in admin_users.
 
     - Maps directly from the Access Management UI fields.
-    - joined_date defaults to today.
+    - joined_date is filled in by the database (DEFAULT CURRENT_DATE).
     """
     # Normalize defaults on the server side as well
     status_value = payload.status or "active"
     panel_value = payload.panel or "sme"
 
-    user = AdminUser(
-        name=payload.name,
-        email=payload.email,
-        password=payload.password,
-        role=payload.role,
-        status=status_value,
-        joined_date=date.today(),
-        panel=panel_value,
-    )
-
-    db.add(user)
-    db.commit()
-    db.refresh(user)
-
-    # Also create login credentials in users.json so the user can log in immediately
-    try:
-        login_role = "admin" if "admin" in payload.role.lower() else "sme"
-        user_manager.create_user(
-            username=payload.email,
+    # RETURNING hands back the new row, so no refresh SELECT is needed
+    stmt = (
+        insert(AdminUser)
+        .values(
+            name=payload.name,
             email=payload.email,
-            password=payload.password,
-            role=login_role,
+            # Hashed on the threadpool; the KDF would otherwise stall the event loop
+            password=await run_in_threadpool(hash_password, payload.password),
+            role=payload.role,
+            status=status_value,
+            panel=panel_value,
         )
-        logger.info(f"Created login credentials for user: {payload.email}")
-    except ValueError as e:
-        # User already exists in users.json, that's okay
-        logger.warning(f"Login user already exists for {payload.email}: {e}")
-    except Exception as e:
-        logger.error(f"Failed to create login credentials for {payload.email}: {e}")
+        .returning(AdminUser)
+    )
+    user = await _write_unique_email(db, stmt)
+    # Commit before responding, so a 201 means the row is durable and visible
+    await db.commit()
+
+    # Also create login credentials in users.json, after the response is sent
+    background_tasks.add_task(_provision_login, payload.email, payload.password, payload.login_role)
 
-    return user
+    return _json_response(AdminUserResponse.model_validate(user), status.HTTP_201_CREATED)
 
 
 @router.put("/{user_id}", response_model=AdminUserResponse)
 async def update_admin_user(
     user_id: int,
     payload: AdminUserUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     auth_result: dict = Depends(get_dual_auth_user),
+    _slot: None = Depends(_write_slot),
 ):
     """Update an existing admin user.
 
     Any provided field will overwrite the existing value.
     """
-    user = db.query(AdminUser).filter(AdminUser.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    # Fields left out (or sent as null) keep their current values
+    changes = payload.model_dump(exclude_unset=True, exclude_none=True)
+    if changes.get("password") == "":
+        # An empty password means "keep the current one"
+        del changes["password"]
 
-    if payload.name is not None:
-        user.name = payload.name
-    if payload.email is not None:
-        user.email = payload.email
-    if payload.password is not None and payload.password != "":
-        user.password = payload.password
-    if payload.role is not None:
-        user.role = payload.role
-    if payload.status is not None:
-        user.status = payload.status
-    if payload.panel is not None:
-        user.panel = payload.panel
+    if "password" in changes:
+        changes["password"] = await run_in_threadpool(hash_password, changes["password"])
 
-    db.commit()
-    db.refresh(user)
-    return user
+    if changes:
+        # One UPDATE ... RETURNING instead of SELECT, UPDATE, then refresh SELECT
+        stmt = (
+            update(AdminUser)
+            .where(AdminUser.id == user_id)
+            .values(**changes)
+            .returning(AdminUser)
+        )
+        user = await _write_unique_email(db, stmt)
+    else:
+        user = await db.get(AdminUser, user_id)
+
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    await db.commit()
+    return _json_response(AdminUserResponse.model_validate(user))
 
 
 @router.delete("/{user_id}")
 async def delete_admin_user(
     user_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     auth_result: dict = Depends(get_dual_auth_user),
+    _slot: None = Depends(_write_slot),
 ):
     """Delete an admin user from the table."""
-    user = db.query(AdminUser).filter(AdminUser.id == user_id).first()
-    if not user:
+    # One atomic round trip; no row back means there was nothing to delete
+    deleted = (
+        await db.execute(delete(AdminUser).where(AdminUser.id == user_id).returning(AdminUser.id))
+    ).scalar_one_or_none()
+    if deleted is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    await db.commit()
 
-    db.delete(user)
-    db.commit()
     return {"message": "User deleted"}
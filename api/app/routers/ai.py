@@ -1,6 +1,6 @@
 # Import all required modules cleanly
 from fastapi import APIRouter, HTTPException, Body, Depends, UploadFile, File
-from fastapi.responses import JSONResponse, Response
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from typing import List, Optional, Dict, Any
 import os
 import json
@@ -8,8 +8,11 @@ import shutil
 from datetime import datetime
 from functools import lru_cache
 import hashlib
+import orjson
+import threading
 import time
 import logging
+from cachetools import TTLCache
 
 # LangChain imports
 from langchain_openai import ChatOpenAI
@@ -30,6 +33,9 @@ from app.core.security import get_current_user
 from app.core.dual_auth import get_dual_auth_user
 from app.models.document import QuestionInput, QuestionResponse, SourceMetadata
 from app.utils.file_utils import load_json
+from app.utils.semantic_cache import SemanticCache
+from app.utils.embed_batcher import embed_batcher
+from app.utils.tiered_cache import TieredCache
 from app.utils.vector_store import (
     get_embeddings, load_vector_store, verify_document_processed
 )
@@ -47,8 +53,9 @@ from app.utils.s3_utils import (
 from fastapi.middleware.cors import CORSMiddleware
 import math
 import asyncio
+import numpy as np
 
-
+logger = logging.getLogger(__name__)
 
 router = APIRouter(
     prefix="/api/ai",
@@ -59,7 +66,7 @@ router = APIRouter(
 async def health_check(auth_result: dict = Depends(get_dual_auth_user)):
     """Health check endpoint to verify vector store loading capabilities"""
     try:
-        print(f"[HEALTH_CHECK] Health check requested at {datetime.now().isoformat()}")
+        logger.debug("Health check requested at %s", datetime.now().isoformat())
         
         # Test environment variables
         env_status = {
@@ -74,19 +81,19 @@ async def health_check(auth_result: dict = Depends(get_dual_auth_user)):
         try:
             embeddings = get_embeddings()
             embeddings_status = "working"
-            print(f"[HEALTH_CHECK] ✓ Embeddings loaded successfully")
+            logger.debug("✓ Embeddings loaded successfully")
         except Exception as e:
             embeddings_status = f"failed: {str(e)}"
-            print(f"[HEALTH_CHECK] ✗ Embeddings failed: {str(e)}")
+            logger.debug("✗ Embeddings failed: %s", e)
         
         # Test S3 connection (if available)
         try:
             templates = list_available_templates()
             s3_status = "working"
-            print(f"[HEALTH_CHECK] ✓ S3 connection successful")
+            logger.debug("✓ S3 connection successful")
         except Exception as e:
             s3_status = f"failed: {str(e)}"
-            print(f"[HEALTH_CHECK] ✗ S3 connection failed: {str(e)}")
+            logger.debug("✗ S3 connection failed: %s", e)
         
         result = {
             "status": "healthy",
@@ -97,11 +104,11 @@ async def health_check(auth_result: dict = Depends(get_dual_auth_user)):
             "vector_store_cache_size": len(vector_store_cache)
         }
         
-        print(f"[HEALTH_CHECK] Health check completed successfully")
+        logger.debug("Health check completed successfully")
         return result
         
     except Exception as e:
-        print(f"[HEALTH_CHECK] ✗ Health check failed: {str(e)}")
+        logger.debug("✗ Health check failed: %s", e)
         
         return {
             "status": "unhealthy",
@@ -113,7 +120,7 @@ async def health_check(auth_result: dict = Depends(get_dual_auth_user)):
 async def test_basic_functionality(auth_result: dict = Depends(get_dual_auth_user)):
     """Basic test endpoint to check if the service is running"""
     try:
-        print(f"[BASIC_TEST] Basic test requested at {datetime.now().isoformat()}")
+        logger.debug("Basic test requested at %s", datetime.now().isoformat())
         
         # Test basic Python functionality
         test_result = {
@@ -125,11 +132,11 @@ async def test_basic_functionality(auth_result: dict = Depends(get_dual_auth_use
             "env_access": "working"
         }
         
-        print(f"[BASIC_TEST] Basic test completed successfully")
+        logger.debug("Basic test completed successfully")
         return test_result
         
     except Exception as e:
-        print(f"[BASIC_TEST] ✗ Basic test failed: {str(e)}")
+        logger.debug("✗ Basic test failed: %s", e)
         
         return {
             "status": "basic_test_failed",
@@ -141,10 +148,10 @@ async def test_basic_functionality(auth_result: dict = Depends(get_dual_auth_use
 async def test_vectorstore_loading(doc_id: str, auth_result: dict = Depends(get_dual_auth_user)):
     """Test endpoint to verify vector store loading for a specific document"""
     try:
-        print(f"[DEBUG] Testing vector store loading for document {doc_id}")
+        logger.debug("Testing vector store loading for document %s", doc_id)
         
         # Test vector store loading
-        vector_store = get_cached_vector_store(doc_id)
+        vector_store = await asyncio.to_thread(get_cached_vector_store, doc_id)
         
         if not vector_store:
             return {
@@ -159,9 +166,11 @@ async def test_vectorstore_loading(doc_id: str, auth_result: dict = Depends(get_
             # Test index access
             index_size = vector_store.index.ntotal if hasattr(vector_store, 'index') and vector_store.index else 0
             index_dimension = vector_store.index.d if hasattr(vector_store, 'index') and vector_store.index else 0
+            # Only IVF indexes probe a subset of clusters; flat indexes scan everything
+            index_nprobe = getattr(vector_store.index, 'nprobe', None) if hasattr(vector_store, 'index') else None
             
             # Test basic search
-            test_results = vector_store.similarity_search("test", k=1)
+            test_results = await asyncio.to_thread(vector_store.similarity_search, "test", k=1)
             search_working = len(test_results) > 0
             
             return {
@@ -169,6 +178,8 @@ async def test_vectorstore_loading(doc_id: str, auth_result: dict = Depends(get_
                 "doc_id": doc_id,
                 "index_size": index_size,
                 "index_dimension": index_dimension,
+                "index_type": type(vector_store.index).__name__,
+                "index_nprobe": index_nprobe,
                 "search_working": search_working,
                 "test_results_count": len(test_results),
                 "timestamp": datetime.now().isoformat()
@@ -183,7 +194,7 @@ async def test_vectorstore_loading(doc_id: str, auth_result: dict = Depends(get_
             }
             
     except Exception as e:
-        print(f"[ERROR] Test vector store loading failed: {str(e)}")
+        logger.error("Test vector store loading failed: %s", e)
         return {
             "status": "failed",
             "error": str(e),
@@ -194,66 +205,50 @@ async def test_vectorstore_loading(doc_id: str, auth_result: dict = Depends(get_
 # Global documents list (will be loaded from disk)
 documents = []
 
+# Caches below are TTLCaches: expired entries are evicted lazily on access and the
+# size caps bound memory, so nothing has to sweep them on every request. The two
+# answer caches are also mirrored to Redis when REDIS_URL is set (see TieredCache)
+
 # Cache for frequently asked questions
-question_cache: Dict[str, dict] = {}
 CACHE_TTL = 3600  # 1 hour cache TTL
+question_cache: TieredCache = TieredCache(maxsize=10000, ttl=CACHE_TTL, prefix="ai:q")
 
 # Add a response cache to store recent responses
-response_cache = {}
 RESPONSE_CACHE_TTL = 3600  # 1 hour
+response_cache: TieredCache = TieredCache(maxsize=10000, ttl=RESPONSE_CACHE_TTL, prefix="ai:resp")
 
-# Vector store cache with proper cleanup
-vector_store_cache: Dict[str, Any] = {}
+# Vector store cache: FAISS indices are heavy, so keep only a few (LRU beyond that)
 VECTOR_STORE_CACHE_TTL = 1800  # 30 minutes cache TTL
-vector_store_timestamps: Dict[str, float] = {}
+VECTOR_STORE_CACHE_MAX = 8
+VECTOR_STORE_PRELOAD = int(os.getenv("VECTOR_STORE_PRELOAD", "4"))  # warmed at startup
+vector_store_cache: TTLCache = TTLCache(maxsize=VECTOR_STORE_CACHE_MAX, ttl=VECTOR_STORE_CACHE_TTL)
+vector_store_cache_lock = threading.RLock()  # vector stores are also loaded from worker threads
 
 # Update the memory configuration with proper Pydantic settings
 class MemoryConfig(BaseModel):
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
 # User session management for conversation memory
-user_sessions: Dict[str, ConversationBufferWindowMemory] = {}
 USER_SESSION_TTL = 3600  # 1 hour
-user_session_timestamps: Dict[str, float] = {}
+user_sessions: TTLCache = TTLCache(maxsize=10000, ttl=USER_SESSION_TTL)
 
 def get_user_memory(user_id: str) -> ConversationBufferWindowMemory:
     """Get or create conversation memory for a user"""
-    current_time = time.time()
-    
-    # Clean up expired sessions
-    expired_users = [uid for uid, timestamp in user_session_timestamps.items() 
-                    if current_time - timestamp > USER_SESSION_TTL]
-    for uid in expired_users:
-        if uid in user_sessions:
-            del user_sessions[uid]
-        if uid in user_session_timestamps:
-            del user_session_timestamps[uid]
+    memory = user_sessions.get(user_id)
     
     # Create new session if doesn't exist
-    if user_id not in user_sessions:
-        user_sessions[user_id] = ConversationBufferWindowMemory(
+    if memory is None:
+        memory = ConversationBufferWindowMemory(
             k=3,  # Keep last 3 exchanges
             return_messages=True,
             memory_key="chat_history",
             output_key="answer"
         )
-        user_session_timestamps[user_id] = current_time
     
-    # Update timestamp
-    user_session_timestamps[user_id] = current_time
+    # (Re)assigning restarts the TTL, so sessions expire an hour after last use
+    user_sessions[user_id] = memory
     
-    return user_sessions[user_id]
-
-def cleanup_expired_user_sessions():
-    """Clean up expired user sessions"""
-    current_time = time.time()
-    expired_users = [uid for uid, timestamp in user_session_timestamps.items() 
-                    if current_time - timestamp > USER_SESSION_TTL]
-    for uid in expired_users:
-        if uid in user_sessions:
-            del user_sessions[uid]
-        if uid in user_session_timestamps:
-            del user_session_timestamps[uid]
+    return memory
 
 memory = ConversationBufferMemory(
     memory_key="chat_history",
@@ -262,8 +257,14 @@ memory = ConversationBufferMemory(
     model_config=MemoryConfig.model_config
 )
 
+@lru_cache(maxsize=8)
 def get_chat_model(temperature: float = 0.3, max_tokens: Optional[int] = None, request_timeout: int = 30, max_retries: int = 2):
-    """Get chat model based on configured AI provider"""
+    """Get chat model based on configured AI provider
+    
+    One shared client per argument combination, so requests reuse its HTTP
+    connection pool instead of building a new client (and TLS session) each time.
+    Callers must not mutate the returned model.
+    """
     # Use higher token limits for comprehensive responses
     if max_tokens is None:
         if AI_PROVIDER == "google":
@@ -296,50 +297,83 @@ def get_chat_model(temperature: float = 0.3, max_tokens: Optional[int] = None, r
         )
 
 def get_cache_key(question: str, document_id: Optional[str] = None, filter_dict: Optional[dict] = None) -> str:
-    """Generate a cache key for a question"""
-    key_parts = [question, str(document_id) if document_id else "all"]
+    """Generate a cache key for a question
+    
+    Whitespace is collapsed, so questions differing only in spacing hit the exact
+    cache before anything is embedded. Case is kept: in this corpus it can carry
+    meaning ("Mg" vs "mg"); reworded questions are the semantic cache's job.
+    """
+    key_parts = [" ".join(question.split()), str(document_id) if document_id else "all"]
     if filter_dict:
         key_parts.append(json.dumps(filter_dict, sort_keys=True))
-    return hashlib.md5("|".join(key_parts).encode()).hexdigest()
+    return hashlib.blake2b("|".join(key_parts).encode(), digest_size=16).hexdigest()
 
-def cleanup_expired_caches():
-    """Clean up expired caches to prevent memory leaks"""
-    current_time = time.time()
-    
-    # Clean up question cache
-    expired_keys = []
-    for key, value in question_cache.items():
-        if (current_time - value["timestamp"]) > CACHE_TTL:
-            expired_keys.append(key)
-    
-    for key in expired_keys:
-        del question_cache[key]
-    
-    # Clean up response cache
-    expired_response_keys = []
-    for key, value in response_cache.items():
-        if (current_time - value["timestamp"]) > RESPONSE_CACHE_TTL:
-            expired_response_keys.append(key)
-    
-    for key in expired_response_keys:
-        del response_cache[key]
+# Reworded repeats of a recent question reuse its answer (matched by embedding similarity)
+semantic_cache = SemanticCache()
+
+def get_semantic_scope(document_id: Optional[str] = None, filter_dict: Optional[dict] = None) -> str:
+    """Semantic cache scope: answers are only shared for the same document and filters"""
+    return f"{document_id or 'all'}|{json.dumps(filter_dict, sort_keys=True) if filter_dict else ''}"
+
+async def embed_question(text: str) -> Optional[List[float]]:
+    """Question embedding (batched with concurrent requests), or None if embedding
+    fails; callers then skip the semantic cache and search by text"""
+    try:
+        return await embed_batcher.embed(text)
+    except Exception as e:
+        logger.warning("Could not embed question for semantic cache: %s", e)
+        return None
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {orjson.dumps(data).decode()}\n\n"
+
+async def stream_answer(chat_model, messages, question_text: str, sources: list, cache_key: str,
+                        response_id: str, user_memory, semantic_scope: str,
+                        question_vector: Optional[List[float]]):
+    """Server-sent events for an answer: a "token" event per streamed chunk, then
+    "done" with the full response once it has been cached like a non-streamed one"""
+    parts = []
+    try:
+        async for chunk in chat_model.astream(messages):
+            if chunk.content:
+                parts.append(chunk.content)
+                yield _sse("token", {"text": chunk.content})
+    except Exception as e:
+        logger.error("Streaming AI response failed: %s", e)
+        yield _sse("error", {"detail": f"Failed to get AI response: {str(e)}"})
+        return
     
-    # Clean up vector store cache
-    expired_vector_keys = []
-    for key, timestamp in vector_store_timestamps.items():
-        if (current_time - timestamp) > VECTOR_STORE_CACHE_TTL:
-            expired_vector_keys.append(key)
+    answer = "".join(parts)
+    user_memory.chat_memory.add_user_message(question_text)
+    user_memory.chat_memory.add_ai_message(answer)
     
-    for key in expired_vector_keys:
-        if key in vector_store_cache:
-            del vector_store_cache[key]
-        del vector_store_timestamps[key]
+    response = {
+        "answer": answer.strip(),
+        "sources": sources,
+        "timestamp": datetime.now().isoformat(),
+        "metadata_summary": [{"course": "", "semester": "", "unit": "", "topic": ""}]
+    }
+    cached = {"response": {**response, "question": question_text}, "timestamp": datetime.now().timestamp()}
+    question_cache[cache_key] = cached
+    response_cache[response_id] = cached
+    if question_vector is not None:
+        semantic_cache.add(semantic_scope, question_vector, cached["response"])
+    try:
+        await asyncio.to_thread(save_response_to_s3, cached["response"], response_id)
+    except Exception as s3_error:
+        logger.warning("Failed to save streamed response to S3: %s", s3_error)
     
-    # Clean up user sessions
-    cleanup_expired_user_sessions()
+    yield _sse("done", {**response, "response_id": response_id})
+
+def cleanup_expired_caches():
+    """Clean up expired caches to prevent memory leaks
     
-    if expired_keys or expired_response_keys or expired_vector_keys:
-        print(f"[CACHE_CLEANUP] Cleaned up {len(expired_keys)} question cache entries, {len(expired_response_keys)} response cache entries, {len(expired_vector_keys)} vector store cache entries")
+    The TTLCaches evict lazily on their own; only the semantic cache's FAISS
+    indices need pruning here.
+    """
+    expired_semantic = semantic_cache.prune()
+    if expired_semantic:
+        logger.debug("Cleaned up %s semantic cache entries", expired_semantic)
 
 def ensure_document_metadata(doc_obj, document_id: str, filename: str = "Unknown"):
     """Ensure Document object has proper metadata for newer LangChain versions"""
@@ -356,6 +390,34 @@ def ensure_document_metadata(doc_obj, document_id: str, filename: str = "Unknown
     
     return doc_obj
 
+# Human turn for re-formatting a cached answer with the pharmacy system prompt
+PHARMACY_REFORMAT_HUMAN_TEMPLATE = """Context:
+{context}
+
+Question:
+{question}
+
+Instructions:
+- Use ONLY the context above to answer the question.
+- Do NOT use external knowledge or inference.
+- Include only sections mentioned in the context.
+- Use <chem>, <mol>, <calc> tags only if present in the context.
+- Omit empty sections from your answer.
+"""
+
+@lru_cache(maxsize=8)
+def _build_chat_prompt(template: str) -> ChatPromptTemplate:
+    """Parsed prompt for a template string; keyed on the text, so edits to the
+    S3 template simply produce a new entry"""
+    return ChatPromptTemplate.from_template(template)
+
+@lru_cache(maxsize=8)
+def _build_reformat_prompt(system_prompt: str) -> ChatPromptTemplate:
+    return ChatPromptTemplate.from_messages([
+        ("system", system_prompt),
+        ("human", PHARMACY_REFORMAT_HUMAN_TEMPLATE)
+    ])
+
 def load_pharmacy_template():
     """Load the pharmacy prompt template from S3 (preferred) or local file (fallback)"""
     try:
@@ -574,24 +636,24 @@ Return only the formatted notes in Markdown. No explanations."""
 async def get_response(response_id: str, auth_result: dict = Depends(get_dual_auth_user)):
     """Get a cached response by ID and format it using the pharmacy prompt template"""
     try:
-        print(f"Attempting to retrieve response for ID: {response_id}")
-        print(f"Current cache keys: {list(response_cache.keys())}")
+        logger.debug("Attempting to retrieve response for ID: %s", response_id)
+        logger.debug("Response cache holds %s entries", len(response_cache))
         
-        if response_id in response_cache:
+        if await response_cache.warm(response_id):
             cached_data = response_cache[response_id]
             current_time = datetime.now().timestamp()
             cache_age = current_time - cached_data["timestamp"]
             
-            print(f"Found cached response, age: {cache_age}s")
+            logger.debug("Found cached response, age: %ss", cache_age)
             
             if cache_age < RESPONSE_CACHE_TTL:
-                print(f"Retrieved valid cached response for ID: {response_id}")
+                logger.debug("Retrieved valid cached response for ID: %s", response_id)
                 
                 # Load the pharmacy prompt template
                 try:
-                    template = load_pharmacy_template()
+                    template = await asyncio.to_thread(load_pharmacy_template)
                 except Exception as e:
-                    print(f"Error loading template: {str(e)}")
+                    logger.error("Error loading template: %s", e)
                     # If template loading fails, return the original response
                     return cached_data["response"]
                 
@@ -602,38 +664,22 @@ async def get_response(response_id: str, auth_result: dict = Depends(get_dual_au
                     
                     # Get the original response data
                     original_response = cached_data["response"]
-                    context = "\n".join([source.get("chunk_text", "") for source in original_response.get("sources", [])])
+                    # Joined once per cached entry; sources never change after insertion
+                    context = cached_data.get("joined_context")
+                    if context is None:
+                        context = "\n".join([source.get("chunk_text", "") for source in original_response.get("sources", [])])
+                        cached_data["joined_context"] = context
                     
-                    # Format the prompt using the template
-                    #template_text = load_pharmacy_template()
-                    system_prompt = load_pharmacy_template()
-                    chat_prompt = ChatPromptTemplate.from_messages([
-                        ("system", system_prompt),
-                        ("human", """Context:
-                    {context}
- 
-                    Question:
-                    {question}
- 
-                    Instructions:
-                    - Use ONLY the context above to answer the question.
-                    - Do NOT use external knowledge or inference.
-                    - Include only sections mentioned in the context.
-                    - Use <chem>, <mol>, <calc> tags only if present in the context.
-                    - Omit empty sections from your answer.
-                    """)
-                    ])
-
- 
+                    # Format the prompt using the template loaded above
+                    chat_prompt = _build_reformat_prompt(template)
                     messages = chat_prompt.format_messages(context=context, question=original_response.get('question', ''))
-                    result = chat_model.invoke(messages)
                     
                     # Add logging for context and question
-                    print(f"[DEBUG] Context being sent to AI: {context}")
-                    print(f"[DEBUG] Question: {original_response.get('question', '')}")
+                    logger.debug("Context being sent to AI: %s", context)
+                    logger.debug("Question: %s", original_response.get('question', ''))
                     
                     # Get formatted response from AI
-                    result = chat_model.invoke(messages)
+                    result = await asyncio.to_thread(chat_model.invoke, messages)
                     
                     # Create new formatted response
                     formatted_response = {
@@ -643,34 +689,34 @@ async def get_response(response_id: str, auth_result: dict = Depends(get_dual_au
                         "original_answer": original_response.get("answer", "")  # Keep original for reference
                     }
                     
-                    print(f"Formatted response using template for ID: {response_id}")
+                    logger.debug("Formatted response using template for ID: %s", response_id)
                     # PATCH: Ensure answer is always a string
                     if not isinstance(formatted_response.get("answer", ""), str):
                         formatted_response["answer"] = "Sorry, the AI could not generate a valid answer for your question."
                     return formatted_response
                     
                 except Exception as e:
-                    print(f"Error formatting response with template: {str(e)}")
+                    logger.error("Error formatting response with template: %s", e)
                     # If formatting fails, return the original response
                     response_to_return = cached_data["response"]
                     if not isinstance(response_to_return.get("answer", ""), str):
                         response_to_return["answer"] = "Sorry, the AI could not generate a valid answer for your question."
                     return response_to_return
             else:
-                print(f"Cache expired for ID: {response_id}")
+                logger.debug("Cache expired for ID: %s", response_id)
                 del response_cache[response_id]
         # Try to load from S3 if not in cache
-        print(f"[DEBUG] Response not found in cache, trying S3 for ID: {response_id}")
-        s3_response = load_response_from_s3(response_id)
+        logger.debug("Response not found in cache, trying S3 for ID: %s", response_id)
+        s3_response = await asyncio.to_thread(load_response_from_s3, response_id)
         if s3_response:
-            print(f"[DEBUG] Loaded response from S3 for ID: {response_id}")
+            logger.debug("Loaded response from S3 for ID: %s", response_id)
             return s3_response
-        print(f"Response not found in cache or S3 for ID: {response_id}")
+        logger.debug("Response not found in cache or S3 for ID: %s", response_id)
         raise HTTPException(status_code=404, detail="Response not found or expired")
     except HTTPException as http_exc:
         raise
     except Exception as e:
-        print(f"Error retrieving response: {str(e)}")
+        logger.error("Error retrieving response: %s", e)
         raise HTTPException(status_code=500, detail=f"Error retrieving response: {str(e)}")
 
 @router.post("/ask")
@@ -680,48 +726,48 @@ async def ask_question(question: QuestionInput, auth_result: dict = Depends(get_
     global documents
     
     # Immediate debugging for deployment issues
-    print(f"[DEPLOYMENT_DEBUG] ===== ASK QUESTION REQUEST START =====")
-    print(f"[DEPLOYMENT_DEBUG] Request received at: {datetime.now().isoformat()}")
-    print(f"[DEPLOYMENT_DEBUG] Question: {question.question}")
-    print(f"[DEPLOYMENT_DEBUG] Document ID: {question.document_id}")
-    print(f"[DEPLOYMENT_DEBUG] Auth type: {auth_result.get('auth_type', 'unknown')}")
-    print(f"[DEPLOYMENT_DEBUG] Authenticated user: {auth_result.get('user_data', {}).get('sub', 'unknown')}")
-    print(f"[DEPLOYMENT_DEBUG] User role: {auth_result.get('user_data', {}).get('role', 'unknown')}")
+    logger.debug("===== ASK QUESTION REQUEST START =====")
+    logger.debug("Request received at: %s", datetime.now().isoformat())
+    logger.debug("Question: %s", question.question)
+    logger.debug("Document ID: %s", question.document_id)
+    logger.debug("Auth type: %s", auth_result.get('auth_type', 'unknown'))
+    logger.debug("Authenticated user: %s", auth_result.get('user_data', {}).get('sub', 'unknown'))
+    logger.debug("User role: %s", auth_result.get('user_data', {}).get('role', 'unknown'))
     
     # Check environment variables immediately
-    print(f"[DEPLOYMENT_DEBUG] Environment check:")
-    print(f"[DEPLOYMENT_DEBUG] - AI_PROVIDER: {AI_PROVIDER}")
-    print(f"[DEPLOYMENT_DEBUG] - OPENAI_API_KEY: {'SET' if OPENAI_API_KEY and OPENAI_API_KEY != 'dummy_key_for_testing' else 'NOT_SET'}")
-    print(f"[DEPLOYMENT_DEBUG] - GOOGLE_API_KEY: {'SET' if GOOGLE_API_KEY and GOOGLE_API_KEY != 'dummy_key_for_testing' else 'NOT_SET'}")
-    print(f"[DEPLOYMENT_DEBUG] - VECTOR_STORES_DIR: {VECTOR_STORES_DIR}")
-    print(f"[DEPLOYMENT_DEBUG] - DATA_DIR: {DATA_DIR}")
+    logger.debug("Environment check:")
+    logger.debug("- AI_PROVIDER: %s", AI_PROVIDER)
+    logger.debug("- OPENAI_API_KEY: %s", 'SET' if OPENAI_API_KEY and OPENAI_API_KEY != 'dummy_key_for_testing' else 'NOT_SET')
+    logger.debug("- GOOGLE_API_KEY: %s", 'SET' if GOOGLE_API_KEY and GOOGLE_API_KEY != 'dummy_key_for_testing' else 'NOT_SET')
+    logger.debug("- VECTOR_STORES_DIR: %s", VECTOR_STORES_DIR)
+    logger.debug("- DATA_DIR: %s", DATA_DIR)
     
     # Check if we can import required modules
     try:
         from langchain_community.vectorstores import FAISS
-        print(f"[DEPLOYMENT_DEBUG] ✓ FAISS import successful")
+        logger.debug("✓ FAISS import successful")
     except Exception as e:
-        print(f"[DEPLOYMENT_DEBUG] ✗ FAISS import failed: {str(e)}")
+        logger.debug("✗ FAISS import failed: %s", e)
     
     try:
         from langchain_openai import OpenAIEmbeddings
-        print(f"[DEPLOYMENT_DEBUG] ✓ OpenAIEmbeddings import successful")
+        logger.debug("✓ OpenAIEmbeddings import successful")
     except Exception as e:
-        print(f"[DEPLOYMENT_DEBUG] ✗ OpenAIEmbeddings import failed: {str(e)}")
+        logger.debug("✗ OpenAIEmbeddings import failed: %s", e)
     
     try:
         from langchain_google_genai import GoogleGenerativeAIEmbeddings
-        print(f"[DEPLOYMENT_DEBUG] ✓ GoogleGenerativeAIEmbeddings import successful")
+        logger.debug("✓ GoogleGenerativeAIEmbeddings import successful")
     except Exception as e:
-        print(f"[DEPLOYMENT_DEBUG] ✗ GoogleGenerativeAIEmbeddings import failed: {str(e)}")
+        logger.debug("✗ GoogleGenerativeAIEmbeddings import failed: %s", e)
     
     try:
         from ..utils.s3_utils import load_documents_metadata
-        print(f"[DEPLOYMENT_DEBUG] ✓ S3 utils import successful")
+        logger.debug("✓ S3 utils import successful")
     except Exception as e:
-        print(f"[DEPLOYMENT_DEBUG] ✗ S3 utils import failed: {str(e)}")
+        logger.debug("✗ S3 utils import failed: %s", e)
     
-    print(f"[DEPLOYMENT_DEBUG] ===== ENVIRONMENT CHECK COMPLETE =====")
+    logger.debug("===== ENVIRONMENT CHECK COMPLETE =====")
     
     try:
         # Validate input
@@ -745,16 +791,16 @@ async def ask_question(question: QuestionInput, auth_result: dict = Depends(get_
                     detail="OpenAI API key not configured"
                 )
         
-        print(f"[DEBUG] API keys validated. Provider: {AI_PROVIDER}")
+        logger.debug("API keys validated. Provider: %s", AI_PROVIDER)
         
         # Load documents from S3 to ensure we have latest data
         try:
-            documents = load_documents_metadata() or []
-            print(f"[DEBUG] Loaded {len(documents)} documents from S3 metadata.")
+            documents = await asyncio.to_thread(load_documents_metadata) or []
+            logger.debug("Loaded %s documents from S3 metadata.", len(documents))
         except Exception as e:
-            print(f"[ERROR] Failed to load documents from S3: {str(e)}")
-            print(f"[ERROR] Exception type: {type(e).__name__}")
-            print(f"[ERROR] Exception details: {str(e)}")
+            logger.error("Failed to load documents from S3: %s", e)
+            logger.error("Exception type: %s", type(e).__name__)
+            logger.error("Exception details: %s", e)
             documents = []
             raise HTTPException(
                 status_code=500,
@@ -769,7 +815,7 @@ async def ask_question(question: QuestionInput, auth_result: dict = Depends(get_
                 detail="No processed documents available. Please process some documents first."
             )
         
-        print(f"[DEBUG] Found {len(processed_docs)} processed documents")
+        logger.debug("Found %s processed documents", len(processed_docs))
         
         # Validate document_id if provided
         if question.document_id:
@@ -793,16 +839,16 @@ async def ask_question(question: QuestionInput, auth_result: dict = Depends(get_
                         detail="Document is not processed. Please process the document first."
                     )
             
-            print(f"[DEBUG] Document {question.document_id} validated successfully")
+            logger.debug("Document %s validated successfully", question.document_id)
         
         try:
             # Initialize chat model with increased timeout
             chat_model = get_chat_model(request_timeout=120)  # Increased timeout to 2 minutes
-            print(f"[DEBUG] Chat model initialized successfully with provider: {AI_PROVIDER}")
+            logger.debug("Chat model initialized successfully with provider: %s", AI_PROVIDER)
         except Exception as e:
-            print(f"[ERROR] Failed to initialize chat model: {str(e)}")
-            print(f"[ERROR] Exception type: {type(e).__name__}")
-            print(f"[ERROR] Exception details: {str(e)}")
+            logger.error("Failed to initialize chat model: %s", e)
+            logger.error("Exception type: %s", type(e).__name__)
+            logger.error("Exception details: %s", e)
             raise HTTPException(
                 status_code=500,
                 detail=f"Failed to initialize AI model: {str(e)}"
@@ -823,9 +869,6 @@ async def ask_question(question: QuestionInput, auth_result: dict = Depends(get_
         if not filter_dict:
             filter_dict = None
 
-        # Clean up expired caches before processing
-        cleanup_expired_caches()
-
         # Get user ID for conversation-aware caching
         user_id = auth_result.get('user_data', {}).get('sub', 'anonymous')
         user_memory = get_user_memory(user_id)
@@ -839,19 +882,19 @@ async def ask_question(question: QuestionInput, auth_result: dict = Depends(get_
         if chat_history:
             # Create a hash of the conversation context for cache key
             conversation_text = " ".join([msg.content for msg in chat_history[-4:]])  # Last 4 messages
-            conversation_context_hash = hashlib.md5(conversation_text.encode()).hexdigest()[:8]
+            conversation_context_hash = hashlib.blake2b(conversation_text.encode(), digest_size=4).hexdigest()
         
         cache_key = get_cache_key(question.question, question.document_id, filter_dict)
         if conversation_context_hash:
             cache_key += f"_conv_{conversation_context_hash}"
         
-        response_id = hashlib.md5(cache_key.encode()).hexdigest()
+        response_id = hashlib.blake2b(cache_key.encode(), digest_size=16).hexdigest()
         
         # Check cache first (but only if no conversation context)
-        if not conversation_context_hash and cache_key in question_cache:
+        if not conversation_context_hash and await question_cache.warm(cache_key):
             cached_result = question_cache[cache_key]
             if (datetime.now().timestamp() - cached_result["timestamp"]) < CACHE_TTL:
-                print(f"Found cached response for key: {cache_key}")
+                logger.debug("Found cached response for key: %s", cache_key)
                 # Update response cache
                 response_cache[response_id] = {
                     "response": cached_result["response"],
@@ -859,26 +902,40 @@ async def ask_question(question: QuestionInput, auth_result: dict = Depends(get_
                 }
                 return cached_result["response"]
         elif conversation_context_hash:
-            print(f"[DEBUG] Bypassing cache due to conversation context: {conversation_context_hash}")
+            logger.debug("Bypassing cache due to conversation context: %s", conversation_context_hash)
+
+        # Then look for an earlier answer to a reworded version of the question
+        semantic_scope = get_semantic_scope(question.document_id, filter_dict)
+        question_vector = None
+        if not conversation_context_hash:
+            question_vector = await embed_question(question.question)
+            if question_vector is not None:
+                similar = semantic_cache.lookup(semantic_scope, question_vector)
+                if similar is not None:
+                    logger.debug("Semantic cache match for question: %s", question.question)
+                    similar = {**similar, "question": question.question}
+                    question_cache[cache_key] = {"response": similar, "timestamp": datetime.now().timestamp()}
+                    response_cache[response_id] = {"response": similar, "timestamp": datetime.now().timestamp()}
+                    return similar
 
         # Get relevant documents
         if question.document_id:
-            print(f"[DEBUG] Processing question for specific document: {question.document_id}")
+            logger.debug("Processing question for specific document: %s", question.document_id)
             
             try:
-                vector_store = get_cached_vector_store(question.document_id)
-                print(f"[DEBUG] Vector store loading attempt completed for document {question.document_id}")
+                vector_store = await asyncio.to_thread(get_cached_vector_store, question.document_id)
+                logger.debug("Vector store loading attempt completed for document %s", question.document_id)
             except Exception as vs_error:
-                print(f"[ERROR] Exception during vector store loading: {str(vs_error)}")
-                print(f"[ERROR] Exception type: {type(vs_error).__name__}")
-                print(f"[ERROR] Exception details: {str(vs_error)}")
+                logger.error("Exception during vector store loading: %s", vs_error)
+                logger.error("Exception type: %s", type(vs_error).__name__)
+                logger.error("Exception details: %s", vs_error)
                 raise HTTPException(
                     status_code=500,
                     detail=f"Failed to load vector store: {str(vs_error)}"
                 )
             
             if not vector_store:
-                print(f"[DEBUG] Vector store not found for document {question.document_id}")
+                logger.debug("Vector store not found for document %s", question.document_id)
                 # Try to provide a helpful error message
                 doc = next((d for d in documents if d["id"] == question.document_id), None)
                 if doc:
@@ -899,32 +956,32 @@ async def ask_question(question: QuestionInput, auth_result: dict = Depends(get_
                 else:
                     raise HTTPException(status_code=404, detail="Document not found")
             
-            print(f"[DEBUG] Vector store loaded successfully for document {question.document_id}")
+            logger.debug("Vector store loaded successfully for document %s", question.document_id)
             
             # Add debugging information about the vector store
             try:
-                print(f"[DEBUG] Vector store index size: {vector_store.index.ntotal}")
-                print(f"[DEBUG] Vector store dimension: {vector_store.index.d}")
-                print(f"[DEBUG] Question being searched: '{question.question}'")
-                print(f"[DEBUG] Filter dict: {filter_dict}")
+                logger.debug("Vector store index size: %s", vector_store.index.ntotal)
+                logger.debug("Vector store dimension: %s", vector_store.index.d)
+                logger.debug("Question being searched: '%s'", question.question)
+                logger.debug("Filter dict: %s", filter_dict)
             except Exception as debug_error:
-                print(f"[WARNING] Could not get vector store debug info: {str(debug_error)}")
+                logger.warning("Could not get vector store debug info: %s", debug_error)
             
             # Test if vector store can find any documents at all
             try:
-                test_results = vector_store.similarity_search("test", k=1)
-                print(f"[DEBUG] Vector store test search successful, found {len(test_results)} results")
+                test_results = await asyncio.to_thread(vector_store.similarity_search, "test", k=1)
+                logger.debug("Vector store test search successful, found %s results", len(test_results))
                 
                 # Additional test: try to get any documents at all
                 if test_results:
-                    print(f"[DEBUG] Test query successful - vector store is working")
+                    logger.debug("Test query successful - vector store is working")
                 else:
-                    print(f"[DEBUG] Test query returned no results - vector store may be empty")
+                    logger.debug("Test query returned no results - vector store may be empty")
                     
             except Exception as e:
-                print(f"[ERROR] Vector store test search failed: {str(e)}")
-                print(f"[ERROR] Exception type: {type(e).__name__}")
-                print(f"[ERROR] Exception details: {str(e)}")
+                logger.error("Vector store test search failed: %s", e)
+                logger.error("Exception type: %s", type(e).__name__)
+                logger.error("Exception details: %s", e)
                 raise HTTPException(
                     status_code=500,
                     detail=f"Vector store test failed: {str(e)}"
@@ -932,123 +989,141 @@ async def ask_question(question: QuestionInput, auth_result: dict = Depends(get_
             
             # Get relevant chunks
             try:
-                print(f"[DEBUG] Attempting similarity search with question: '{question.question}'")
-                docs_with_scores = vector_store.similarity_search_with_score(
-                    question.question,
-                    k=12,  # Increased from 8 to 12 for better coverage
-                    filter=filter_dict,
-                    fetch_k=25,  # Increased from 15 to 25
-                    score_threshold=0.05   # Reduced from 0.1 to 0.05 for better coverage
-                )
-                print(f"[DEBUG] Primary similarity search successful, found {len(docs_with_scores)} results")
+                logger.debug("Attempting similarity search with question: '%s'", question.question)
+                if question_vector is not None:
+                    # Reuse the embedding computed for the semantic cache lookup
+                    docs_with_scores = await asyncio.to_thread(
+                        vector_store.similarity_search_with_score_by_vector,
+                        question_vector,
+                        k=12,
+                        filter=filter_dict,
+                        fetch_k=25,
+                        score_threshold=0.05
+                    )
+                else:
+                    docs_with_scores = await asyncio.to_thread(
+                        vector_store.similarity_search_with_score,
+                        question.question,
+                        k=12,  # Increased from 8 to 12 for better coverage
+                        filter=filter_dict,
+                        fetch_k=25,  # Increased from 15 to 25
+                        score_threshold=0.05   # Reduced from 0.1 to 0.05 for better coverage
+                    )
+                logger.debug("Primary similarity search successful, found %s results", len(docs_with_scores))
             except Exception as search_error:
-                print(f"[ERROR] Primary similarity search failed: {str(search_error)}")
-                print(f"[ERROR] Exception type: {type(search_error).__name__}")
-                print(f"[ERROR] Exception details: {str(search_error)}")
+                logger.error("Primary similarity search failed: %s", search_error)
+                logger.error("Exception type: %s", type(search_error).__name__)
+                logger.error("Exception details: %s", search_error)
                 
                 # Try alternative search method
                 try:
-                    print(f"[DEBUG] Trying alternative search method...")
-                    docs_with_scores = vector_store.similarity_search(
+                    logger.debug("Trying alternative search method...")
+                    docs_with_scores = await asyncio.to_thread(
+                        vector_store.similarity_search,
                         question.question,
                         k=5  # Increased from 3 to 5
                     )
                     # Convert to format expected by the rest of the code
                     docs_with_scores = [(doc, 0.5) for doc in docs_with_scores]  # Default score of 0.5
-                    print(f"[DEBUG] Alternative search method successful, found {len(docs_with_scores)} results")
+                    logger.debug("Alternative search method successful, found %s results", len(docs_with_scores))
                 except Exception as alt_search_error:
-                    print(f"[ERROR] Alternative search also failed: {str(alt_search_error)}")
-                    print(f"[ERROR] Exception type: {type(alt_search_error).__name__}")
-                    print(f"[ERROR] Exception details: {str(alt_search_error)}")
+                    logger.error("Alternative search also failed: %s", alt_search_error)
+                    logger.error("Exception type: %s", type(alt_search_error).__name__)
+                    logger.error("Exception details: %s", alt_search_error)
                     
                     # Try to get any documents from the vector store as last resort
                     try:
-                        print(f"[DEBUG] Trying empty search as last resort...")
+                        logger.debug("Trying empty search as last resort...")
                         total_docs = vector_store.index.ntotal
                         if total_docs > 0:
                             # Get the first few documents regardless of relevance
-                            docs_with_scores = vector_store.similarity_search_with_score(
+                            docs_with_scores = await asyncio.to_thread(
+                                vector_store.similarity_search_with_score,
                                 "",
                                 k=min(5, total_docs),  # Increased from 3 to 5
                                 fetch_k=total_docs
                             )
-                            print(f"[DEBUG] Empty search successful, found {len(docs_with_scores)} chunks")
+                            logger.debug("Empty search successful, found %s chunks", len(docs_with_scores))
                         else:
                             raise Exception("Vector store is empty")
                     except Exception as empty_search_error:
-                        print(f"[ERROR] Empty search also failed: {str(empty_search_error)}")
-                        print(f"[ERROR] Exception type: {type(empty_search_error).__name__}")
-                        print(f"[ERROR] Exception details: {str(empty_search_error)}")
+                        logger.error("Empty search also failed: %s", empty_search_error)
+                        logger.error("Exception type: %s", type(empty_search_error).__name__)
+                        logger.error("Exception details: %s", empty_search_error)
                         raise HTTPException(
                             status_code=500,
                             detail=f"All search methods failed. Last error: {str(empty_search_error)}"
                         )
             
-            print(f"[DEBUG] Found {len(docs_with_scores)} relevant chunks for question: {question.question}")
+            logger.debug("Found %s relevant chunks for question: %s", len(docs_with_scores), question.question)
             
             # If no results with current threshold, try without threshold
             if not docs_with_scores:
-                print("[DEBUG] No results with score_threshold=0.1, trying without threshold...")
+                logger.debug("No results with score_threshold=0.1, trying without threshold...")
                 try:
-                    docs_with_scores = vector_store.similarity_search_with_score(
+                    docs_with_scores = await asyncio.to_thread(
+                        vector_store.similarity_search_with_score,
                         question.question,
                         k=8,  # Increased from 5 to 8 for better coverage
                         filter=filter_dict,
                         fetch_k=15  # Increased from 10 to 15
                     )
-                    print(f"[DEBUG] Found {len(docs_with_scores)} chunks without threshold")
+                    logger.debug("Found %s chunks without threshold", len(docs_with_scores))
                 except Exception as e:
-                    print(f"[DEBUG] Error in search without threshold: {str(e)}")
+                    logger.debug("Error in search without threshold: %s", e)
                     docs_with_scores = []
             
             # If still no results, try with even more lenient parameters
             if not docs_with_scores:
-                print("[DEBUG] Still no results, trying with k=10 and no filter...")
+                logger.debug("Still no results, trying with k=10 and no filter...")
                 try:
-                    docs_with_scores = vector_store.similarity_search_with_score(
+                    docs_with_scores = await asyncio.to_thread(
+                        vector_store.similarity_search_with_score,
                         question.question,
                         k=10,  # Increased from 8 to 10
                         fetch_k=25  # Increased from 20 to 25
                     )
-                    print(f"[DEBUG] Found {len(docs_with_scores)} chunks with lenient search")
+                    logger.debug("Found %s chunks with lenient search", len(docs_with_scores))
                 except Exception as e:
-                    print(f"[DEBUG] Error in lenient search: {str(e)}")
+                    logger.debug("Error in lenient search: %s", e)
                     docs_with_scores = []
             
             # If still no results, try getting any content from the document
             if not docs_with_scores:
-                print("[DEBUG] No relevant results found, trying to get any content from the document...")
+                logger.debug("No relevant results found, trying to get any content from the document...")
                 try:
                     # Get any content from the vector store, regardless of relevance
                     total_docs = vector_store.index.ntotal
                     if total_docs > 0:
                         # Get a few random chunks to provide some context
-                        docs_with_scores = vector_store.similarity_search_with_score(
+                        docs_with_scores = await asyncio.to_thread(
+                            vector_store.similarity_search_with_score,
                             "",  # Empty query to get any content
                             k=min(3, total_docs),
                             fetch_k=total_docs
                         )
-                        print(f"[DEBUG] Found {len(docs_with_scores)} chunks using empty search as fallback")
+                        logger.debug("Found %s chunks using empty search as fallback", len(docs_with_scores))
                         
                         # If we still get no results, try the most basic search
                         if not docs_with_scores:
-                            docs_with_scores = vector_store.similarity_search(
+                            docs_with_scores = await asyncio.to_thread(
+                                vector_store.similarity_search,
                                 "",
                                 k=min(3, total_docs)
                             )
                             # Convert to expected format
                             docs_with_scores = [(doc, 0.3) for doc in docs_with_scores]  # Low relevance score
-                            print(f"[DEBUG] Found {len(docs_with_scores)} chunks using basic search")
+                            logger.debug("Found %s chunks using basic search", len(docs_with_scores))
                     else:
-                        print("[DEBUG] Vector store is completely empty")
+                        logger.debug("Vector store is completely empty")
                         raise Exception("Vector store is empty")
                 except Exception as e:
-                    print(f"[DEBUG] Fallback search also failed: {str(e)}")
+                    logger.debug("Fallback search also failed: %s", e)
                     docs_with_scores = []
             
             # If we still have no results, provide a helpful error message
             if not docs_with_scores:
-                print("[DEBUG] No content found in document, providing helpful error message")
+                logger.debug("No content found in document, providing helpful error message")
                 doc_info = next((d for d in documents if str(d.get("id")) == question.document_id), None)
                 doc_name = doc_info.get("fileName", "Unknown") if doc_info else "Unknown"
                 
@@ -1123,8 +1198,8 @@ async def ask_question(question: QuestionInput, auth_result: dict = Depends(get_
             
             # Build context text
             context_text = "\n\n".join(context_chunks)
-            print(f"[DEBUG] Generated context with {len(context_chunks)} chunks")
-            print(f"[DEBUG] Context preview: {context_text[:200]}...")
+            logger.debug("Generated context with %s chunks", len(context_chunks))
+            logger.debug("Context preview: %s...", context_text[:200])
             
             # Get document context
             doc_info = next((d for d in documents if str(d.get("id")) == question.document_id), None)
@@ -1132,24 +1207,24 @@ async def ask_question(question: QuestionInput, auth_result: dict = Depends(get_
             
             # Load template and generate response
             try:
-                template = load_pharmacy_template()
-                print(f"[DEBUG] Template loaded successfully")
+                template = await asyncio.to_thread(load_pharmacy_template)
+                logger.debug("Template loaded successfully")
             except Exception as template_error:
-                print(f"[ERROR] Failed to load template: {str(template_error)}")
-                print(f"[ERROR] Exception type: {type(template_error).__name__}")
-                print(f"[ERROR] Exception details: {str(template_error)}")
+                logger.error("Failed to load template: %s", template_error)
+                logger.error("Exception type: %s", type(template_error).__name__)
+                logger.error("Exception details: %s", template_error)
                 raise HTTPException(
                     status_code=500,
                     detail=f"Failed to load response template: {str(template_error)}"
                 )
             
             try:
-                chat_prompt = ChatPromptTemplate.from_template(template)
-                print(f"[DEBUG] Chat prompt template created successfully")
+                chat_prompt = _build_chat_prompt(template)
+                logger.debug("Chat prompt template created successfully")
             except Exception as prompt_error:
-                print(f"[ERROR] Failed to create chat prompt: {str(prompt_error)}")
-                print(f"[ERROR] Exception type: {type(prompt_error).__name__}")
-                print(f"[ERROR] Exception details: {str(prompt_error)}")
+                logger.error("Failed to create chat prompt: %s", prompt_error)
+                logger.error("Exception type: %s", type(prompt_error).__name__)
+                logger.error("Exception details: %s", prompt_error)
                 raise HTTPException(
                     status_code=500,
                     detail=f"Failed to create chat prompt: {str(prompt_error)}"
@@ -1161,24 +1236,24 @@ async def ask_question(question: QuestionInput, auth_result: dict = Depends(get_
                     question=question.question,
                     doc_context=doc_context
                 )
-                print(f"[DEBUG] Messages formatted successfully")
+                logger.debug("Messages formatted successfully")
             except Exception as format_error:
-                print(f"[ERROR] Failed to format messages: {str(format_error)}")
-                print(f"[ERROR] Exception type: {type(format_error).__name__}")
-                print(f"[ERROR] Exception details: {str(format_error)}")
+                logger.error("Failed to format messages: %s", format_error)
+                logger.error("Exception type: %s", type(format_error).__name__)
+                logger.error("Exception details: %s", format_error)
                 raise HTTPException(
                     status_code=500,
                     detail=f"Failed to format messages: {str(format_error)}"
                 )
             
             try:
-                print(f"[DEBUG] Setting up conversational context...")
+                logger.debug("Setting up conversational context...")
                 
                 # Get conversation history (already retrieved above)
                 memory_vars = user_memory.load_memory_variables({})
                 chat_history = memory_vars.get("chat_history", [])
                 
-                print(f"[DEBUG] Conversation history length: {len(chat_history)}")
+                logger.debug("Conversation history length: %s", len(chat_history))
                 
                 # Build conversation context for the prompt
                 conversation_context = ""
@@ -1188,21 +1263,21 @@ async def ask_question(question: QuestionInput, auth_result: dict = Depends(get_
                         role = "User" if msg.__class__.__name__ == "HumanMessage" else "Assistant"
                         conversation_context += f"{role}: {msg.content}\n"
                     conversation_context += "\nCurrent question: " + question.question
-                    print(f"[DEBUG] Built conversation context: {conversation_context[:200]}...")
+                    logger.debug("Built conversation context: %s...", conversation_context[:200])
                 else:
-                    print(f"[DEBUG] No conversation history found")
+                    logger.debug("No conversation history found")
                 
                 # Instead of modifying template, modify the question to include conversation context
                 enhanced_question = question.question
                 if conversation_context:
                     enhanced_question = f"{conversation_context}\n\nQuestion: {question.question}"
-                    print(f"[DEBUG] Enhanced question with conversation context")
-                    print(f"[DEBUG] Enhanced question preview: {enhanced_question[:300]}...")
+                    logger.debug("Enhanced question with conversation context")
+                    logger.debug("Enhanced question preview: %s...", enhanced_question[:300])
                 else:
-                    print(f"[DEBUG] No conversation context, using original question")
+                    logger.debug("No conversation context, using original question")
                 
                 # Use original template but with enhanced question
-                chat_prompt = ChatPromptTemplate.from_template(template)
+                chat_prompt = _build_chat_prompt(template)
                 
                 # Format messages with enhanced question
                 enhanced_messages = chat_prompt.format_messages(
@@ -1211,41 +1286,51 @@ async def ask_question(question: QuestionInput, auth_result: dict = Depends(get_
                     doc_context=doc_context
                 )
                 
-                print(f"[DEBUG] Enhanced messages created, calling AI...")
-                print(f"[DEBUG] Original question: {question.question}")
-                print(f"[DEBUG] Enhanced question: {enhanced_question[:200]}...")
-                print(f"[DEBUG] Context length: {len(context_text)} characters")
+                logger.debug("Enhanced messages created, calling AI...")
+                logger.debug("Original question: %s", question.question)
+                logger.debug("Enhanced question: %s...", enhanced_question[:200])
+                logger.debug("Context length: %s characters", len(context_text))
                 
-                print(f"[DEBUG] Invoking chat model with conversation context...")
-                result = chat_model.invoke(enhanced_messages)
+                if question.stream:
+                    return StreamingResponse(
+                        stream_answer(
+                            chat_model, enhanced_messages, question.question, sources, cache_key,
+                            response_id, user_memory, semantic_scope, question_vector
+                        ),
+                        media_type="text/event-stream",
+                        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+                    )
+                
+                logger.debug("Invoking chat model with conversation context...")
+                result = await asyncio.to_thread(chat_model.invoke, enhanced_messages)
                 answer = result.content
                 
-                print(f"[DEBUG] AI response received: {answer[:200]}...")
+                logger.debug("AI response received: %s...", answer[:200])
                 
                 # Save the conversation to memory
                 user_memory.chat_memory.add_user_message(question.question)
                 user_memory.chat_memory.add_ai_message(answer)
                 
-                print(f"[DEBUG] Conversational response received and saved to memory")
+                logger.debug("Conversational response received and saved to memory")
                 
             except Exception as chat_error:
-                print(f"[ERROR] Failed to get response with conversation context: {str(chat_error)}")
-                print(f"[ERROR] Exception type: {type(chat_error).__name__}")
-                print(f"[ERROR] Exception details: {str(chat_error)}")
+                logger.error("Failed to get response with conversation context: %s", chat_error)
+                logger.error("Exception type: %s", type(chat_error).__name__)
+                logger.error("Exception details: %s", chat_error)
                 
                 # Fallback to original method if conversational approach fails
                 try:
-                    print(f"[DEBUG] Falling back to direct chat model...")
-                    result = chat_model.invoke(messages)
+                    logger.debug("Falling back to direct chat model...")
+                    result = await asyncio.to_thread(chat_model.invoke, messages)
                     answer = result.content
                     
                     # Still save to memory even in fallback
                     user_memory.chat_memory.add_user_message(question.question)
                     user_memory.chat_memory.add_ai_message(answer)
                     
-                    print(f"[DEBUG] Fallback successful and saved to memory")
+                    logger.debug("Fallback successful and saved to memory")
                 except Exception as fallback_error:
-                    print(f"[ERROR] Fallback also failed: {str(fallback_error)}")
+                    logger.error("Fallback also failed: %s", fallback_error)
                     raise HTTPException(
                         status_code=500,
                         detail=f"Failed to get AI response: {str(chat_error)}"
@@ -1258,8 +1343,8 @@ async def ask_question(question: QuestionInput, auth_result: dict = Depends(get_
                 "metadata_summary": [{"course": "", "semester": "", "unit": "", "topic": ""}]
             }
             
-            print(f"Generated response for question: {question.question}")
-            print(f"Response: {response}")
+            logger.debug("Generated response for question: %s", question.question)
+            logger.debug("Response: %s", response)
             
             # Cache the result immediately
             question_cache[cache_key] = {
@@ -1269,6 +1354,8 @@ async def ask_question(question: QuestionInput, auth_result: dict = Depends(get_
                 },
                 "timestamp": datetime.now().timestamp()
             }
+            if question_vector is not None:
+                semantic_cache.add(semantic_scope, question_vector, question_cache[cache_key]["response"])
             
             # Cache the response
             response_cache[response_id] = {
@@ -1281,20 +1368,20 @@ async def ask_question(question: QuestionInput, auth_result: dict = Depends(get_
             
             # Save response to S3 for persistence
             try:
-                save_response_to_s3({**response, "question": question.question}, response_id)
-                print(f"[DEBUG] Response saved to S3 with ID: {response_id}")
+                await asyncio.to_thread(save_response_to_s3, {**response, "question": question.question}, response_id)
+                logger.debug("Response saved to S3 with ID: %s", response_id)
             except Exception as s3_error:
-                print(f"[WARNING] Failed to save response to S3: {str(s3_error)}")
-                print(f"[WARNING] Exception type: {type(s3_error).__name__}")
-                print(f"[WARNING] Exception details: {str(s3_error)}")
+                logger.warning("Failed to save response to S3: %s", s3_error)
+                logger.warning("Exception type: %s", type(s3_error).__name__)
+                logger.warning("Exception details: %s", s3_error)
                 # Don't fail the request if S3 save fails
-                print(f"[WARNING] Continuing without S3 persistence")
+                logger.warning("Continuing without S3 persistence")
             
-            print(f"[DEBUG] Cached response with ID: {response_id}")
+            logger.debug("Cached response with ID: %s", response_id)
             
             # Log performance metrics
             total_time = time.time() - start_time
-            print(f"[PERFORMANCE] Single document search completed in {total_time:.2f} seconds")
+            logger.info("Single document search completed in %.2f seconds", total_time)
             
             return response
             
@@ -1306,11 +1393,11 @@ async def ask_question(question: QuestionInput, auth_result: dict = Depends(get_
             
             # Apply smart filtering for performance
             if len(processed_docs) > 10:
-                print(f"[DEBUG] Filtering {len(processed_docs)} documents to improve performance")
+                logger.debug("Filtering %s documents to improve performance", len(processed_docs))
                 processed_docs = filter_relevant_documents(question.question, processed_docs, max_docs=10)
-                print(f"[DEBUG] Selected {len(processed_docs)} most relevant documents")
+                logger.debug("Selected %s most relevant documents", len(processed_docs))
             
-            print(f"Processing general question across {len(processed_docs)} documents")
+            logger.debug("Processing general question across %s documents", len(processed_docs))
             
             # Initialize variables for multi-document processing
             combined_store = None
@@ -1321,87 +1408,87 @@ async def ask_question(question: QuestionInput, auth_result: dict = Depends(get_
             # Load and combine vector stores from all processed documents
             for doc in processed_docs:
                 try:
-                    print(f"[DEBUG] Loading vector store for document {doc.get('id')} ({doc.get('fileName', 'Unknown')})")
-                    vector_store = get_cached_vector_store(doc["id"])
+                    logger.debug("Loading vector store for document %s (%s)", doc.get('id'), doc.get('fileName', 'Unknown'))
+                    vector_store = await asyncio.to_thread(get_cached_vector_store, doc["id"])
                     if vector_store:
                         # Instead of merging, collect all documents and create a new combined store
                         try:
                             # Get all documents from this vector store
                             total_docs = vector_store.index.ntotal
-                            print(f"[DEBUG] Vector store {doc.get('id')} has {total_docs} documents")
+                            logger.debug("Vector store %s has %s documents", doc.get('id'), total_docs)
                             
                             if total_docs > 0:
-                                docs_from_store = vector_store.similarity_search("", k=total_docs)
+                                docs_from_store = await asyncio.to_thread(vector_store.similarity_search, "", k=total_docs)
                                 # Fix: Add metadata to Document objects for newer LangChain versions
                                 for doc_obj in docs_from_store:
                                     ensure_document_metadata(doc_obj, str(doc.get('id')), doc.get('fileName', 'Unknown'))
                                 
                                 all_docs.extend(docs_from_store)
-                                print(f"[DEBUG] Added {len(docs_from_store)} chunks from document: {doc.get('fileName', 'Unknown')}")
+                                logger.debug("Added %s chunks from document: %s", len(docs_from_store), doc.get('fileName', 'Unknown'))
                             else:
-                                print(f"[DEBUG] Vector store {doc.get('id')} is empty")
+                                logger.debug("Vector store %s is empty", doc.get('id'))
                         except Exception as e:
-                            print(f"[ERROR] Error extracting documents from vector store {doc.get('id')}: {str(e)}")
-                            print(f"[ERROR] Exception type: {type(e).__name__}")
-                            print(f"[ERROR] Exception details: {str(e)}")
+                            logger.error("Error extracting documents from vector store %s: %s", doc.get('id'), e)
+                            logger.error("Exception type: %s", type(e).__name__)
+                            logger.error("Exception details: %s", e)
                             # Try alternative approach - search with a generic term
                             try:
-                                print(f"[DEBUG] Trying alternative extraction method for {doc.get('id')}")
-                                docs_from_store = vector_store.similarity_search("the", k=10)
+                                logger.debug("Trying alternative extraction method for %s", doc.get('id'))
+                                docs_from_store = await asyncio.to_thread(vector_store.similarity_search, "the", k=10)
                                 
                                 # Fix: Add metadata to Document objects for newer LangChain versions
                                 for doc_obj in docs_from_store:
                                     ensure_document_metadata(doc_obj, str(doc.get('id')), doc.get('fileName', 'Unknown'))
                                 
                                 all_docs.extend(docs_from_store)
-                                print(f"[DEBUG] Added {len(docs_from_store)} chunks using alternative method from: {doc.get('fileName', 'Unknown')}")
+                                logger.debug("Added %s chunks using alternative method from: %s", len(docs_from_store), doc.get('fileName', 'Unknown'))
                             except Exception as alt_e:
-                                print(f"[ERROR] Alternative extraction also failed for {doc.get('id')}: {str(alt_e)}")
-                                print(f"[ERROR] Exception type: {type(alt_e).__name__}")
-                                print(f"[ERROR] Exception details: {str(alt_e)}")
+                                logger.error("Alternative extraction also failed for %s: %s", doc.get('id'), alt_e)
+                                logger.error("Exception type: %s", type(alt_e).__name__)
+                                logger.error("Exception details: %s", alt_e)
                                 continue
                     else:
-                        print(f"[WARNING] Vector store not found for document {doc.get('id')}")
+                        logger.warning("Vector store not found for document %s", doc.get('id'))
                 except Exception as e:
-                    print(f"[ERROR] Error loading vector store for document {doc.get('id')}: {str(e)}")
-                    print(f"[ERROR] Exception type: {type(e).__name__}")
-                    print(f"[ERROR] Exception details: {str(e)}")
+                    logger.error("Error loading vector store for document %s: %s", doc.get('id'), e)
+                    logger.error("Exception type: %s", type(e).__name__)
+                    logger.error("Exception details: %s", e)
                     continue
             
             if not all_docs:
                 raise HTTPException(status_code=404, detail="No documents found in any vector stores")
             
-            print(f"[DEBUG] Total documents collected: {len(all_docs)}")
+            logger.debug("Total documents collected: %s", len(all_docs))
             
             # Create a new combined vector store with all documents
             try:
-                print(f"[DEBUG] Creating combined vector store with {len(all_docs)} documents")
+                logger.debug("Creating combined vector store with %s documents", len(all_docs))
                 
                 # Additional validation: ensure all documents have proper metadata
                 for i, doc_obj in enumerate(all_docs):
                     if not hasattr(doc_obj, 'page_content') or not doc_obj.page_content:
-                        print(f"[WARNING] Document {i} missing page_content, skipping")
+                        logger.warning("Document %s missing page_content, skipping", i)
                         continue
                     if not hasattr(doc_obj, 'metadata'):
                         doc_obj.metadata = {}
                 
                 embeddings = get_embeddings()
-                print(f"[DEBUG] Embeddings model loaded successfully")
+                logger.debug("Embeddings model loaded successfully")
                 
                 # Try to create the combined store
-                combined_store = FAISS.from_documents(all_docs, embeddings, distance_strategy="COSINE_DISTANCE")
-                print(f"[DEBUG] Created combined vector store with {combined_store.index.ntotal} total documents")
+                combined_store = await asyncio.to_thread(FAISS.from_documents, all_docs, embeddings, distance_strategy="COSINE_DISTANCE")
+                logger.debug("Created combined vector store with %s total documents", combined_store.index.ntotal)
             except Exception as e:
-                print(f"[ERROR] Error creating combined vector store: {str(e)}")
-                print(f"[ERROR] Exception type: {type(e).__name__}")
-                print(f"[ERROR] Exception details: {str(e)}")
+                logger.error("Error creating combined vector store: %s", e)
+                logger.error("Exception type: %s", type(e).__name__)
+                logger.error("Exception details: %s", e)
                 
                 # Try to provide more specific error information
                 if "id" in str(e).lower():
-                    print(f"[ERROR] This appears to be a Document object metadata issue")
-                    print(f"[ERROR] Document objects may be missing required attributes")
+                    logger.error("This appears to be a Document object metadata issue")
+                    logger.error("Document objects may be missing required attributes")
                 
-                print(f"[ERROR] Combined vector store creation failed, falling back to individual stores")
+                logger.error("Combined vector store creation failed, falling back to individual stores")
                 # Fallback: try to use individual vector stores instead
                 combined_store = None
                 docs_with_scores = []
@@ -1409,27 +1496,28 @@ async def ask_question(question: QuestionInput, auth_result: dict = Depends(get_
                 # Try searching individual vector stores
                 for doc in processed_docs:
                     try:
-                        vector_store = get_cached_vector_store(doc["id"])
+                        vector_store = await asyncio.to_thread(get_cached_vector_store, doc["id"])
                         if vector_store:
                             # Try to get at least one result from each store
                             try:
-                                single_result = vector_store.similarity_search_with_score(
+                                single_result = await asyncio.to_thread(
+                                    vector_store.similarity_search_with_score,
                                     question.question,
                                     k=1,
                                     fetch_k=3
                                 )
                                 if single_result:
                                     docs_with_scores.extend(single_result)
-                                    print(f"Found {len(single_result)} results from {doc.get('fileName', 'Unknown')}")
+                                    logger.debug("Found %s results from %s", len(single_result), doc.get('fileName', 'Unknown'))
                             except Exception as e:
-                                print(f"Error searching individual store {doc.get('id')}: {str(e)}")
+                                logger.error("Error searching individual store %s: %s", doc.get('id'), e)
                                 continue
                     except Exception as e:
-                        print(f"Error loading individual vector store {doc.get('id')}: {str(e)}")
+                        logger.error("Error loading individual vector store %s: %s", doc.get('id'), e)
                         continue
                 
                 if docs_with_scores:
-                    print(f"[INFO] Fallback successful: found {len(docs_with_scores)} results from individual stores")
+                    logger.info("Fallback successful: found %s results from individual stores", len(docs_with_scores))
                     # Sort by score and take the best ones
                     docs_with_scores.sort(key=lambda x: x[1], reverse=True)
                     docs_with_scores = docs_with_scores[:5]  # Take top 5
@@ -1437,14 +1525,14 @@ async def ask_question(question: QuestionInput, auth_result: dict = Depends(get_
                     raise HTTPException(status_code=500, detail=f"Failed to create combined vector store and fallback also failed: {str(e)}")
             
             if not combined_store:
-                print(f"[ERROR] Combined vector store creation failed")
+                logger.error("Combined vector store creation failed")
                 raise HTTPException(status_code=404, detail="No vector stores found")
             
             # Only perform combined search if we have a combined store and no fallback results
             if combined_store and not docs_with_scores:
                 # Optimize search parameters for multi-doc
                 try:
-                    print(f"[DEBUG] Attempting multi-document similarity search with question: '{question.question}'")
+                    logger.debug("Attempting multi-document similarity search with question: '%s'", question.question)
                     
                     # Add timeout protection for vector store search
                     try:
@@ -1459,65 +1547,67 @@ async def ask_question(question: QuestionInput, auth_result: dict = Depends(get_
                             ),
                             timeout=30.0  # 30 second timeout for vector search
                         )
-                        print(f"[DEBUG] Primary multi-doc search successful, found {len(docs_with_scores)} results")
+                        logger.debug("Primary multi-doc search successful, found %s results", len(docs_with_scores))
                     except asyncio.TimeoutError:
-                        print(f"[ERROR] Vector store search timed out after 30 seconds")
+                        logger.error("Vector store search timed out after 30 seconds")
                         docs_with_scores = []
                     except Exception as search_error:
-                        print(f"[ERROR] Primary multi-doc search failed: {str(search_error)}")
-                        print(f"[ERROR] Exception type: {type(search_error).__name__}")
-                        print(f"[ERROR] Exception details: {str(search_error)}")
+                        logger.error("Primary multi-doc search failed: %s", search_error)
+                        logger.error("Exception type: %s", type(search_error).__name__)
+                        logger.error("Exception details: %s", search_error)
                         docs_with_scores = []
                 except Exception as search_error:
-                    print(f"[ERROR] Primary multi-doc search failed: {str(search_error)}")
-                    print(f"[ERROR] Exception type: {type(search_error).__name__}")
-                    print(f"[ERROR] Exception details: {str(search_error)}")
+                    logger.error("Primary multi-doc search failed: %s", search_error)
+                    logger.error("Exception type: %s", type(search_error).__name__)
+                    logger.error("Exception details: %s", search_error)
                     docs_with_scores = []
             
             # If no results with current threshold, try without threshold
             if not docs_with_scores:
-                print("[DEBUG] No results with score_threshold=0.05, trying without threshold...")
+                logger.debug("No results with score_threshold=0.05, trying without threshold...")
                 try:
-                    docs_with_scores = combined_store.similarity_search_with_score(
+                    docs_with_scores = await asyncio.to_thread(
+                        combined_store.similarity_search_with_score,
                         question.question,
                         k=8,  # Increased from 5 to 8 for better coverage
                         filter=filter_dict,
                         fetch_k=20  # Increased from 15 to 20
                     )
-                    print(f"[DEBUG] Search without threshold successful, found {len(docs_with_scores)} chunks")
+                    logger.debug("Search without threshold successful, found %s chunks", len(docs_with_scores))
                 except Exception as e:
-                    print(f"[ERROR] Search without threshold failed: {str(e)}")
+                    logger.error("Search without threshold failed: %s", e)
                     docs_with_scores = []
             
             # If still no results, try with even more lenient parameters
             if not docs_with_scores:
-                print("[DEBUG] Still no results, trying with k=10 and no filter...")
+                logger.debug("Still no results, trying with k=10 and no filter...")
                 try:
-                    docs_with_scores = combined_store.similarity_search_with_score(
+                    docs_with_scores = await asyncio.to_thread(
+                        combined_store.similarity_search_with_score,
                         question.question,
                         k=10,  # Increased from 8 to 10
                         fetch_k=25  # Increased from 20 to 25
                     )
-                    print(f"[DEBUG] Lenient search successful, found {len(docs_with_scores)} chunks")
+                    logger.debug("Lenient search successful, found %s chunks", len(docs_with_scores))
                 except Exception as e:
-                    print(f"[ERROR] Lenient search failed: {str(e)}")
+                    logger.error("Lenient search failed: %s", e)
                     docs_with_scores = []
             elif docs_with_scores:
-                print(f"[DEBUG] Using fallback results: {len(docs_with_scores)} documents found")
+                logger.debug("Using fallback results: %s documents found", len(docs_with_scores))
             
             # If still no results, try searching individual vector stores as fallback
             if not docs_with_scores:
-                print("[DEBUG] Combined search failed, trying individual vector stores...")
+                logger.debug("Combined search failed, trying individual vector stores...")
                 individual_results = []
                 
                 for i, doc in enumerate(processed_docs):
-                    print(f"[DEBUG] Processing individual store {i+1}/{len(processed_docs)}: {doc.get('fileName', 'Unknown')}")
+                    logger.debug("Processing individual store %s/%s: %s", i+1, len(processed_docs), doc.get('fileName', 'Unknown'))
                     try:
-                        vector_store = get_cached_vector_store(doc["id"])
+                        vector_store = await asyncio.to_thread(get_cached_vector_store, doc["id"])
                         if vector_store:
                             # Try to get at least one result from each store
                             try:
-                                print(f"[DEBUG] Searching in {doc.get('fileName', 'Unknown')}...")
+                                logger.debug("Searching in %s...", doc.get('fileName', 'Unknown'))
                                 
                                 # Add timeout protection for individual vector store search
                                 try:
@@ -1532,31 +1622,31 @@ async def ask_question(question: QuestionInput, auth_result: dict = Depends(get_
                                     )
                                     if single_result:
                                         individual_results.extend(single_result)
-                                        print(f"[DEBUG] Found {len(single_result)} results from {doc.get('fileName', 'Unknown')}")
+                                        logger.debug("Found %s results from %s", len(single_result), doc.get('fileName', 'Unknown'))
                                     else:
-                                        print(f"[DEBUG] No results found in {doc.get('fileName', 'Unknown')}")
+                                        logger.debug("No results found in %s", doc.get('fileName', 'Unknown'))
                                 except asyncio.TimeoutError:
-                                    print(f"[ERROR] Individual search timed out for {doc.get('fileName', 'Unknown')}")
+                                    logger.error("Individual search timed out for %s", doc.get('fileName', 'Unknown'))
                                     continue
                                 except Exception as e:
-                                    print(f"[ERROR] Error searching individual store {doc.get('id')}: {str(e)}")
+                                    logger.error("Error searching individual store %s: %s", doc.get('id'), e)
                                     continue
                             except Exception as e:
-                                print(f"[ERROR] Error searching individual store {doc.get('id')}: {str(e)}")
+                                logger.error("Error searching individual store %s: %s", doc.get('id'), e)
                                 continue
                         else:
-                            print(f"[DEBUG] Vector store not available for {doc.get('fileName', 'Unknown')}")
+                            logger.debug("Vector store not available for %s", doc.get('fileName', 'Unknown'))
                     except Exception as e:
-                        print(f"[ERROR] Error loading individual vector store {doc.get('id')}: {str(e)}")
+                        logger.error("Error loading individual vector store %s: %s", doc.get('id'), e)
                         continue
                 
                 if individual_results:
                     # Sort by score and take the best ones
                     individual_results.sort(key=lambda x: x[1], reverse=True)
                     docs_with_scores = individual_results[:3]  # Take top 3
-                    print(f"[DEBUG] Found {len(docs_with_scores)} results from individual searches")
+                    logger.debug("Found %s results from individual searches", len(docs_with_scores))
                 else:
-                    print("[DEBUG] No results found from any individual vector stores")
+                    logger.debug("No results found from any individual vector stores")
             
             # Build context and sources with document metadata
             context_chunks = []
@@ -1624,29 +1714,29 @@ async def ask_question(question: QuestionInput, auth_result: dict = Depends(get_
                 context_parts.append(f"=== CHUNK {i+1} ===\n{chunk}\n")
             
             context_text = "\n".join(context_parts)
-            print(f"[DEBUG] Generated context with {len(context_chunks)} chunks")
-            print(f"[DEBUG] Context preview: {context_text[:200]}...")
+            logger.debug("Generated context with %s chunks", len(context_chunks))
+            logger.debug("Context preview: %s...", context_text[:200])
             
             # Get document context
             doc_context = f"Multiple documents: {len(processed_docs)} documents searched"
             
             # Load template and generate response
-            print(f"[DEBUG] Loading pharmacy template...")
-            template = load_pharmacy_template()
-            print(f"[DEBUG] Template loaded, length: {len(template)}")
+            logger.debug("Loading pharmacy template...")
+            template = await asyncio.to_thread(load_pharmacy_template)
+            logger.debug("Template loaded, length: %s", len(template))
             
-            print(f"[DEBUG] Creating chat prompt...")
-            chat_prompt = ChatPromptTemplate.from_template(template)
+            logger.debug("Creating chat prompt...")
+            chat_prompt = _build_chat_prompt(template)
             
-            print(f"[DEBUG] Formatting messages...")
+            logger.debug("Formatting messages...")
             messages = chat_prompt.format_messages(
                 context=context_text,
                 question=question.question,
                 doc_context=doc_context
             )
-            print(f"[DEBUG] Messages formatted, calling LLM...")
+            logger.debug("Messages formatted, calling LLM...")
             
-            print(f"[DEBUG] Invoking chat model with provider: {AI_PROVIDER}...")
+            logger.debug("Invoking chat model with provider: %s...", AI_PROVIDER)
             
             # Add timeout protection for LLM call
             try:
@@ -1656,15 +1746,15 @@ async def ask_question(question: QuestionInput, auth_result: dict = Depends(get_
                     asyncio.to_thread(chat_model.invoke, messages),
                     timeout=90.0  # 90 second timeout
                 )
-                print(f"[DEBUG] LLM response received, length: {len(result.content)}")
+                logger.debug("LLM response received, length: %s", len(result.content))
             except asyncio.TimeoutError:
-                print(f"[ERROR] LLM call timed out after 90 seconds")
+                logger.error("LLM call timed out after 90 seconds")
                 raise HTTPException(
                     status_code=500,
                     detail="AI model response timed out. Please try again with a simpler question."
                 )
             except Exception as llm_error:
-                print(f"[ERROR] LLM call failed: {str(llm_error)}")
+                logger.error("LLM call failed: %s", llm_error)
                 raise HTTPException(
                     status_code=500,
                     detail=f"AI model call failed: {str(llm_error)}"
@@ -1681,8 +1771,8 @@ async def ask_question(question: QuestionInput, auth_result: dict = Depends(get_
                 "metadata_summary": [{"course": "", "semester": "", "unit": "", "topic": ""}]
             }
             
-            print(f"Generated general response for question: {question.question}")
-            print(f"Response: {response}")
+            logger.debug("Generated general response for question: %s", question.question)
+            logger.debug("Response: %s", response)
             
             # Cache the result immediately
             question_cache[cache_key] = {
@@ -1692,6 +1782,8 @@ async def ask_question(question: QuestionInput, auth_result: dict = Depends(get_
                 },
                 "timestamp": datetime.now().timestamp()
             }
+            if question_vector is not None:
+                semantic_cache.add(semantic_scope, question_vector, question_cache[cache_key]["response"])
             
             # Cache the response
             response_cache[response_id] = {
@@ -1703,30 +1795,30 @@ async def ask_question(question: QuestionInput, auth_result: dict = Depends(get_
             }
             
             # Save response to S3 for persistence
-            save_response_to_s3({**response, "question": question.question}, response_id)
-            print(f"Cached and saved general response with ID: {response_id}")
+            await asyncio.to_thread(save_response_to_s3, {**response, "question": question.question}, response_id)
+            logger.debug("Cached and saved general response with ID: %s", response_id)
             
             # Log performance metrics
             total_time = time.time() - start_time
-            print(f"[PERFORMANCE] Multi-document search completed in {total_time:.2f} seconds")
+            logger.info("Multi-document search completed in %.2f seconds", total_time)
             
             return response
             
     except HTTPException as http_exc:
-        print(f"[DEPLOYMENT_DEBUG] HTTPException raised: {str(http_exc)}")
+        logger.debug("HTTPException raised: %s", http_exc)
         raise
     except Exception as e:
-        print(f"[DEPLOYMENT_DEBUG] ===== UNEXPECTED ERROR IN ASK_QUESTION =====")
-        print(f"[DEPLOYMENT_DEBUG] Error: {str(e)}")
-        print(f"[DEPLOYMENT_DEBUG] Exception type: {type(e).__name__}")
-        print(f"[DEPLOYMENT_DEBUG] Exception details: {str(e)}")
+        logger.debug("===== UNEXPECTED ERROR IN ASK_QUESTION =====")
+        logger.debug("Error: %s", e)
+        logger.debug("Exception type: %s", type(e).__name__)
+        logger.debug("Exception details: %s", e)
         
         # Import traceback for detailed error information
         import traceback
-        print(f"[DEPLOYMENT_DEBUG] Full traceback:")
+        logger.debug("Full traceback:")
         traceback.print_exc()
         
-        print(f"[DEPLOYMENT_DEBUG] ===== ERROR DETAILS END =====")
+        logger.debug("===== ERROR DETAILS END =====")
         
         raise HTTPException(
             status_code=500,
@@ -1756,10 +1848,10 @@ async def ask_question_public(question: QuestionInput):
         
         # Load documents from S3 to ensure we have latest data
         try:
-            documents = load_documents_metadata() or []
-            print(f"[DEBUG] Public endpoint: Loaded {len(documents)} documents from S3 metadata.")
+            documents = await asyncio.to_thread(load_documents_metadata) or []
+            logger.debug("Public endpoint: Loaded %s documents from S3 metadata.", len(documents))
         except Exception as e:
-            print(f"Error loading documents from S3: {str(e)}")
+            logger.error("Error loading documents from S3: %s", e)
             documents = []
             raise HTTPException(
                 status_code=500,
@@ -1800,7 +1892,7 @@ async def ask_question_public(question: QuestionInput):
             # Initialize chat model
             chat_model = get_chat_model()
         except Exception as e:
-            print(f"Error initializing chat model: {str(e)}")
+            logger.error("Error initializing chat model: %s", e)
             raise HTTPException(
                 status_code=500,
                 detail="Failed to initialize AI model. Please try again."
@@ -1822,13 +1914,13 @@ async def ask_question_public(question: QuestionInput):
             filter_dict = None
 
         cache_key = get_cache_key(question.question, question.document_id, filter_dict)
-        response_id = hashlib.md5(cache_key.encode()).hexdigest()
+        response_id = hashlib.blake2b(cache_key.encode(), digest_size=16).hexdigest()
         
         # Check cache first
-        if cache_key in question_cache:
+        if await question_cache.warm(cache_key):
             cached_result = question_cache[cache_key]
             if (datetime.now().timestamp() - cached_result["timestamp"]) < CACHE_TTL:
-                print(f"Found cached response for key: {cache_key}")
+                logger.debug("Found cached response for key: %s", cache_key)
                 # Update response cache
                 response_cache[response_id] = {
                     "response": cached_result["response"],
@@ -1836,12 +1928,24 @@ async def ask_question_public(question: QuestionInput):
                 }
                 return cached_result["response"]
 
+        # Then look for an earlier answer to a reworded version of the question
+        semantic_scope = get_semantic_scope(question.document_id, filter_dict)
+        question_vector = await embed_question(question.question)
+        if question_vector is not None:
+            similar = semantic_cache.lookup(semantic_scope, question_vector)
+            if similar is not None:
+                logger.debug("Semantic cache match for question: %s", question.question)
+                similar = {**similar, "question": question.question}
+                question_cache[cache_key] = {"response": similar, "timestamp": datetime.now().timestamp()}
+                response_cache[response_id] = {"response": similar, "timestamp": datetime.now().timestamp()}
+                return similar
+
         # Get relevant documents
         if question.document_id:
-            print(f"[DEBUG] Public endpoint: Processing question for specific document: {question.document_id}")
-            vector_store = get_cached_vector_store(question.document_id)
+            logger.debug("Public endpoint: Processing question for specific document: %s", question.document_id)
+            vector_store = await asyncio.to_thread(get_cached_vector_store, question.document_id)
             if not vector_store:
-                print(f"[DEBUG] Vector store not found for document {question.document_id}")
+                logger.debug("Vector store not found for document %s", question.document_id)
                 # Try to provide a helpful error message
                 doc = next((d for d in documents if d["id"] == question.document_id), None)
                 if doc:
@@ -1862,129 +1966,147 @@ async def ask_question_public(question: QuestionInput):
                 else:
                     raise HTTPException(status_code=404, detail="Document not found")
             
-            print(f"[DEBUG] Public endpoint: Vector store loaded successfully for document {question.document_id}")
+            logger.debug("Public endpoint: Vector store loaded successfully for document %s", question.document_id)
             
             # Add debugging information about the vector store
-            print(f"[DEBUG] Vector store index size: {vector_store.index.ntotal}")
-            print(f"[DEBUG] Vector store dimension: {vector_store.index.d}")
-            print(f"[DEBUG] Question being searched: '{question.question}'")
-            print(f"[DEBUG] Filter dict: {filter_dict}")
+            logger.debug("Vector store index size: %s", vector_store.index.ntotal)
+            logger.debug("Vector store dimension: %s", vector_store.index.d)
+            logger.debug("Question being searched: '%s'", question.question)
+            logger.debug("Filter dict: %s", filter_dict)
             
             # Test if vector store can find any documents at all
             try:
-                test_results = vector_store.similarity_search("test", k=1)
-                print(f"[DEBUG] Vector store test search successful, found {len(test_results)} results")
+                test_results = await asyncio.to_thread(vector_store.similarity_search, "test", k=1)
+                logger.debug("Vector store test search successful, found %s results", len(test_results))
             except Exception as e:
-                print(f"[DEBUG] Vector store test search failed: {str(e)}")
+                logger.debug("Vector store test search failed: %s", e)
             
             # Get relevant chunks
             try:
-                docs_with_scores = vector_store.similarity_search_with_score(
-                    question.question,
-                    k=12,  # Increased from 8 to 12 for better coverage
-                    filter=filter_dict,
-                    fetch_k=25,  # Increased from 15 to 25
-                    score_threshold=0.05   # Reduced from 0.1 to 0.05 for better coverage
-                )
+                if question_vector is not None:
+                    # Reuse the embedding computed for the semantic cache lookup
+                    docs_with_scores = await asyncio.to_thread(
+                        vector_store.similarity_search_with_score_by_vector,
+                        question_vector,
+                        k=12,
+                        filter=filter_dict,
+                        fetch_k=25,
+                        score_threshold=0.05
+                    )
+                else:
+                    docs_with_scores = await asyncio.to_thread(
+                        vector_store.similarity_search_with_score,
+                        question.question,
+                        k=12,  # Increased from 8 to 12 for better coverage
+                        filter=filter_dict,
+                        fetch_k=25,  # Increased from 15 to 25
+                        score_threshold=0.05   # Reduced from 0.1 to 0.05 for better coverage
+                    )
             except Exception as search_error:
-                print(f"[DEBUG] Error in similarity search: {str(search_error)}")
+                logger.debug("Error in similarity search: %s", search_error)
                 # Try alternative search method
                 try:
-                    docs_with_scores = vector_store.similarity_search(
+                    docs_with_scores = await asyncio.to_thread(
+                        vector_store.similarity_search,
                         question.question,
                         k=5  # Increased from 3 to 5
                     )
                     # Convert to format expected by the rest of the code
                     docs_with_scores = [(doc, 0.5) for doc in docs_with_scores]  # Default score of 0.5
-                    print(f"[DEBUG] Used alternative search method successfully")
+                    logger.debug("Used alternative search method successfully")
                 except Exception as alt_search_error:
-                    print(f"[DEBUG] Alternative search also failed: {str(alt_search_error)}")
+                    logger.debug("Alternative search also failed: %s", alt_search_error)
                     
                     # Try to get any documents from the vector store as last resort
                     try:
                         total_docs = vector_store.index.ntotal
                         if total_docs > 0:
                             # Get the first few documents regardless of relevance
-                            docs_with_scores = vector_store.similarity_search_with_score(
+                            docs_with_scores = await asyncio.to_thread(
+                                vector_store.similarity_search_with_score,
                                 "",
                                 k=min(5, total_docs),  # Increased from 3 to 5
                                 fetch_k=total_docs
                             )
-                            print(f"[DEBUG] Found {len(docs_with_scores)} chunks using empty search")
+                            logger.debug("Found %s chunks using empty search", len(docs_with_scores))
                         else:
                             raise Exception("Vector store is empty")
                     except Exception as empty_search_error:
-                        print(f"[DEBUG] Empty search also failed: {str(empty_search_error)}")
+                        logger.debug("Empty search also failed: %s", empty_search_error)
                         raise HTTPException(
                             status_code=404,
                             detail="Unable to search document content. Please try reprocessing the document."
                         )
             
-            print(f"[DEBUG] Found {len(docs_with_scores)} relevant chunks for question: {question.question}")
+            logger.debug("Found %s relevant chunks for question: %s", len(docs_with_scores), question.question)
             
             # If no results with current threshold, try without threshold
             if not docs_with_scores:
-                print("[DEBUG] No results with score_threshold=0.1, trying without threshold...")
+                logger.debug("No results with score_threshold=0.1, trying without threshold...")
                 try:
-                    docs_with_scores = vector_store.similarity_search_with_score(
+                    docs_with_scores = await asyncio.to_thread(
+                        vector_store.similarity_search_with_score,
                         question.question,
                         k=8,  # Increased from 5 to 8 for better coverage
                         filter=filter_dict,
                         fetch_k=15  # Increased from 10 to 15
                     )
-                    print(f"[DEBUG] Found {len(docs_with_scores)} chunks without threshold")
+                    logger.debug("Found %s chunks without threshold", len(docs_with_scores))
                 except Exception as e:
-                    print(f"[DEBUG] Error in search without threshold: {str(e)}")
+                    logger.debug("Error in search without threshold: %s", e)
                     docs_with_scores = []
             
             # If still no results, try with even more lenient parameters
             if not docs_with_scores:
-                print("[DEBUG] Still no results, trying with k=10 and no filter...")
+                logger.debug("Still no results, trying with k=10 and no filter...")
                 try:
-                    docs_with_scores = vector_store.similarity_search_with_score(
+                    docs_with_scores = await asyncio.to_thread(
+                        vector_store.similarity_search_with_score,
                         question.question,
                         k=10,  # Increased from 8 to 10
                         fetch_k=25  # Increased from 20 to 25
                     )
-                    print(f"[DEBUG] Found {len(docs_with_scores)} chunks with lenient search")
+                    logger.debug("Found %s chunks with lenient search", len(docs_with_scores))
                 except Exception as e:
-                    print(f"[DEBUG] Error in lenient search: {str(e)}")
+                    logger.debug("Error in lenient search: %s", e)
                     docs_with_scores = []
             
             # If still no results, try getting any content from the document
             if not docs_with_scores:
-                print("[DEBUG] No relevant results found, trying to get any content from the document...")
+                logger.debug("No relevant results found, trying to get any content from the document...")
                 try:
                     # Get any content from the vector store, regardless of relevance
                     total_docs = vector_store.index.ntotal
                     if total_docs > 0:
                         # Get a few random chunks to provide some context
-                        docs_with_scores = vector_store.similarity_search_with_score(
+                        docs_with_scores = await asyncio.to_thread(
+                            vector_store.similarity_search_with_score,
                             "",  # Empty query to get any content
                             k=min(3, total_docs),
                             fetch_k=total_docs
                         )
-                        print(f"[DEBUG] Found {len(docs_with_scores)} chunks using empty search as fallback")
+                        logger.debug("Found %s chunks using empty search as fallback", len(docs_with_scores))
                         
                         # If we still get no results, try the most basic search
                         if not docs_with_scores:
-                            docs_with_scores = vector_store.similarity_search(
+                            docs_with_scores = await asyncio.to_thread(
+                                vector_store.similarity_search,
                                 "",
                                 k=min(3, total_docs)
                             )
                             # Convert to expected format
                             docs_with_scores = [(doc, 0.3) for doc in docs_with_scores]  # Low relevance score
-                            print(f"[DEBUG] Found {len(docs_with_scores)} chunks using basic search")
+                            logger.debug("Found %s chunks using basic search", len(docs_with_scores))
                     else:
-                        print("[DEBUG] Vector store is completely empty")
+                        logger.debug("Vector store is completely empty")
                         raise Exception("Vector store is empty")
                 except Exception as e:
-                    print(f"[DEBUG] Fallback search also failed: {str(e)}")
+                    logger.debug("Fallback search also failed: %s", e)
                     docs_with_scores = []
             
             # If we still have no results, provide a helpful error message
             if not docs_with_scores:
-                print("[DEBUG] No content found in document, providing helpful error message")
+                logger.debug("No content found in document, providing helpful error message")
                 doc_info = next((d for d in documents if str(d.get("id")) == question.document_id), None)
                 doc_name = doc_info.get("fileName", "Unknown") if doc_info else "Unknown"
                 
@@ -2059,16 +2181,16 @@ async def ask_question_public(question: QuestionInput):
             
             # Build context text
             context_text = "\n\n".join(context_chunks)
-            print(f"[DEBUG] Generated context with {len(context_chunks)} chunks")
-            print(f"[DEBUG] Context preview: {context_text[:200]}...")
+            logger.debug("Generated context with %s chunks", len(context_chunks))
+            logger.debug("Context preview: %s...", context_text[:200])
             
             # Get document context
             doc_info = next((d for d in documents if str(d.get("id")) == question.document_id), None)
             doc_context = f"Document: {doc_info.get('fileName', 'Unknown')}" if doc_info else "Unknown document"
             
             # Load template and generate response
-            template = load_pharmacy_template()
-            chat_prompt = ChatPromptTemplate.from_template(template)
+            template = await asyncio.to_thread(load_pharmacy_template)
+            chat_prompt = _build_chat_prompt(template)
             
             messages = chat_prompt.format_messages(
                 context=context_text,
@@ -2077,11 +2199,11 @@ async def ask_question_public(question: QuestionInput):
             )
             
             try:
-                print(f"[DEBUG] Setting up conversational context for public endpoint...")
+                logger.debug("Setting up conversational context for public endpoint...")
                 
                 # Use anonymous user for public endpoint
                 user_id = "anonymous_public"
-                print(f"[DEBUG] Public User ID: {user_id}")
+                logger.debug("Public User ID: %s", user_id)
                 
                 # Get user's conversation memory
                 user_memory = get_user_memory(user_id)
@@ -2090,7 +2212,7 @@ async def ask_question_public(question: QuestionInput):
                 memory_vars = user_memory.load_memory_variables({})
                 chat_history = memory_vars.get("chat_history", [])
                 
-                print(f"[DEBUG] Public conversation history length: {len(chat_history)}")
+                logger.debug("Public conversation history length: %s", len(chat_history))
                 
                 # Build conversation context for the prompt
                 conversation_context = ""
@@ -2105,13 +2227,13 @@ async def ask_question_public(question: QuestionInput):
                 enhanced_question = question.question
                 if conversation_context:
                     enhanced_question = f"{conversation_context}\n\nQuestion: {question.question}"
-                    print(f"[DEBUG] Enhanced question with conversation context for public endpoint")
-                    print(f"[DEBUG] Enhanced question preview: {enhanced_question[:300]}...")
+                    logger.debug("Enhanced question with conversation context for public endpoint")
+                    logger.debug("Enhanced question preview: %s...", enhanced_question[:300])
                 else:
-                    print(f"[DEBUG] No conversation context, using original question for public endpoint")
+                    logger.debug("No conversation context, using original question for public endpoint")
                 
                 # Use original template but with enhanced question
-                chat_prompt = ChatPromptTemplate.from_template(template)
+                chat_prompt = _build_chat_prompt(template)
                 
                 # Format messages with enhanced question
                 enhanced_messages = chat_prompt.format_messages(
@@ -2120,25 +2242,25 @@ async def ask_question_public(question: QuestionInput):
                     doc_context=doc_context
                 )
                 
-                print(f"[DEBUG] Invoking chat model with conversation context for public endpoint...")
-                result = chat_model.invoke(enhanced_messages)
+                logger.debug("Invoking chat model with conversation context for public endpoint...")
+                result = await asyncio.to_thread(chat_model.invoke, enhanced_messages)
                 answer = result.content
                 
                 # Save the conversation to memory
                 user_memory.chat_memory.add_user_message(question.question)
                 user_memory.chat_memory.add_ai_message(answer)
                 
-                print(f"[DEBUG] Conversational response received and saved to memory for public endpoint")
+                logger.debug("Conversational response received and saved to memory for public endpoint")
                 
             except Exception as chat_error:
-                print(f"[ERROR] Failed to get response with conversation context (public): {str(chat_error)}")
-                print(f"[ERROR] Exception type: {type(chat_error).__name__}")
-                print(f"[ERROR] Exception details: {str(chat_error)}")
+                logger.error("Failed to get response with conversation context (public): %s", chat_error)
+                logger.error("Exception type: %s", type(chat_error).__name__)
+                logger.error("Exception details: %s", chat_error)
                 
                 # Fallback to original method if conversational approach fails
                 try:
-                    print(f"[DEBUG] Falling back to direct chat model for public endpoint...")
-                    result = chat_model.invoke(messages)
+                    logger.debug("Falling back to direct chat model for public endpoint...")
+                    result = await asyncio.to_thread(chat_model.invoke, messages)
                     answer = result.content
                     
                     # Still save to memory even in fallback
@@ -2147,9 +2269,9 @@ async def ask_question_public(question: QuestionInput):
                     user_memory.chat_memory.add_user_message(question.question)
                     user_memory.chat_memory.add_ai_message(answer)
                     
-                    print(f"[DEBUG] Fallback successful and saved to memory for public endpoint")
+                    logger.debug("Fallback successful and saved to memory for public endpoint")
                 except Exception as fallback_error:
-                    print(f"[ERROR] Fallback also failed for public endpoint: {str(fallback_error)}")
+                    logger.error("Fallback also failed for public endpoint: %s", fallback_error)
                     raise HTTPException(
                         status_code=500,
                         detail=f"Failed to get AI response: {str(chat_error)}"
@@ -2162,8 +2284,8 @@ async def ask_question_public(question: QuestionInput):
                 "metadata_summary": [{"course": "", "semester": "", "unit": "", "topic": ""}]
             }
             
-            print(f"Generated response for question: {question.question}")
-            print(f"Response: {response}")
+            logger.debug("Generated response for question: %s", question.question)
+            logger.debug("Response: %s", response)
             
             # Cache the result immediately
             question_cache[cache_key] = {
@@ -2173,6 +2295,8 @@ async def ask_question_public(question: QuestionInput):
                 },
                 "timestamp": datetime.now().timestamp()
             }
+            if question_vector is not None:
+                semantic_cache.add(semantic_scope, question_vector, question_cache[cache_key]["response"])
             
             # Cache the response
             response_cache[response_id] = {
@@ -2184,12 +2308,12 @@ async def ask_question_public(question: QuestionInput):
             }
             
             # Save response to S3 for persistence
-            save_response_to_s3({**response, "question": question.question}, response_id)
-            print(f"Cached and saved general response with ID: {response_id}")
+            await asyncio.to_thread(save_response_to_s3, {**response, "question": question.question}, response_id)
+            logger.debug("Cached and saved general response with ID: %s", response_id)
             
             # Log performance metrics
             total_time = time.time() - start_time
-            print(f"[PERFORMANCE] Multi-document search completed in {total_time:.2f} seconds")
+            logger.info("Multi-document search completed in %.2f seconds", total_time)
             
             return response
             
@@ -2197,7 +2321,7 @@ async def ask_question_public(question: QuestionInput):
         raise
     except Exception as e:
         error_msg = str(e)
-        print(f"Prompt suggestion error: {error_msg}")
+        logger.debug("Prompt suggestion error: %s", error_msg)
         if "OpenAI" in error_msg:
             raise HTTPException(status_code=500, detail="Error communicating with OpenAI. Please check your API key and try again.")
         elif "vector store" in error_msg.lower():
@@ -2207,7 +2331,7 @@ async def ask_question_public(question: QuestionInput):
 
 @router.post("/suggest-prompts")
 async def suggest_prompts(topic: str = Body(...), fileName: str = Body(...), document_id: str = Body(None), auth_result: dict = Depends(get_dual_auth_user)):
-    print(f"[DEBUG] suggest_prompts called with topic={topic}, fileName={fileName}, document_id={document_id}")
+    logger.debug("suggest_prompts called with topic=%s, fileName=%s, document_id=%s", topic, fileName, document_id)
     # Validate OpenAI API key
     if not OPENAI_API_KEY or OPENAI_API_KEY == "dummy_key_for_testing":
         return JSONResponse(
@@ -2229,16 +2353,16 @@ async def suggest_prompts(topic: str = Body(...), fileName: str = Body(...), doc
         if document_id:
             try:
                 # Load documents list to check processing status (from S3)
-                documents = load_documents_metadata() or []
-                print(f"[DEBUG] Loaded {len(documents)} documents from S3 metadata.")
+                documents = await asyncio.to_thread(load_documents_metadata) or []
+                logger.debug("Loaded %s documents from S3 metadata.", len(documents))
                 doc = next((d for d in documents if str(d.get("id")) == str(document_id)), None)
-                print(f"[DEBUG] doc found: {doc is not None}")
+                logger.debug("doc found: %s", doc is not None)
                 
                 if not doc:
                     raise HTTPException(status_code=404, detail=f"Document not found with ID: {document_id}")
                 
                 if not doc.get("processed", False):
-                    print("[DEBUG] Document is not processed.")
+                    logger.debug("Document is not processed.")
                     raise HTTPException(
                         status_code=400,
                         detail="Document is not processed. Please process the document first."
@@ -2253,46 +2377,48 @@ async def suggest_prompts(topic: str = Body(...), fileName: str = Body(...), doc
             except HTTPException:
                 raise
             except Exception as e:
-                print(f"Error checking document status: {str(e)}")
+                logger.error("Error checking document status: %s", e)
                 raise HTTPException(status_code=500, detail=f"Error checking document status: {str(e)}")
         
         # Initialize chat model
         try:
             chat_model = get_chat_model()
         except Exception as e:
-            print(f"Error initializing chat model: {str(e)}")
+            logger.error("Error initializing chat model: %s", e)
             raise HTTPException(status_code=500, detail=f"Failed to initialize AI model: {str(e)}")
 
         # If document_id is provided, use RAG to generate context-aware prompts
         if document_id:
             try:
                 # Load vector store for the document
-                vector_store = get_cached_vector_store(document_id)
+                vector_store = await asyncio.to_thread(get_cached_vector_store, document_id)
                 if not vector_store:
-                    print(f"[DEBUG] Vector store not found for document {document_id}, falling back to topic-based prompts")
+                    logger.debug("Vector store not found for document %s, falling back to topic-based prompts", document_id)
                     # Fall back to topic-based prompts instead of failing
                     context = ""
                 else:
                     # Get relevant chunks from the document
                     try:
-                        docs = vector_store.similarity_search(
+                        docs = await asyncio.to_thread(
+                            vector_store.similarity_search,
                             f"key concepts and important information about {topic}",
                             k=1  # Only the top chunk
                         )
                         
                         if not docs:
                             # If no relevant chunks found, fall back to topic-based prompts
-                            print(f"No relevant chunks found for topic: {topic}, using topic-based prompts")
+                            logger.debug("No relevant chunks found for topic: %s, using topic-based prompts", topic)
                             context = ""
                         else:
                             # Extract key content from chunks
                             context = docs[0].page_content if docs else ""
                     except Exception as search_error:
-                        print(f"Error performing similarity search: {str(search_error)}")
+                        logger.error("Error performing similarity search: %s", search_error)
                         
                         # Try alternative search method
                         try:
-                            docs = vector_store.similarity_search_with_score(
+                            docs = await asyncio.to_thread(
+                                vector_store.similarity_search_with_score,
                                 f"key concepts and important information about {topic}",
                                 k=1
                             )
@@ -2301,10 +2427,10 @@ async def suggest_prompts(topic: str = Body(...), fileName: str = Body(...), doc
                             else:
                                 context = ""
                         except Exception as alt_search_error:
-                            print(f"Alternative search also failed: {str(alt_search_error)}")
+                            logger.debug("Alternative search also failed: %s", alt_search_error)
                             context = ""
             except Exception as e:
-                print(f"Error loading document context: {str(e)}")
+                logger.error("Error loading document context: %s", e)
                 # Instead of failing, fall back to topic-based prompts
                 context = ""
 
@@ -2356,7 +2482,7 @@ async def suggest_prompts(topic: str = Body(...), fileName: str = Body(...), doc
             Return only the questions as a JSON array of strings, no additional text."""
         
         # Get response from AI
-        response = chat_model.invoke(prompt)
+        response = await asyncio.to_thread(chat_model.invoke, prompt)
         
         try:
             # Try to parse the response as JSON
@@ -2385,7 +2511,7 @@ async def suggest_prompts(topic: str = Body(...), fileName: str = Body(...), doc
             Return only the questions as a JSON array of strings."""
             
             try:
-                additional_response = chat_model.invoke(additional_prompt)
+                additional_response = await asyncio.to_thread(chat_model.invoke, additional_prompt)
                 additional_prompts = json.loads(additional_response.content)
                 if isinstance(additional_prompts, list):
                     prompts.extend(additional_prompts[:3 - len(prompts)])
@@ -2398,14 +2524,14 @@ async def suggest_prompts(topic: str = Body(...), fileName: str = Body(...), doc
                 ]
                 prompts.extend(fallback_prompts[:3 - len(prompts)])
         
-        print("[DEBUG] About to call load_vector_store")
+        logger.debug("About to call load_vector_store")
         return {"prompts": prompts[:3]}  # Return exactly 3 prompts
         
     except HTTPException as http_exc:
         raise
     except Exception as e:
         error_msg = str(e)
-        print(f"Prompt suggestion error: {error_msg}")
+        logger.debug("Prompt suggestion error: %s", error_msg)
         if "OpenAI" in error_msg:
             raise HTTPException(status_code=500, detail="Error communicating with OpenAI. Please check your API key and try again.")
         elif "vector store" in error_msg.lower():
@@ -2673,90 +2799,113 @@ def filter_relevant_documents(question: str, documents: list, max_docs: int = 10
 def get_cached_vector_store(doc_id: str) -> Optional[FAISS]:
     """Get vector store from cache or load it with improved error handling"""
     try:
-        # Clean up expired caches first
-        cleanup_expired_caches()
-        
-        current_time = time.time()
-        
-        # Check cache first using the new structure
-        if doc_id in vector_store_cache and doc_id in vector_store_timestamps:
-            cache_age = current_time - vector_store_timestamps[doc_id]
-            if cache_age < VECTOR_STORE_CACHE_TTL:
-                print(f"[CACHE_HIT] Using cached vector store for {doc_id} (age: {cache_age:.1f}s)")
-                cached_store = vector_store_cache[doc_id]
-                # Verify cached store is still valid
-                if cached_store and hasattr(cached_store, 'index') and cached_store.index:
-                    return cached_store
-                else:
-                    print(f"[WARNING] Cached vector store for {doc_id} is invalid, reloading...")
-                    # Remove invalid cache
-                    del vector_store_cache[doc_id]
-                    del vector_store_timestamps[doc_id]
-            else:
-                # Remove expired cache
-                del vector_store_cache[doc_id]
-                del vector_store_timestamps[doc_id]
-                print(f"[CACHE_EXPIRED] Removed expired cache for {doc_id}")
+        # Check cache first (expired entries are already gone)
+        with vector_store_cache_lock:
+            cached_store = vector_store_cache.get(doc_id)
+        if cached_store is not None:
+            # Verify cached store is still valid
+            if hasattr(cached_store, 'index') and cached_store.index:
+                logger.debug("Using cached vector store for %s", doc_id)
+                return cached_store
+            logger.warning("Cached vector store for %s is invalid, reloading...", doc_id)
+            # Remove invalid cache
+            with vector_store_cache_lock:
+                vector_store_cache.pop(doc_id, None)
         
         # Load vector store from scratch
-        print(f"[CACHE_MISS] Loading vector store for {doc_id} from S3...")
+        logger.debug("Loading vector store for %s from S3...", doc_id)
         try:
             vector_store = load_vector_store(doc_id)
         except Exception as load_error:
             error_msg = f"Failed to load vector store for {doc_id} from S3: {str(load_error)}"
-            print(f"[ERROR] {error_msg}")
-            print(f"[ERROR] Exception type: {type(load_error).__name__}")
+            logger.error("%s", error_msg)
+            logger.error("Exception type: %s", type(load_error).__name__)
             import traceback
-            print(f"[ERROR] Traceback: {traceback.format_exc()}")
+            logger.error("Traceback: %s", traceback.format_exc())
             # Re-raise to allow caller to handle appropriately
             raise Exception(error_msg) from load_error
         
         if vector_store:
-            # Cache the vector store using the new structure
-            vector_store_cache[doc_id] = vector_store
-            vector_store_timestamps[doc_id] = current_time
-            print(f"[CACHE_STORED] Successfully cached vector store for {doc_id}")
+            # Cache the vector store (evicts the least recently used one when full)
+            with vector_store_cache_lock:
+                vector_store_cache[doc_id] = vector_store
+            logger.debug("Successfully cached vector store for %s", doc_id)
             
             # Verify the vector store is usable
             if hasattr(vector_store, 'index') and vector_store.index:
-                print(f"[DEBUG] Vector store {doc_id} verified - index size: {vector_store.index.ntotal}")
+                logger.debug("Vector store %s verified - index size: %s", doc_id, vector_store.index.ntotal)
             else:
-                print(f"[WARNING] Vector store {doc_id} has no valid index")
+                logger.warning("Vector store %s has no valid index", doc_id)
         else:
             error_msg = f"Failed to load vector store for {doc_id} - load_vector_store returned None"
-            print(f"[ERROR] {error_msg}")
+            logger.error("%s", error_msg)
             raise Exception(error_msg)
         
         return vector_store
         
     except Exception as e:
-        print(f"[ERROR] Exception in get_cached_vector_store for {doc_id}: {str(e)}")
+        logger.error("Exception in get_cached_vector_store for %s: %s", doc_id, e)
         
         # Clear any corrupted cache entry
-        if doc_id in vector_store_cache:
-            del vector_store_cache[doc_id]
-        if doc_id in vector_store_timestamps:
-            del vector_store_timestamps[doc_id]
-        print(f"[DEBUG] Cleared corrupted cache entry for {doc_id}")
+        with vector_store_cache_lock:
+            vector_store_cache.pop(doc_id, None)
+        logger.debug("Cleared corrupted cache entry for %s", doc_id)
         
         return None
 
+def warm_vector_stores(limit: int = VECTOR_STORE_PRELOAD) -> int:
+    """Load the most recently uploaded processed documents' vector stores into the
+    cache and run one probe search on each, so their S3 download and first-touch
+    page faults happen at startup instead of on a user's first question. Returns
+    how many stores were warmed."""
+    limit = min(limit, VECTOR_STORE_CACHE_MAX)
+    if limit <= 0:
+        return 0
+    try:
+        docs = load_documents_metadata() or []
+    except Exception as e:
+        logger.warning("Skipping vector store preload, could not load documents: %s", e)
+        return 0
+    recent = sorted(
+        (doc for doc in docs if doc.get("processed") and doc.get("id")),
+        key=lambda doc: doc.get("uploadDate") or "",
+        reverse=True
+    )[:limit]
+    warmed = 0
+    for doc in recent:
+        store = get_cached_vector_store(doc["id"])
+        if store is None or not store.index.ntotal:
+            continue
+        # A zero-vector probe faults in the flat vectors (or the IVF centroids)
+        store.index.search(np.zeros((1, store.index.d), dtype=np.float32), 1)
+        warmed += 1
+    logger.info("Preloaded %s vector stores", warmed)
+    return warmed
+
 def cleanup_vector_store_cache():
     """Clean up expired vector store cache entries"""
-    global vector_store_cache
-    current_time = datetime.now().timestamp()
-    
-    expired_keys = []
-    for doc_id, cached_data in vector_store_cache.items():
-        if (current_time - cached_data["timestamp"]) >= VECTOR_STORE_CACHE_TTL:
-            expired_keys.append(doc_id)
-    
-    for key in expired_keys:
-        del vector_store_cache[key]
-        print(f"[DEBUG] Cleaned up expired cache entry for {key}")
-    
-    print(f"[DEBUG] Cleaned up {len(expired_keys)} expired cache entries")
+    with vector_store_cache_lock:
+        before = len(vector_store_cache)
+        vector_store_cache.expire()
+        removed = before - len(vector_store_cache)
+    logger.debug("Cleaned up %s expired cache entries", removed)
+
+CACHE_REAPER_INTERVAL = int(os.getenv("CACHE_REAPER_INTERVAL", "60"))  # seconds
 
-# Clean up cache periodically
-import atexit
-atexit.register(cleanup_vector_store_cache)                                                                                  
\ No newline at end of file
+async def cache_reaper(interval: int = CACHE_REAPER_INTERVAL):
+    """Drop expired cache entries every `interval` seconds, off the request path
+    
+    The plain TTLCaches aren't thread-safe, so they are expired here on the event
+    loop (cost is proportional to what expired); the lock-guarded semantic and
+    vector store caches are pruned in a worker thread.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            question_cache.expire()
+            response_cache.expire()
+            user_sessions.expire()
+            await asyncio.to_thread(cleanup_expired_caches)
+            await asyncio.to_thread(cleanup_vector_store_cache)
+        except Exception as e:
+            logger.warning("Cache reaper pass failed: %s", e)                                                                                  
\ No newline at end of file
@@ -1,13 +1,19 @@
 from fastapi import APIRouter, HTTPException, Depends, status, Request
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from fastapi.concurrency import run_in_threadpool
 from typing import Optional
+import hmac
 import time
 import logging
 from datetime import datetime
 from fastapi.responses import JSONResponse
+from sqlalchemy import exists
 
 from ..auth.jwt_utils import create_access_token, verify_token
-from ..models.user import UserLogin, UserLoginResponse, UserResponse, UserCreate, user_manager
+from ..models.user import (
+    UserLogin, UserLoginResponse, UserResponse, UserCreate, user_manager,
+    check_password, hash_password, is_password_hash,
+)
 from ..core.security import require_any_user
 from ..config.database import SessionLocal
 from ..models.admin_user import AdminUser
@@ -147,9 +153,20 @@ async def login(request: Request, login_data: UserLogin):
                         headers={"WWW-Authenticate": "Bearer"}
                     )
             
-            # Check password (plain text comparison as per database structure)
-            logger.info(f"Checking password for {login_data.username}: DB password length={len(admin_user.password)}, input length={len(login_data.password)}")
-            if admin_user.password != login_data.password:
+            # Check password: hashed rows verify on the threadpool; rows still holding a
+            # legacy plaintext password are compared in constant time and upgraded to a hash
+            logger.info(f"Checking password for {login_data.username}: input length={len(login_data.password)}")
+            if is_password_hash(admin_user.password):
+                password_ok = await run_in_threadpool(check_password, login_data.password, admin_user.password)
+            else:
+                password_ok = hmac.compare_digest(
+                    admin_user.password.encode('utf-8'), login_data.password.encode('utf-8')
+                )
+                if password_ok:
+                    admin_user.password = await run_in_threadpool(hash_password, login_data.password)
+                    db.commit()
+                    logger.info(f"Upgraded stored password to a hash for user: {admin_user.email}")
+            if not password_ok:
                 logger.warning(f"Password mismatch for user: {login_data.username}")
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
@@ -213,12 +230,12 @@ async def register(user_data: UserCreate):
     try:
         db = SessionLocal()
         try:
-            allowed_user = (
-                db.query(AdminUser)
-                .filter(AdminUser.email.in_([user_data.email, user_data.username]))
-                .filter(AdminUser.panel == "sme")
-                .first()
-            )
+            # Existence only: EXISTS stops at the first match and loads no columns
+            allowed_user = db.query(
+                exists()
+                .where(AdminUser.email.in_([user_data.email, user_data.username]))
+                .where(AdminUser.panel == "sme")
+            ).scalar()
         finally:
             db.close()
 
@@ -228,7 +245,9 @@ async def register(user_data: UserCreate):
                 detail="You are not allowed to sign up for this panel",
             )
 
-        new_user = user_manager.create_user(
+        # Hashing is CPU-bound; keep it off the event loop
+        new_user = await run_in_threadpool(
+            user_manager.create_user,
             user_data.username,
             user_data.email,
             user_data.password,
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, HTTPException, Depends, status, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, exists
 from typing import List, Optional, Dict, Any
 from pydantic import BaseModel, Field
 from datetime import datetime
@@ -868,9 +868,9 @@ async def save_topic_mappings(
                 else:
                     # Check if topic_slug already exists (due to unique constraint)
                     # This can happen if multiple university topics map to the same PCI topic
-                    slug_exists = db.query(TopicMapping).filter(
-                        TopicMapping.topic_slug == topic_slug
-                    ).first()
+                    slug_exists = db.query(
+                        exists().where(TopicMapping.topic_slug == topic_slug)
+                    ).scalar()
                     
                     if slug_exists:
                         # If unique constraint still exists, we need to handle this
@@ -8,7 +8,6 @@ from datetime import datetime
 from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Body, Depends
 from fastapi.responses import JSONResponse
 from typing import List, Optional, Dict, Any
-from langchain_community.vectorstores import FAISS
 from copy import deepcopy
 import time
 import asyncio
@@ -27,7 +26,7 @@ from ..utils.file_utils import (
     validate_content_coverage
 )
 from ..utils.vector_store import (
-    verify_document_processed, get_embeddings, load_vector_store,
+    verify_document_processed, get_embeddings, load_vector_store, build_vector_store,
     save_vector_store, delete_vector_store, save_chunk_info, save_chunks_debug,
     check_vector_store_compatibility, load_chunk_info, load_chunks_debug
 )
@@ -674,12 +673,7 @@ async def process_document(doc_id: str, options: ProcessOptions = None, auth_res
             embeddings = get_embeddings()
             texts = [chunk.page_content for chunk in chunks]
             metadatas = [chunk.metadata for chunk in chunks]
-            vector_store = FAISS.from_texts(
-                texts=texts,
-                embedding=embeddings,
-                metadatas=metadatas,
-                distance_strategy="COSINE_DISTANCE"  # Use cosine distance for better similarity scoring
-            )
+            vector_store = build_vector_store(texts, metadatas, embeddings)
             
             # Save vector store directly to S3
             if not save_vector_store(vector_store, doc_id):
@@ -12,6 +12,7 @@ from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.prompts import ChatPromptTemplate
 import logging
 import asyncio
+from functools import lru_cache
 
 from ..core.security import get_current_user
 from ..core.dual_auth import get_dual_auth_user
@@ -332,8 +333,10 @@ def clean_placeholder_text(notes: str) -> str:
     
     return notes
 
+@lru_cache(maxsize=8)
 def get_chat_model_for_notes(temperature: float = 0.3, max_tokens: Optional[int] = None):
-    """Get chat model for notes generation based on configured AI provider"""
+    """Get chat model for notes generation based on configured AI provider (shared
+    per temperature/max_tokens pair so its HTTP client is reused)"""
     # Use higher token limits for comprehensive notes generation
     if max_tokens is None:
         max_tokens = get_provider_max_tokens(AI_PROVIDER, CHAT_MODEL)
@@ -658,7 +661,7 @@ async def generate_notes(
         
         logger.info(f"Notes generation request - Quality: {quality}, Provider: {AI_PROVIDER}, Model: {CHAT_MODEL}")
         logger.info(f"Configuration - max_tokens: {max_tokens}, temperature: {temperature}")
-        logger.info(f"Notes config: {notes_config}")
+        logger.info(f"Notes config: {dict(notes_config)}")
 
         # Generate notes using AI with quality-specific settings
         logger.info(f"Calling generate_notes_with_openai with max_tokens={max_tokens}, temperature={temperature}")
@@ -1,14 +1,39 @@
 import uuid
 import logging
+import time
 from datetime import datetime
 from typing import List, Optional, Dict, Any
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, inspect
+from sqlalchemy.exc import SQLAlchemyError
 from ..models.model_paper_prediction import ModelPaperPrediction
+from ..models.prediction_stats import PredictionStats
 from ..config.database import get_db
 
 logger = logging.getLogger(__name__)
 
+# Whether prediction_stats exists, as (available, checked_at). A missing table is
+# re-checked every STATS_RECHECK_SECONDS so applying the migration takes effect
+# without a restart
+STATS_RECHECK_SECONDS = 300
+_stats_table_state = (None, 0.0)
+
+def _stats_table_available(db: Session) -> bool:
+    global _stats_table_state
+    available, checked_at = _stats_table_state
+    if available or (available is False and time.monotonic() - checked_at < STATS_RECHECK_SECONDS):
+        return available
+    try:
+        # Inspected on its own connection, outside the caller's transaction
+        available = inspect(db.get_bind()).has_table(PredictionStats.__tablename__)
+    except SQLAlchemyError as e:
+        logger.debug(f"Could not check for prediction_stats: {str(e)}")
+        available = False
+    _stats_table_state = (available, time.monotonic())
+    if not available:
+        logger.info("prediction_stats not found (create_prediction_stats.sql not applied); counting rows instead")
+    return available
+
 class PredictionService:
     """Service class for handling model paper prediction database operations"""
     
@@ -189,6 +214,12 @@ class PredictionService:
         status: Optional[str] = None
     ) -> int:
         """Count predictions with optional filtering"""
+        # Unfiltered and status-only counts come from the trigger-maintained summary row
+        if not (model_paper_id or course_name or subject):
+            total = PredictionService._count_from_stats(db, status)
+            if total is not None:
+                return total
+        
         try:
             query = db.query(ModelPaperPrediction)
             
@@ -209,4 +240,22 @@ class PredictionService:
             
         except Exception as e:
             logger.error(f"Failed to count predictions: {str(e)}")
-            return 0 
\ No newline at end of file
+            return 0
+    
+    @staticmethod
+    def _count_from_stats(db: Session, status: Optional[str] = None) -> Optional[int]:
+        """Count from prediction_stats, or None if the summary isn't set up (caller falls back to COUNT)"""
+        if not _stats_table_available(db):
+            return None
+        try:
+            # Savepoint, so a failure here never rolls back the caller's pending work
+            with db.begin_nested():
+                stats = db.query(PredictionStats).filter(PredictionStats.scope == "all").first()
+        except SQLAlchemyError as e:
+            logger.debug(f"prediction_stats query failed, counting rows instead: {str(e)}")
+            return None
+        if stats is None:
+            return None
+        if status:
+            return int(stats.by_status.get(status, 0))
+        return int(stats.total) 
\ No newline at end of file
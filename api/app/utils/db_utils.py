@@ -1,7 +1,10 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, insert
 from typing import Optional, List, Dict, Any
+import csv
+import io
 from ..models.notes import GeneratedNotes
+from ..models.user_account import UserAccount
 from ..config.database import get_db
 
 def save_notes_to_db(
@@ -120,4 +123,40 @@ def check_notes_exist(db: Session, document_id: str) -> bool:
         ).first()
         return notes is not None
     except Exception as e:
-        raise e 
\ No newline at end of file
+        raise e 
+
+# Batches larger than this go through Postgres COPY rather than a multi-row INSERT
+USER_COPY_THRESHOLD = 100
+USER_COLUMNS = ("username", "email", "password_hash", "role", "is_active", "created_at", "last_login")
+
+def bulk_insert_users(db: Session, rows: List[Dict[str, Any]]) -> int:
+    """Insert many user rows at once; returns the number inserted
+    
+    Small batches use a single executemany INSERT (SQLAlchemy batches it with
+    insertmanyvalues); large ones are streamed through COPY on the session's
+    own connection, so both paths commit or roll back together.
+    """
+    if not rows:
+        return 0
+    try:
+        if len(rows) > USER_COPY_THRESHOLD:
+            buf = io.StringIO()
+            writer = csv.writer(buf)
+            for row in rows:
+                writer.writerow([
+                    r"\N" if row.get(column) is None else row[column]
+                    for column in USER_COLUMNS
+                ])
+            buf.seek(0)
+            cursor = db.connection().connection.cursor()
+            cursor.copy_expert(
+                f"COPY users ({', '.join(USER_COLUMNS)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+                buf
+            )
+        else:
+            db.execute(insert(UserAccount), rows)
+        db.commit()
+        return len(rows)
+    except Exception as e:
+        db.rollback()
+        raise e
@@ -0,0 +1,82 @@
+"""
+Embedding micro-batcher
+
+Concurrent requests each need their question embedded. Rather than one provider
+round-trip per question, EmbedBatcher collects the questions that arrive within a
+short window and embeds them in a single embed_documents call.
+"""
+
+import asyncio
+import logging
+import os
+from typing import List, Optional, Tuple
+
+from langchain_google_genai import GoogleGenerativeAIEmbeddings
+
+from .vector_store import get_embeddings
+
+logger = logging.getLogger(__name__)
+
+EMBED_BATCH_MAX = int(os.getenv("EMBED_BATCH_MAX", "16"))
+EMBED_BATCH_WINDOW = float(os.getenv("EMBED_BATCH_WINDOW", "0.01"))  # seconds
+
+
+class EmbedBatcher:
+    """Coalesces concurrent embed() calls into batched provider requests"""
+
+    def __init__(self, max_batch: int = EMBED_BATCH_MAX, window: float = EMBED_BATCH_WINDOW):
+        self.max_batch = max_batch
+        self.window = window
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._embeddings = None
+
+    async def embed(self, text: str) -> List[float]:
+        """Embedding for one query text (batched with any concurrent callers)"""
+        if self._worker is None or self._worker.done():
+            # Started lazily so the queue and task belong to the running loop
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future))
+        return await future
+
+    def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        if self._embeddings is None:
+            self._embeddings = get_embeddings()
+        if isinstance(self._embeddings, GoogleGenerativeAIEmbeddings):
+            # Keep query-side vectors: embed_query would use this task type too
+            return self._embeddings.embed_documents(texts, task_type="retrieval_query")
+        return self._embeddings.embed_documents(texts)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch: List[Tuple[str, asyncio.Future]] = [await self._queue.get()]
+            deadline = loop.time() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            texts = [text for text, _ in batch]
+            try:
+                vectors = await asyncio.to_thread(self._embed_batch, texts)
+            except Exception as e:
+                logger.warning(f"Batched embedding of {len(texts)} texts failed: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            logger.debug(f"Embedded {len(texts)} texts in one batch")
+            for (_, future), vector in zip(batch, vectors):
+                if not future.done():
+                    future.set_result(vector)
+
+
+# Shared instance for request handlers
+embed_batcher = EmbedBatcher()
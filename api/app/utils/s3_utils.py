@@ -8,6 +8,8 @@ from ..config.settings import (
 )
 import json
 import logging
+import threading
+import time
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -77,6 +79,13 @@ TEMPLATE_KEY = "templates/pharmacy_prompt.txt"
 TEMPLATES_PREFIX = "templates/"
 TEMPLATE_BACKUPS_PREFIX = "templates/backups/"
 
+# Templates are read on every AI request but change rarely: keep the text per name
+# and only revalidate it against the S3 ETag (a bodiless 304 when unchanged) once
+# it is older than TEMPLATE_REVALIDATE_SECONDS. Saves in this process update it.
+TEMPLATE_REVALIDATE_SECONDS = 60
+_template_cache: Dict[str, tuple] = {}  # name -> (etag, text, checked_at)
+_template_cache_lock = threading.Lock()
+
 def _check_s3_available():
     """Check if S3 is available and provide helpful error message"""
     if not S3_AVAILABLE:
@@ -638,12 +647,14 @@ def save_template_to_s3(template_text: str, template_name: str = "pharmacy_promp
 
         # Save the new template content
         template_key = get_template_s3_key(template_name)
-        s3_client.put_object(
+        response = s3_client.put_object(
             Bucket=S3_BUCKET_NAME,
             Key=template_key,
             Body=template_text.encode('utf-8'),
             ContentType='text/plain'
         )
+        with _template_cache_lock:
+            _template_cache[template_name] = (response.get('ETag'), template_text, time.monotonic())
         return True
     except Exception as e:
         logging.error(f"Failed to save template to S3: {str(e)}")
@@ -657,13 +668,32 @@ def load_template_from_s3(template_name: str = "pharmacy_prompt") -> Optional[st
     Returns:
         Optional[str]: Template content if successful, None otherwise
     """
+    with _template_cache_lock:
+        cached = _template_cache.get(template_name)
+    if cached and time.monotonic() - cached[2] < TEMPLATE_REVALIDATE_SECONDS:
+        return cached[1]
+    
     _check_s3_available()
     try:
         template_key = get_template_s3_key(template_name)
-        response = s3_client.get_object(Bucket=S3_BUCKET_NAME, Key=template_key)
-        return response['Body'].read().decode('utf-8')
+        request = {'Bucket': S3_BUCKET_NAME, 'Key': template_key}
+        if cached:
+            request['IfNoneMatch'] = cached[0]
+        response = s3_client.get_object(**request)
+        text = response['Body'].read().decode('utf-8')
+        with _template_cache_lock:
+            _template_cache[template_name] = (response.get('ETag'), text, time.monotonic())
+        return text
     except ClientError as e:
-        if e.response['Error']['Code'] == 'NoSuchKey':
+        code = e.response['Error']['Code']
+        if cached and code in ('304', 'NotModified'):
+            # Unchanged since we cached it
+            with _template_cache_lock:
+                _template_cache[template_name] = (cached[0], cached[1], time.monotonic())
+            return cached[1]
+        if code == 'NoSuchKey':
+            with _template_cache_lock:
+                _template_cache.pop(template_name, None)
             logging.warning(f"Template {template_name} not found in S3")
             return None
         logging.error(f"Error loading template from S3: {str(e)}")
@@ -0,0 +1,108 @@
+"""
+Semantic question cache
+
+Answers recent questions by embedding similarity rather than exact text, so a
+reworded question ("what is X?" / "explain X") reuses the earlier answer instead
+of paying for retrieval and an LLM call again. Entries are scoped (document +
+metadata filter), so a hit never crosses documents.
+"""
+
+import os
+import threading
+import time
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import faiss
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.9"))  # cosine similarity
+SEMANTIC_CACHE_TTL = int(os.getenv("SEMANTIC_CACHE_TTL", "3600"))  # seconds
+SEMANTIC_CACHE_MAX_PER_SCOPE = int(os.getenv("SEMANTIC_CACHE_MAX_PER_SCOPE", "2000"))
+
+
+class SemanticCache:
+    """Per-scope FAISS inner-product index over L2-normalised question embeddings"""
+
+    def __init__(self, threshold: float = SEMANTIC_CACHE_THRESHOLD, ttl: int = SEMANTIC_CACHE_TTL,
+                 max_per_scope: int = SEMANTIC_CACHE_MAX_PER_SCOPE):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_per_scope = max_per_scope
+        # scope -> (index, [(response, stored_at), ...]); list position == index row
+        self._scopes: Dict[str, Tuple[faiss.IndexFlatIP, List[Tuple[Any, float]]]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(vector) -> np.ndarray:
+        vec = np.asarray(vector, dtype=np.float32).reshape(1, -1)
+        faiss.normalize_L2(vec)
+        return vec
+
+    def lookup(self, scope: str, vector) -> Optional[Any]:
+        """Cached response for the most similar fresh question in scope, or None"""
+        vec = self._normalize(vector)
+        with self._lock:
+            entry = self._scopes.get(scope)
+            if entry is None or entry[0].ntotal == 0 or entry[0].d != vec.shape[1]:
+                return None
+            index, items = entry
+            scores, rows = index.search(vec, 1)
+            score, row = float(scores[0][0]), int(rows[0][0])
+            if row < 0 or score < self.threshold:
+                return None
+            response, stored_at = items[row]
+        if time.time() - stored_at >= self.ttl:
+            return None
+        logger.debug(f"Semantic cache hit in {scope} (similarity {score:.3f})")
+        return response
+
+    def add(self, scope: str, vector, response: Any) -> None:
+        vec = self._normalize(vector)
+        with self._lock:
+            entry = self._scopes.get(scope)
+            if entry is None or entry[0].d != vec.shape[1]:
+                # New scope, or the embedding model changed dimension: start over
+                entry = (faiss.IndexFlatIP(vec.shape[1]), [])
+                self._scopes[scope] = entry
+            index, items = entry
+            if index.ntotal >= self.max_per_scope:
+                # Full: drop expired entries (and the oldest half if still full)
+                self._rebuild(scope, keep_newest=self.max_per_scope // 2)
+                index, items = self._scopes[scope]
+            index.add(vec)
+            items.append((response, time.time()))
+
+    def _rebuild(self, scope: str, keep_newest: Optional[int] = None) -> int:
+        """Rebuild a scope's index without expired rows (caller holds the lock) and
+        return how many rows were dropped. Items are in insertion order, so expired
+        rows are always a prefix; IndexFlatIP has no cheap delete, so pruning means
+        re-adding the survivors."""
+        index, items = self._scopes[scope]
+        cutoff = time.time() - self.ttl
+        start = next((row for row, (_, stored_at) in enumerate(items) if stored_at > cutoff), len(items))
+        if keep_newest is not None:
+            start = max(start, len(items) - keep_newest)
+        if start == 0:
+            return 0
+        new_index = faiss.IndexFlatIP(index.d)
+        if start < len(items):
+            new_index.add(index.reconstruct_n(start, index.ntotal - start))
+        self._scopes[scope] = (new_index, items[start:])
+        return start
+
+    def prune(self) -> int:
+        """Drop expired entries from every scope; returns how many were removed"""
+        removed = 0
+        with self._lock:
+            for scope in list(self._scopes):
+                removed += self._rebuild(scope)
+                if not self._scopes[scope][1]:
+                    del self._scopes[scope]
+        return removed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._scopes.clear()
@@ -0,0 +1,79 @@
+"""
+Two-level answer cache
+
+TieredCache is an in-process TTLCache (L1) that also writes every entry to Redis
+(L2) when REDIS_URL is configured. Other workers, and this one after a restart,
+pull entries back into L1 with warm() instead of recomputing them. Without Redis
+it behaves exactly like a TTLCache.
+"""
+
+import asyncio
+import logging
+from typing import Any, Optional, Set
+
+import orjson
+from cachetools import TTLCache
+
+from ..config.settings import REDIS_URL
+
+try:
+    from redis import asyncio as aioredis
+except ImportError:  # optional: without it the caches are process-local
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+_redis = None
+if REDIS_URL and aioredis is not None:
+    # Short timeouts: a slow or unreachable Redis must never be worse than a cache miss
+    _redis = aioredis.from_url(REDIS_URL, socket_timeout=0.25, socket_connect_timeout=0.25)
+elif REDIS_URL:
+    logger.warning("REDIS_URL is set but the redis package is not installed; caches stay in-process")
+
+
+class TieredCache(TTLCache):
+    """TTLCache whose writes are mirrored to Redis under "<prefix>:<key>"
+
+    Values must be JSON-serialisable. Reads stay synchronous and L1-only; call
+    `await cache.warm(key)` before a lookup to fall back to Redis on an L1 miss.
+    """
+
+    def __init__(self, maxsize: int, ttl: int, prefix: str):
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self.prefix = prefix
+        self._pending: Set[asyncio.Task] = set()
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        if _redis is None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # set from a worker thread: L1 only
+        task = loop.create_task(self._publish(key, value))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _publish(self, key, value: Any) -> None:
+        try:
+            await _redis.set(f"{self.prefix}:{key}", orjson.dumps(value), ex=int(self.ttl))
+        except Exception as e:
+            logger.warning(f"Failed to write {self.prefix}:{key} to Redis: {e}")
+
+    async def warm(self, key) -> bool:
+        """Make sure key is in L1, loading it from Redis if needed; returns whether it is"""
+        if key in self:
+            return True
+        if _redis is None:
+            return False
+        try:
+            raw: Optional[bytes] = await _redis.get(f"{self.prefix}:{key}")
+        except Exception as e:
+            logger.warning(f"Failed to read {self.prefix}:{key} from Redis: {e}")
+            return False
+        if raw is None:
+            return False
+        # Bypass __setitem__ so the entry is not written straight back to Redis
+        TTLCache.__setitem__(self, key, orjson.loads(raw))
+        return True
@@ -4,7 +4,10 @@ import shutil
 import logging
 import threading
 import time
+import uuid
 from typing import Dict, List, Optional, Any
+import faiss
+import numpy as np
 from langchain_openai import OpenAIEmbeddings
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from langchain_community.vectorstores import FAISS
@@ -19,7 +22,8 @@ except Exception:
 
 from ..config.settings import (
     VECTOR_STORES_DIR, OPENAI_API_KEY, GOOGLE_API_KEY, 
-    EMBEDDING_MODEL, AI_PROVIDER, USE_OPENAI_EMBEDDINGS
+    EMBEDDING_MODEL, AI_PROVIDER, USE_OPENAI_EMBEDDINGS,
+    FAISS_IVF_MIN_VECTORS, FAISS_IVF_NLIST, FAISS_IVF_NPROBE
 )
 
 from .s3_utils import (
@@ -67,6 +71,9 @@ def _get_cached_vector_store(doc_id: str, logger: logging.Logger) -> Optional[FA
 
 def _store_vector_store_cache(doc_id: str, store: FAISS, logger: logging.Logger) -> None:
     """Cache a vector store with simple LRU-style eviction."""
+    if isinstance(store.index, faiss.IndexIVF):
+        # The saved nprobe may predate the current setting
+        store.index.nprobe = FAISS_IVF_NPROBE
     now = time.time()
     with _CACHE_LOCK:
         if len(_VECTOR_STORE_CACHE) >= _CACHE_MAX_ITEMS:
@@ -161,6 +168,49 @@ def get_embeddings():
             model=EMBEDDING_MODEL
         )
 
+def build_vector_store(texts: List[str], metadatas: List[dict], embeddings) -> FAISS:
+    """Build a cosine-scored FAISS store for a document's chunks
+    
+    Small documents keep the exhaustive flat index. Large ones get an IndexIVFFlat
+    trained on a sample of their own vectors, so a search only scans the nprobe
+    nearest clusters rather than every vector.
+    """
+    # k-means needs ~39 training points per cluster to produce usable centroids
+    if len(texts) < max(FAISS_IVF_MIN_VECTORS, FAISS_IVF_NLIST * 39):
+        return FAISS.from_texts(
+            texts=texts,
+            embedding=embeddings,
+            metadatas=metadatas,
+            distance_strategy="COSINE_DISTANCE"  # Use cosine distance for better similarity scoring
+        )
+    
+    vectors = np.asarray(embeddings.embed_documents(texts), dtype=np.float32)
+    dimension = vectors.shape[1]
+    # Same L2 metric FAISS.from_texts uses for COSINE_DISTANCE, so scores are unchanged
+    quantizer = faiss.IndexFlatL2(dimension)
+    index = faiss.IndexIVFFlat(quantizer, dimension, FAISS_IVF_NLIST, faiss.METRIC_L2)
+    train_size = min(len(vectors), FAISS_IVF_NLIST * 256)
+    sample = np.random.default_rng(0).choice(len(vectors), train_size, replace=False)
+    index.train(vectors[sample])
+    index.add(vectors)
+    index.nprobe = FAISS_IVF_NPROBE
+    
+    ids = [str(uuid.uuid4()) for _ in texts]
+    docstore = InMemoryDocstore({
+        docstore_id: Document(page_content=text, metadata=metadata)
+        for docstore_id, text, metadata in zip(ids, texts, metadatas)
+    })
+    logging.getLogger(__name__).info(
+        f"Built IVF index: {len(vectors)} vectors, nlist={FAISS_IVF_NLIST}, nprobe={FAISS_IVF_NPROBE}"
+    )
+    return FAISS(
+        embedding_function=embeddings,
+        index=index,
+        docstore=docstore,
+        index_to_docstore_id=dict(enumerate(ids)),
+        distance_strategy="COSINE_DISTANCE"
+    )
+
 def load_vector_store(doc_id: str) -> Optional[FAISS]:
     """Load vector store from S3 with improved error handling and logging"""
     import logging
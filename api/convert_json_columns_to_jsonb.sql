@@ -0,0 +1,13 @@
+-- Migration script to store JSON payload columns as JSONB
+-- JSONB is stored pre-parsed, so reading or querying into these payloads no longer
+-- re-parses the text on every row. Each ALTER rewrites its table; run off-peak.
+
+ALTER TABLE university_curricula
+ALTER COLUMN curriculum_data TYPE jsonb USING curriculum_data::jsonb,
+ALTER COLUMN stats TYPE jsonb USING stats::jsonb;
+
+ALTER TABLE model_paper_predictions
+ALTER COLUMN prediction_metadata TYPE jsonb USING prediction_metadata::jsonb;
+
+ALTER TABLE generated_notes
+ALTER COLUMN notes_metadata TYPE jsonb USING notes_metadata::jsonb;
@@ -8,7 +8,7 @@ from datetime import datetime
 os.makedirs("data", exist_ok=True)
 
 # Generate API key
-api_key = secrets.token_urlsafe(64)
+api_key = secrets.token_urlsafe(32)  # 256-bit key
 
 # Create key data
 key_data = {
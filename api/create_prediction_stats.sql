@@ -0,0 +1,54 @@
+-- SQL script to create the prediction_stats summary table
+-- For PostgreSQL database
+--
+-- Keeps running totals of model_paper_predictions (overall and per status) so
+-- prediction counts are a single-row read instead of a COUNT(*) scan. A row-level
+-- trigger keeps the counts in step with every insert, delete and status change.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS prediction_stats (
+    scope VARCHAR(50) PRIMARY KEY,
+    total BIGINT NOT NULL DEFAULT 0,
+    by_status JSONB NOT NULL DEFAULT '{}'::jsonb
+);
+
+CREATE OR REPLACE FUNCTION update_prediction_stats() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE prediction_stats
+        SET total = total - 1,
+            by_status = jsonb_set(by_status, ARRAY[OLD.status],
+                                  to_jsonb(COALESCE((by_status->>OLD.status)::bigint, 0) - 1))
+        WHERE scope = 'all';
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE prediction_stats
+        SET total = total + 1,
+            by_status = jsonb_set(by_status, ARRAY[NEW.status],
+                                  to_jsonb(COALESCE((by_status->>NEW.status)::bigint, 0) + 1))
+        WHERE scope = 'all';
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Block writes while backfilling so no row is counted twice or missed
+LOCK TABLE model_paper_predictions IN SHARE ROW EXCLUSIVE MODE;
+
+DROP TRIGGER IF EXISTS prediction_stats_trigger ON model_paper_predictions;
+CREATE TRIGGER prediction_stats_trigger
+AFTER INSERT OR DELETE OR UPDATE OF status ON model_paper_predictions
+FOR EACH ROW EXECUTE FUNCTION update_prediction_stats();
+
+-- Backfill from the current rows
+INSERT INTO prediction_stats (scope, total, by_status)
+SELECT 'all', COALESCE(SUM(n), 0), COALESCE(jsonb_object_agg(status, n), '{}'::jsonb)
+FROM (SELECT status, COUNT(*) AS n FROM model_paper_predictions GROUP BY status) counts
+ON CONFLICT (scope) DO UPDATE
+SET total = EXCLUDED.total, by_status = EXCLUDED.by_status;
+
+COMMIT;
+
+-- Add comments
+COMMENT ON TABLE prediction_stats IS 'Trigger-maintained prediction counts (total and per status)';
@@ -0,0 +1,18 @@
+-- SQL script to create the users table (database copy of users.json)
+-- For PostgreSQL database
+
+CREATE TABLE IF NOT EXISTS users (
+    username VARCHAR(255) PRIMARY KEY,
+    email VARCHAR(255) NOT NULL,
+    password_hash VARCHAR(255) NOT NULL,
+    role VARCHAR(50) NOT NULL DEFAULT 'user',
+    is_active BOOLEAN NOT NULL DEFAULT TRUE,
+    created_at TIMESTAMP NOT NULL,
+    last_login TIMESTAMP
+);
+
+-- Create indexes for better query performance
+CREATE INDEX IF NOT EXISTS ix_users_email ON users(email);
+
+-- Add comments
+COMMENT ON TABLE users IS 'Panel login users, imported from the file-based users.json store';
@@ -0,0 +1,43 @@
+"""
+Migration script to copy the file-based users (users.json plus its journal)
+into the users table.
+
+Run create_users_table.sql first. Users whose username already exists in the
+table are skipped, so the script is safe to re-run.
+"""
+
+import sys
+from pathlib import Path
+
+# Add the parent directory to the path so we can import app modules
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.config.database import SessionLocal
+from app.models.user import user_manager
+from app.models.user_account import UserAccount
+from app.utils.db_utils import bulk_insert_users
+
+def main():
+    db = SessionLocal()
+    try:
+        existing = {username for (username,) in db.query(UserAccount.username)}
+        rows = [
+            {
+                "username": user.username,
+                "email": user.email,
+                "password_hash": user.password_hash,
+                "role": user.role,
+                "is_active": user.is_active,
+                "created_at": user.created_at,
+                "last_login": user.last_login,
+            }
+            for user in user_manager.users.values()
+            if user.username not in existing
+        ]
+        inserted = bulk_insert_users(db, rows)
+        print(f"Inserted {inserted} users ({len(existing)} already present)")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
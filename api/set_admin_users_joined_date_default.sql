@@ -0,0 +1,5 @@
+-- Migration script to let Postgres fill admin_users.joined_date
+-- Inserts omit the column and take CURRENT_DATE (in the database's timezone),
+-- instead of the application passing date.today() on every row.
+
+ALTER TABLE admin_users ALTER COLUMN joined_date SET DEFAULT CURRENT_DATE;
@@ -0,0 +1,21 @@
+-- Migration script to compress the large markdown columns with lz4 instead of pglz
+-- Requires PostgreSQL 14+. lz4 compresses and decompresses several times faster than
+-- pglz at a similar ratio, which cuts CPU on every read/write of these blobs.
+--
+-- Only newly written values use lz4; existing rows keep pglz until the value itself
+-- is rewritten (e.g. UPDATE ... SET col = col || ''). VACUUM FULL and CLUSTER copy
+-- compressed values unchanged, so they don't recompress. Storage stays EXTENDED:
+-- these are plain markdown, not pre-compressed, so skipping compression would
+-- only grow TOAST.
+--
+-- Optional, cluster-wide (needs superuser): ALTER SYSTEM SET default_toast_compression = 'lz4';
+
+ALTER TABLE generated_notes
+ALTER COLUMN notes_content SET COMPRESSION lz4;
+
+ALTER TABLE model_paper_predictions
+ALTER COLUMN predicted_questions SET COMPRESSION lz4;
+
+-- Verify (newly written rows should report lz4):
+-- SELECT pg_column_compression(notes_content), COUNT(*) FROM generated_notes GROUP BY 1;
+-- SELECT pg_column_compression(predicted_questions), COUNT(*) FROM model_paper_predictions GROUP BY 1;
@@ -274,9 +274,23 @@ export interface UpdateAdminUserRequest {
   status?: string;
 }
 
+export interface AdminUserPage {
+  items: AdminUser[];
+  next_after_id: number | null;
+}
+
 export const accessManagementApi = {
   getUsers: async (): Promise<AdminUser[]> => {
-    return apiRequest<AdminUser[]>('/api/admin-users');
+    // The endpoint is keyset-paginated; walk the pages to build the full list
+    const users: AdminUser[] = [];
+    let afterId: number | null = null;
+    do {
+      const query: string = afterId === null ? '?limit=200' : `?limit=200&after_id=${afterId}`;
+      const page: AdminUserPage = await apiRequest<AdminUserPage>(`/api/admin-users${query}`);
+      users.push(...page.items);
+      afterId = page.next_after_id;
+    } while (afterId !== null);
+    return users;
   },
 
   addUser: async (data: CreateAdminUserRequest): Promise<AdminUser> => {